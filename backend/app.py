@@ -1,31 +1,112 @@
 """
 Traveller's Assistant App - Flask Backend
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
+import json
 import logging
 import os
+import re
+import time
 
 from config import Config
-from services import ClaudeService, WeatherService, CountryService
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+import responses
+from cache import get_cache, request_cache_state, start_request_tracking
+from logging_setup import configure_logging, stage, stage_timings, start_request
+from idempotency import (
+    IDEMPOTENCY_HEADER, IdempotencyConflict, IdempotencyInProgress, add_idempotency_headers,
+    idempotency_key, in_progress_response, run_idempotent
+)
+from planner import plan_itinerary, resolve_country_data, trip_duration, validate_legs
+from refresh_scheduler import get_refresh_scheduler, request_finished, request_started, start_refresh_scheduler
+from warmup import prefetch_trip, start_background_warmup
+from responses import cacheable_json, resolve_profile, shape_plan_response
+from services import (
+    get_claude_service, get_weather_service, get_country_service, init_services
 )
+
+# Setup logging (queued, written by a background thread)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Accepted client-supplied X-Request-ID values
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
 # Initialize Flask app
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
 app.config.from_object(Config)
 CORS(app)
+responses.init_app(app)
+
+# Initialize services: constructed on first use in lazy startup mode,
+# up front in eager mode
+if Config.STARTUP_MODE == 'eager':
+    init_services()
+
+
+@app.before_request
+def track_cache_outcomes():
+    """Start collecting cache hits/misses for this request"""
+    start_request_tracking()
+
+
+@app.before_request
+def assign_request_id():
+    """Tag this request's log records with an ID (the client's X-Request-ID if valid)"""
+    client_id = request.headers.get('X-Request-ID', '')
+    g.request_id = start_request(client_id if _REQUEST_ID_PATTERN.match(client_id) else None)
+    g.request_started = time.perf_counter()
+
+
+@app.before_request
+def count_active_request():
+    """Background cache refreshes only run while no requests are in flight"""
+    request_started()
+
+
+@app.teardown_request
+def release_active_request(error=None):
+    request_finished()
+
+
+@app.after_request
+def add_cache_header(response):
+    """Report whether the request was served from cache (X-Cache: HIT/MISS/PARTIAL)"""
+    # A streamed body does its lookups after the headers are sent; it
+    # reports the cache state in its last line instead
+    state = request_cache_state()
+    if state and not g.get('streaming'):
+        response.headers['X-Cache'] = state
+    return response
+
+
+@app.after_request
+def log_request(response):
+    """Return the request ID and log one completion record with stage durations"""
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    # Streamed responses log their completion when the body ends
+    if not g.get('streaming'):
+        _log_completion(response.status_code)
+    return response
+
+
+def _log_completion(status):
+    if request.path.startswith('/api/') and 'request_started' in g:
+        duration_ms = round((time.perf_counter() - g.request_started) * 1000, 1)
+        logger.info(
+            "%s %s %s in %.1fms", request.method, request.path, status, duration_ms,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'status': status,
+                'duration_ms': duration_ms,
+                'stages': stage_timings()
+            }
+        )
 
-# Initialize services
-claude_service = ClaudeService()
-weather_service = WeatherService()
-country_service = CountryService()
 
 @app.route('/')
 def index():
@@ -40,6 +121,16 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    """Cache backend, TTLs, hit/miss/eviction counters and background refreshes for this worker"""
+    return jsonify(dict(get_cache().summary(), refresh=get_refresh_scheduler().stats()))
+
+@app.route('/api/model-stats', methods=['GET'])
+def model_stats():
+    """Claude route policies, hedge counters and rolling latencies for this worker"""
+    return jsonify(get_claude_service().router.stats())
+
 @app.route('/api/validate-config', methods=['GET'])
 def validate_config():
     """Validate API configuration"""
@@ -86,12 +177,21 @@ def generate_travel_plan():
             "location": "city center",
             "budget": "mid-range"
         },
-        "specific_questions": "Best family-friendly restaurants?"
+        "specific_questions": "Best family-friendly restaurants?",
+        "response_profile": "slim"
     }
+
+    The response profile (full, slim or sections) may also be passed as
+    ?profile=; it defaults to Config.DEFAULT_RESPONSE_PROFILE. ?refresh=1
+    regenerates the advice even if a cached copy is still fresh.
+
+    Submissions are idempotent: an Idempotency-Key header (or, without one,
+    the normalized payload) identifies the request, duplicates wait for the
+    running generation, and completed plans are replayed for a short window.
     """
     try:
         user_input = request.json
-        logger.info(f"Generating travel plan for {user_input.get('destination')}")
+        logger.info("Generating travel plan for %s", user_input.get('destination'))
         
         # Validate required fields
         required = ['destination', 'dates']
@@ -100,68 +200,157 @@ def generate_travel_plan():
             return jsonify({
                 'error': f"Missing required fields: {', '.join(missing)}"
             }), 400
-        
-        # Calculate duration
-        start_date = datetime.strptime(user_input['dates']['start'], '%Y-%m-%d')
-        end_date = datetime.strptime(user_input['dates']['end'], '%Y-%m-%d')
-        duration = (end_date - start_date).days + 1
-        user_input['dates']['duration_days'] = duration
-        
-        # Extract destination
-        destination = user_input['destination']
 
-        # Fetch weather data first (includes country code from geocoding)
-        logger.info("Fetching weather data...")
-        weather_data = weather_service.get_weather_forecast(
+        # The response profile only shapes the output, so it is not part of the key;
+        # refreshes get their own scope so they never replay an ordinary plan
+        refresh = request.args.get('refresh') == '1'
+        key, fingerprint = idempotency_key(
+            'plan-refresh' if refresh else 'plan', user_input, request.headers.get(IDEMPOTENCY_HEADER),
+            ignore=('response_profile',)
+        )
+        plan, outcome = run_idempotent(key, fingerprint, lambda: _build_travel_plan(user_input, refresh))
+
+        response = jsonify(shape_plan_response(plan, resolve_profile(user_input)))
+        return add_idempotency_headers(response, key, outcome)
+
+    except IdempotencyConflict:
+        return jsonify({
+            'error': 'Idempotency-Key was already used with a different request'
+        }), 422
+    except IdempotencyInProgress as e:
+        return in_progress_response(e)
+    except Exception as e:
+        logger.error("Error generating travel plan: %s", e)
+        return jsonify({
+            'error': 'Failed to generate travel plan',
+            'details': str(e)
+        }), 500
+
+def _build_travel_plan(user_input, refresh=False):
+    """Look up weather and country data, then generate the advice (regenerated if refresh)"""
+    # Calculate duration
+    start_date = datetime.strptime(user_input['dates']['start'], '%Y-%m-%d')
+    end_date = datetime.strptime(user_input['dates']['end'], '%Y-%m-%d')
+    duration = (end_date - start_date).days + 1
+    user_input['dates']['duration_days'] = duration
+    
+    # Extract destination
+    destination = user_input['destination']
+
+    # Fetch weather data first (includes country code from geocoding)
+    logger.info("Fetching weather data...")
+    with stage('weather'):
+        weather_data = get_weather_service().get_weather_forecast(
             destination,
             user_input['dates']['start'],
             user_input['dates']['end']
         )
+    get_refresh_scheduler().record_plan(user_input, weather_data)
 
-        # Fetch country information using country code from weather data
-        logger.info("Fetching country information...")
-        country_data = None
-
-        # Try to get country code from weather coordinates
-        if weather_data and weather_data.get('coordinates', {}).get('country'):
-            country_code = weather_data['coordinates']['country']
-            logger.info(f"Using country code from geocoding: {country_code}")
-            country_data = country_service.get_country_info_by_code(country_code)
-
-        # Fallback: try to extract country name from destination string
-        if not country_data:
-            country_name = destination.split(',')[-1].strip() if ',' in destination else destination
-            logger.info(f"Fallback: trying country name '{country_name}' from destination")
-            country_data = country_service.get_country_info(country_name)
-        
-        # Generate AI-powered travel advice
-        logger.info("Generating AI-powered travel advice...")
-        travel_advice = claude_service.generate_travel_advice(
+    # Fetch country information using country code from weather data
+    logger.info("Fetching country information...")
+    with stage('country'):
+        country_data = resolve_country_data(destination, weather_data)
+
+    # Generate AI-powered travel advice
+    logger.info("Generating AI-powered travel advice...")
+    with stage('advice'):
+        travel_advice = get_claude_service().generate_travel_advice(
             user_input,
             weather_data,
-            country_data
+            country_data,
+            refresh=refresh
         )
-        
-        # Compile complete response
-        response = {
-            'success': True,
-            'input': user_input,
-            'weather': weather_data,
-            'country': country_data,
-            'advice': travel_advice,
-            'generated_at': datetime.now().isoformat()
-        }
-        
-        logger.info("Travel plan generated successfully")
-        return jsonify(response)
+    
+    # Compile complete response
+    response = {
+        'success': True,
+        'input': user_input,
+        'weather': weather_data,
+        'country': country_data,
+        'advice': travel_advice,
+        'generated_at': datetime.now().isoformat()
+    }
+    
+    logger.info("Travel plan generated successfully")
+    return response
+
+@app.route('/api/generate-itinerary', methods=['POST'])
+def generate_itinerary():
+    """
+    Generate a travel plan for a multi-leg trip
 
+    Expected JSON payload:
+    {
+        "legs": [
+            {"destination": "Rome, Italy", "dates": {"start": "2024-06-01", "end": "2024-06-04"}},
+            {"destination": "Florence, Italy", "dates": {"start": "2024-06-04", "end": "2024-06-07"}},
+            {"destination": "Venice, Italy", "dates": {"start": "2024-06-07", "end": "2024-06-10"}}
+        ],
+        "purpose": "leisure",
+        "travelers": {...},
+        "food_preferences": [...],
+        "accommodation": {...},
+        "specific_questions": "..."
+    }
+
+    Country-level sections (currency, culture, practical info, safety) are
+    returned once per country; city-level sections once per leg. Submissions
+    are idempotent, as for /api/generate-plan.
+    """
+    try:
+        payload = request.json or {}
+        error = validate_legs(payload.get('legs'))
+        if error:
+            return jsonify({'error': error}), 400
+
+        logger.info("Generating itinerary with %s legs", len(payload['legs']))
+        key, fingerprint = idempotency_key('itinerary', payload, request.headers.get(IDEMPOTENCY_HEADER))
+        itinerary, outcome = run_idempotent(key, fingerprint, lambda: plan_itinerary(payload))
+        return add_idempotency_headers(jsonify(itinerary), key, outcome)
+
+    except IdempotencyConflict:
+        return jsonify({
+            'error': 'Idempotency-Key was already used with a different request'
+        }), 422
+    except IdempotencyInProgress as e:
+        return in_progress_response(e)
     except Exception as e:
-        logger.error(f"Error generating travel plan: {str(e)}")
+        logger.error("Error generating itinerary: %s", e)
         return jsonify({
-            'error': 'Failed to generate travel plan',
+            'error': 'Failed to generate itinerary',
             'details': str(e)
         }), 500
 
+@app.route('/api/prefetch', methods=['POST'])
+def prefetch():
+    """
+    Warm caches for a trip while the user is still filling in the form
+
+    Expected JSON payload:
+    {
+        "destination": "Paris, France",
+        "dates": {"start": "2024-06-01", "end": "2024-06-07"}
+    }
+
+    Returns 202 immediately; geocoding, weather and country lookups run in
+    the background so the later /api/generate-plan finds them cached.
+    """
+    payload = request.json or {}
+    destination = (payload.get('destination') or '').strip()
+    dates = payload.get('dates') or {}
+    if not destination or not dates.get('start') or not dates.get('end'):
+        return jsonify({'error': 'destination and dates.start/end are required'}), 400
+    try:
+        duration = trip_duration(dates)
+    except ValueError:
+        return jsonify({'error': 'Invalid dates (expected YYYY-MM-DD)'}), 400
+    if not 1 <= duration <= Config.MAX_DAYS:
+        return jsonify({'error': 'Invalid date range'}), 400
+
+    status = prefetch_trip(destination, dates['start'], dates['end'])
+    return jsonify({'status': status}), 429 if status == 'busy' else 202
+
 @app.route('/api/ask-question', methods=['POST'])
 def ask_question():
     """
@@ -185,34 +374,10 @@ def ask_question():
         if not question:
             return jsonify({'error': 'Question is required'}), 400
 
-        logger.info(f"Answering question about {context.get('destination')}: {question}")
-
-        # Build prompt for AI
-        destination = context.get('destination', 'this destination')
-        country = context.get('country', '')
-        dates = context.get('dates', {})
-
-        prompt = f"""You are a knowledgeable travel assistant. A traveler is planning a trip to {destination}"""
-        if country:
-            prompt += f" in {country}"
-        if dates.get('start'):
-            prompt += f" from {dates.get('start')} to {dates.get('end')}"
-
-        prompt += f""".
+        # The question text is user content; log its size, not the text
+        logger.info("Answering question about %s (%d chars)", context.get('destination'), len(question))
 
-They have a question: {question}
-
-Please provide a helpful, practical, and specific answer. Keep it concise (2-4 sentences) but informative."""
-
-        # Get answer from AI using Claude
-        response = claude_service.client.messages.create(
-            model=claude_service.model,
-            max_tokens=1000,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        answer = response.content[0].text
+        answer = get_claude_service().answer_question(question, context)
 
         logger.info("Question answered successfully")
         return jsonify({
@@ -222,7 +387,7 @@ Please provide a helpful, practical, and specific answer. Keep it concise (2-4 s
         })
 
     except Exception as e:
-        logger.error(f"Error answering question: {str(e)}")
+        logger.error("Error answering question: %s", e)
         return jsonify({
             'error': 'Failed to answer question',
             'details': str(e)
@@ -238,34 +403,107 @@ def get_weather(destination):
         if not start_date or not end_date:
             return jsonify({'error': 'start and end dates required'}), 400
         
-        weather_data = weather_service.get_weather_forecast(
+        weather_data = get_weather_service().get_weather_forecast(
             destination,
             start_date,
             end_date
         )
         
         if weather_data:
-            return jsonify(weather_data)
+            if weather_data.get('data_type') in ('forecast', 'hybrid'):
+                max_age, swr = Config.HTTP_FORECAST_MAX_AGE, Config.HTTP_FORECAST_SWR
+            else:
+                max_age, swr = Config.HTTP_CLIMATE_MAX_AGE, Config.HTTP_CLIMATE_SWR
+            return cacheable_json(weather_data, max_age, swr)
         else:
             return jsonify({'error': 'Weather data not available'}), 404
             
     except Exception as e:
-        logger.error(f"Error fetching weather: {str(e)}")
+        logger.error("Error fetching weather: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/weather/batch', methods=['POST'])
+def get_weather_batch():
+    """
+    Get weather for many destinations in one request
+
+    Expected JSON payload:
+    {
+        "destinations": ["Lisbon, Portugal", "Seville, Spain", "Athens, Greece"],
+        "dates": {"start": "2024-05-10", "end": "2024-05-17"}
+    }
+
+    Returns results in input order, each with its own error if the lookup
+    failed. With ?stream=1 the response is NDJSON, one line per destination
+    as soon as it completes (each line carries its input "index"), followed
+    by {"done": true, "cache": "HIT" | "MISS" | "PARTIAL" | null}.
+    """
+    try:
+        payload = request.json or {}
+        destinations = payload.get('destinations')
+        dates = payload.get('dates') or {}
+        start_date, end_date = dates.get('start'), dates.get('end')
+
+        if not isinstance(destinations, list) or not destinations:
+            return jsonify({'error': 'destinations must be a non-empty list'}), 400
+        if len(destinations) > Config.WEATHER_BATCH_MAX:
+            return jsonify({'error': f"At most {Config.WEATHER_BATCH_MAX} destinations per request"}), 400
+        if not start_date or not end_date:
+            return jsonify({'error': 'start and end dates required'}), 400
+        try:
+            duration = trip_duration(dates)
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+        if not 1 <= duration <= Config.MAX_DAYS:
+            return jsonify({'error': f"Trip must be between 1 and {Config.MAX_DAYS} days"}), 400
+
+        def batch_item(index, weather_data):
+            item = {'index': index, 'destination': destinations[index], 'weather': weather_data}
+            if not weather_data:
+                item['error'] = 'Weather data not available'
+            return item
+
+        results = get_weather_service().iter_weather_forecasts(destinations, start_date, end_date)
+
+        if request.args.get('stream') in ('1', 'true'):
+            def generate():
+                completed = False
+                try:
+                    for index, weather_data in results:
+                        yield json.dumps(batch_item(index, weather_data)) + '\n'
+                    completed = True
+                    yield json.dumps({'done': True, 'cache': request_cache_state()}) + '\n'
+                finally:
+                    results.close()
+                    # 499: the client went away before the last line
+                    _log_completion(200 if completed else 499)
+
+            g.streaming = True
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        items = [None] * len(destinations)
+        for index, weather_data in results:
+            items[index] = batch_item(index, weather_data)
+
+        return jsonify({'success': True, 'results': items})
+
+    except Exception as e:
+        logger.error("Error fetching batch weather: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/country/<country_name>', methods=['GET'])
 def get_country(country_name):
     """Get country information"""
     try:
-        country_data = country_service.get_country_info(country_name)
+        country_data = get_country_service().get_country_info(country_name)
         
         if country_data:
-            return jsonify(country_data)
+            return cacheable_json(country_data, Config.HTTP_COUNTRY_MAX_AGE, Config.HTTP_COUNTRY_SWR)
         else:
             return jsonify({'error': 'Country not found'}), 404
             
     except Exception as e:
-        logger.error(f"Error fetching country info: {str(e)}")
+        logger.error("Error fetching country info: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.errorhandler(404)
@@ -285,7 +523,11 @@ if __name__ == '__main__':
         logger.info("Configuration validated successfully")
         
         # Start server
-        logger.info(f"Starting Traveller's Assistant on port {Config.PORT}")
+        if Config.WARMUP_ON_START:
+            start_background_warmup()
+        start_refresh_scheduler()
+
+        logger.info("Starting Traveller's Assistant on port %s", Config.PORT)
         app.run(
             host='0.0.0.0',
             port=Config.PORT,
@@ -293,5 +535,5 @@ if __name__ == '__main__':
             use_reloader=False
         )
     except Exception as e:
-        logger.error(f"Failed to start application: {str(e)}")
+        logger.error("Failed to start application: %s", e)
         raise
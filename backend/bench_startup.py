@@ -0,0 +1,60 @@
+"""
+Startup Benchmark
+Measures how long a fresh interpreter takes to import the app in the lazy
+and eager startup modes (what every Render restart / gunicorn worker pays).
+
+Usage:
+    python bench_startup.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Import the app, then report the elapsed time and whether anthropic got loaded
+_PROBE = (
+    "import time, sys; t = time.perf_counter(); import app; "
+    "print(f'{time.perf_counter() - t:.4f} {int(\"anthropic\" in sys.modules)}')"
+)
+
+
+def measure(mode, runs):
+    """Return (import seconds per run, anthropic imported?) for a startup mode"""
+    env = dict(os.environ, STARTUP_MODE=mode, WARMUP_ON_START='False')
+    timings = []
+    anthropic_loaded = False
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', _PROBE], cwd=BACKEND_DIR, env=env,
+            capture_output=True, text=True, check=True
+        )
+        elapsed, loaded = result.stdout.strip().splitlines()[-1].split()
+        timings.append(float(elapsed))
+        anthropic_loaded = loaded == '1'
+    return timings, anthropic_loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app import time per startup mode")
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per mode')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for mode in ('eager', 'lazy'):
+        timings, anthropic_loaded = measure(mode, args.runs)
+        results[mode] = statistics.median(timings)
+        print(f"{mode:>5}: median {results[mode] * 1000:.0f}ms, "
+              f"min {min(timings) * 1000:.0f}ms over {args.runs} runs "
+              f"(anthropic imported: {'yes' if anthropic_loaded else 'no'})")
+
+    saved = results['eager'] - results['lazy']
+    print(f"\nLazy startup saves {saved * 1000:.0f}ms per worker start "
+          f"({saved / results['eager']:.0%} of eager import time)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
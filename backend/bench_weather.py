@@ -0,0 +1,151 @@
+"""
+Weather Aggregation Benchmark
+Compares the per-item dict/datetime aggregation WeatherService used to do
+with the columnar WeatherSeries path, on synthetic payloads shaped like the
+OpenWeatherMap 5-day forecast (40 three-hourly items) and Open-Meteo
+climate ranges (up to Config.MAX_DAYS days).
+
+Usage:
+    python bench_weather.py --locations 500
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from services.weather_series import WeatherSeries, climate_days
+
+_CONDITIONS = ('clear sky', 'few clouds', 'scattered clouds', 'light rain', 'overcast clouds')
+
+
+def make_forecast_items(start_ts, rng):
+    """40 three-hourly items like OpenWeatherMap /forecast 'list'"""
+    return [
+        {
+            'dt': start_ts + i * 10800,
+            'main': {'temp': rng.uniform(5, 30), 'humidity': rng.randint(30, 95)},
+            'weather': [{'description': rng.choice(_CONDITIONS)}],
+            'wind': {'speed': rng.uniform(0, 12)},
+            'pop': rng.random()
+        }
+        for i in range(40)
+    ]
+
+
+def make_climate_daily(start, days, rng):
+    """Open-Meteo climate 'daily' columns"""
+    return {
+        'time': [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)],
+        'temperature_2m_max': [rng.uniform(10, 35) for _ in range(days)],
+        'temperature_2m_min': [rng.uniform(-5, 10) for _ in range(days)],
+        'temperature_2m_mean': [rng.uniform(5, 20) for _ in range(days)],
+        'precipitation_sum': [rng.uniform(0, 8) for _ in range(days)],
+    }
+
+
+def legacy_forecast(items, start_date, end_date):
+    """The previous per-item aggregation, kept here as the baseline"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    daily_data = {}
+    for item in items:
+        dt = datetime.fromtimestamp(item['dt'])
+        date_str = dt.strftime('%Y-%m-%d')
+        if start <= dt <= end + timedelta(days=1):
+            if date_str not in daily_data:
+                daily_data[date_str] = {'temps': [], 'conditions': [], 'rain_chances': [], 'humidity': [], 'wind_speed': []}
+            daily_data[date_str]['temps'].append(item['main']['temp'])
+            daily_data[date_str]['conditions'].append(item['weather'][0]['description'])
+            daily_data[date_str]['rain_chances'].append(item.get('pop', 0) * 100)
+            daily_data[date_str]['humidity'].append(item['main']['humidity'])
+            daily_data[date_str]['wind_speed'].append(item['wind']['speed'])
+
+    forecast = []
+    for date_str, data in sorted(daily_data.items()):
+        forecast.append({
+            'date': date_str,
+            'day': datetime.strptime(date_str, '%Y-%m-%d').strftime('%A'),
+            'temp_max': round(max(data['temps']), 1),
+            'temp_min': round(min(data['temps']), 1),
+            'temp_avg': round(sum(data['temps']) / len(data['temps']), 1),
+            'condition': max(set(data['conditions']), key=data['conditions'].count),
+            'rain_chance': round(max(data['rain_chances'])),
+            'humidity': round(sum(data['humidity']) / len(data['humidity'])),
+            'wind_speed': round(sum(data['wind_speed']) / len(data['wind_speed']), 1)
+        })
+    return forecast
+
+
+def legacy_climate(daily):
+    """The previous per-day climate loop, kept here as the baseline"""
+    forecast = []
+    for i, date_str in enumerate(daily['time']):
+        precip = daily['precipitation_sum'][i]
+        if precip > 5:
+            condition, rain_chance = "rainy", 70
+        elif precip > 2:
+            condition, rain_chance = "partly cloudy with showers", 50
+        elif precip > 0.5:
+            condition, rain_chance = "mostly cloudy", 30
+        else:
+            condition, rain_chance = "mostly sunny", 10
+        forecast.append({
+            'date': date_str,
+            'day': datetime.strptime(date_str, '%Y-%m-%d').strftime('%A'),
+            'temp_max': round(daily['temperature_2m_max'][i], 1),
+            'temp_min': round(daily['temperature_2m_min'][i], 1),
+            'temp_avg': round(daily['temperature_2m_mean'][i], 1),
+            'condition': condition,
+            'rain_chance': rain_chance,
+            'humidity': 65,
+            'wind_speed': 3.5
+        })
+    return forecast
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark weather aggregation")
+    parser.add_argument('--locations', type=int, default=500, help='Synthetic locations per run')
+    parser.add_argument('--climate-days', type=int, default=365, help='Days per climate range')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start_date = today.strftime('%Y-%m-%d')
+    end_date = (today + timedelta(days=4)).strftime('%Y-%m-%d')
+
+    payloads = [make_forecast_items(int(today.timestamp()), rng) for _ in range(args.locations)]
+    series = [WeatherSeries.from_dict(WeatherSeries.from_forecast_items(p).to_dict()) for p in payloads]
+    climates = [make_climate_daily(today, args.climate_days, rng) for _ in range(max(1, args.locations // 10))]
+
+    # Same numbers either way (modal condition ties may resolve differently)
+    strip = lambda days: [{k: v for k, v in d.items() if k != 'condition'} for d in days]
+    assert strip(legacy_forecast(payloads[0], start_date, end_date)) == strip(series[0].daily_summary(start_date, end_date))
+    assert legacy_climate(climates[0]) == climate_days(climates[0])
+
+    results = [
+        ('forecast aggregation (legacy)', timed(lambda: [legacy_forecast(p, start_date, end_date) for p in payloads], args.repeat)),
+        ('forecast aggregation (series)', timed(lambda: [s.daily_summary(start_date, end_date) for s in series], args.repeat)),
+        ('forecast ingest + aggregate (series)', timed(
+            lambda: [WeatherSeries.from_forecast_items(p).daily_summary(start_date, end_date) for p in payloads], args.repeat)),
+        (f'climate {args.climate_days}d (legacy)', timed(lambda: [legacy_climate(c) for c in climates], args.repeat)),
+        (f'climate {args.climate_days}d (columnar)', timed(lambda: [climate_days(c) for c in climates], args.repeat)),
+    ]
+
+    print(f"{args.locations} forecast locations, {len(climates)} climate ranges, averaged over {args.repeat} runs:")
+    for name, elapsed in results:
+        print(f"  {name:<40} {elapsed / args.repeat * 1000:8.1f}ms per run")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
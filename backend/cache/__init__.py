@@ -0,0 +1,57 @@
+"""
+Cache package
+One cache interface over interchangeable backends:
+    memory  - in-process LRU (per worker)
+    sqlite  - shared on-disk store for all workers on the host
+    redis   - any Redis-protocol server (or the local stand-in)
+"""
+import logging
+import threading
+
+from config import Config
+from .core import Cache, CacheStats, cache_only, is_cache_only, request_cache_state, start_request_tracking
+from .memory import MemoryBackend
+from .sqlite import SQLiteBackend
+from .redis_backend import RedisBackend
+
+logger = logging.getLogger(__name__)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def create_backend(kind=None):
+    """Build the backend selected by Config.CACHE_BACKEND"""
+    kind = (kind or Config.CACHE_BACKEND).lower()
+    if kind == 'sqlite':
+        return SQLiteBackend(Config.CACHE_SQLITE_PATH, max_entries=Config.CACHE_MAX_ENTRIES)
+    if kind == 'redis':
+        return RedisBackend(Config.CACHE_REDIS_URL, key_prefix=Config.CACHE_KEY_PREFIX)
+    if kind != 'memory':
+        logger.warning("Unknown CACHE_BACKEND '%s', using in-process memory cache", kind)
+    return MemoryBackend(max_entries=Config.CACHE_MAX_ENTRIES)
+
+
+def get_cache():
+    """Process-wide cache, created on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = Cache(create_backend())
+                logger.info("Cache initialized with '%s' backend", _cache.backend.name)
+    return _cache
+
+
+def set_cache(cache):
+    """Replace the process-wide cache (tests, custom wiring)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+__all__ = [
+    'Cache', 'CacheStats', 'MemoryBackend', 'SQLiteBackend', 'RedisBackend',
+    'create_backend', 'get_cache', 'set_cache', 'cache_only', 'is_cache_only',
+    'request_cache_state', 'start_request_tracking'
+]
@@ -0,0 +1,315 @@
+"""
+Cache core
+Namespaced cache front-end with per-namespace TTLs and hit/miss/eviction stats
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of cache lookups made while handling the current request
+# (used to report X-Cache: HIT / MISS / PARTIAL)
+_request_outcomes = contextvars.ContextVar('cache_request_outcomes', default=None)
+
+# Set inside cache_only(): get_or_set() reads but never loads
+_cache_only = contextvars.ContextVar('cache_only', default=False)
+
+
+def start_request_tracking():
+    """Begin collecting cache outcomes for the current request context"""
+    outcomes = {'hits': 0, 'misses': 0}
+    _request_outcomes.set(outcomes)
+    return outcomes
+
+
+@contextmanager
+def cache_only():
+    """
+    Read-only cache access for the current context
+
+    Inside the block get_or_set() never calls its loader: misses return None
+    and stale entries are served without a background reload, so the code
+    inside makes no upstream calls through the cache.
+    """
+    token = _cache_only.set(True)
+    try:
+        yield
+    finally:
+        _cache_only.reset(token)
+
+
+def is_cache_only():
+    return _cache_only.get()
+
+
+def request_cache_state():
+    """
+    Summarize cache outcomes of the current request
+
+    Returns:
+        'HIT', 'MISS', 'PARTIAL', or None if no cache lookups were made
+    """
+    outcomes = _request_outcomes.get()
+    if not outcomes or not (outcomes['hits'] or outcomes['misses']):
+        return None
+    if not outcomes['misses']:
+        return 'HIT'
+    if not outcomes['hits']:
+        return 'MISS'
+    return 'PARTIAL'
+
+
+class CacheStats:
+    """Per-namespace counters for one process"""
+
+    FIELDS = ('hits', 'misses', 'stale', 'refreshes', 'sets', 'evictions', 'errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, namespace, field, amount=1):
+        with self._lock:
+            self._counters[namespace][field] += amount
+
+    def snapshot(self):
+        """Return a copy of the counters with a hit rate per namespace"""
+        with self._lock:
+            result = {}
+            for namespace, counters in self._counters.items():
+                lookups = counters['hits'] + counters['misses']
+                result[namespace] = dict(counters, hit_rate=round(counters['hits'] / lookups, 3) if lookups else None)
+            return result
+
+
+class Cache:
+    """
+    Namespaced cache over a pluggable backend
+
+    Namespaces (geocode, forecast, climate, country, advice, ...) get their
+    own TTL from Config.CACHE_TTLS, falling back to Config.CACHE_TIMEOUT.
+    Values must be JSON-serializable; the in-process backend returns the
+    stored object itself, so callers should treat cached values as read-only.
+
+    Namespaces listed in Config.CACHE_STALE_GRACE keep entries for that many
+    seconds past their TTL: get() treats them as misses, but get_or_set()
+    serves the stale value and reloads it in the background
+    (stale-while-revalidate).
+    """
+
+    def __init__(self, backend, ttls=None, default_ttl=None, stale_grace=None):
+        self.backend = backend
+        self.ttls = dict(Config.CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = Config.CACHE_TIMEOUT if default_ttl is None else default_ttl
+        self.stale_grace = dict(Config.CACHE_STALE_GRACE if stale_grace is None else stale_grace)
+        self.stats = CacheStats()
+
+        # Single-flight: concurrent loads of the same key wait for one upstream call
+        self._inflight_lock = threading.Lock()
+        self._inflight = {}
+
+        # Background revalidation of stale entries (pool created on first use)
+        self._revalidating = set()
+        self._revalidate_pool = None
+
+    def ttl_for(self, namespace):
+        """TTL in seconds for a namespace"""
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def grace_for(self, namespace):
+        """Seconds a namespace's entries may be served stale after their TTL"""
+        return self.stale_grace.get(namespace, 0)
+
+    @staticmethod
+    def make_key(namespace, key):
+        return f"{namespace}:{key}"
+
+    def get(self, namespace, key):
+        """
+        Look up a value
+
+        Returns:
+            Cached value, or None on a miss (stale entries count as misses)
+        """
+        value, fresh_for = self._lookup(namespace, key)
+        hit = value is not None and fresh_for > 0
+        self._record(namespace, hit)
+        return value if hit else None
+
+    def peek(self, namespace, key):
+        """
+        Look up a fresh value without counting the lookup (for polling)
+
+        Returns:
+            Cached value, or None
+        """
+        value, fresh_for = self._lookup(namespace, key)
+        return value if value is not None and fresh_for > 0 else None
+
+    def freshness(self, namespace, key):
+        """
+        Seconds until an entry goes stale, without counting a lookup
+
+        Returns:
+            Seconds (negative while serving stale), or None if not cached
+        """
+        value, fresh_for = self._lookup(namespace, key)
+        return fresh_for if value is not None else None
+
+    def set(self, namespace, key, value, ttl=None):
+        """Store a value for the namespace TTL (or an explicit ttl), plus its stale grace"""
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        try:
+            evicted = self.backend.set(self.make_key(namespace, key), value, ttl + self.grace_for(namespace))
+        except Exception:
+            self.stats.incr(namespace, 'errors')
+            return
+        self.stats.incr(namespace, 'sets')
+        if evicted:
+            self.stats.incr(namespace, 'evictions', evicted)
+
+    def add(self, namespace, key, value, ttl=None):
+        """
+        Store a value only if nothing is cached under the key (atomic on every backend)
+
+        Returns:
+            True if the value was stored; also True when the backend failed,
+            so callers fall back to doing the work themselves
+        """
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        try:
+            added = self.backend.add(self.make_key(namespace, key), value, ttl + self.grace_for(namespace))
+        except Exception:
+            self.stats.incr(namespace, 'errors')
+            return True
+        if added:
+            self.stats.incr(namespace, 'sets')
+        return added
+
+    def delete(self, namespace, key):
+        try:
+            self.backend.delete(self.make_key(namespace, key))
+        except Exception:
+            self.stats.incr(namespace, 'errors')
+
+    def clear(self, namespace=None):
+        """Remove every entry, or only those in one namespace"""
+        self.backend.clear(self.make_key(namespace, '') if namespace else None)
+
+    def get_or_set(self, namespace, key, loader, ttl=None):
+        """
+        Return the cached value, or call loader() and cache its result
+
+        Empty results (None, {}, []) are returned but not cached, so upstream
+        failures are retried on the next request. Concurrent callers for the
+        same key in this process share a single loader() call. A stale entry
+        (within the namespace's grace) is returned as is while loader() runs
+        in the background. Inside cache_only(), loader() is never called.
+        """
+        value, fresh_for = self._lookup(namespace, key)
+        if value is not None:
+            self._record(namespace, True)
+            if fresh_for <= 0:
+                self.stats.incr(namespace, 'stale')
+                if not _cache_only.get():
+                    self._revalidate(namespace, key, loader, ttl)
+            return value
+        self._record(namespace, False)
+        if _cache_only.get():
+            return None
+
+        full_key = self.make_key(namespace, key)
+        with self._inflight_lock:
+            lock = self._inflight.setdefault(full_key, threading.Lock())
+
+        with lock:
+            # Another thread may have filled it while we waited
+            value, fresh_for = self._lookup(namespace, key)
+            if value is not None and fresh_for > 0:
+                return value
+
+            try:
+                value = loader()
+                if value:
+                    self.set(namespace, key, value, ttl)
+                return value
+            finally:
+                with self._inflight_lock:
+                    self._inflight.pop(full_key, None)
+
+    def refresh(self, namespace, key, loader, ttl=None):
+        """
+        Call loader() now and cache its result, whatever is cached
+
+        Returns:
+            The loaded value (empty results are not cached)
+        """
+        value = loader()
+        self.stats.incr(namespace, 'refreshes')
+        if value:
+            self.set(namespace, key, value, ttl)
+        return value
+
+    def _revalidate(self, namespace, key, loader, ttl):
+        """Reload a stale entry in the background (once per key at a time)"""
+        full_key = self.make_key(namespace, key)
+        with self._inflight_lock:
+            if full_key in self._revalidating:
+                return
+            self._revalidating.add(full_key)
+            if self._revalidate_pool is None:
+                # Created on first use so a preloading gunicorn master starts no threads
+                self._revalidate_pool = ThreadPoolExecutor(
+                    max_workers=Config.CACHE_REVALIDATE_WORKERS, thread_name_prefix='cache-revalidate'
+                )
+
+        def run():
+            try:
+                self.refresh(namespace, key, loader, ttl)
+            except Exception as e:
+                logger.warning("Background refresh of %s failed: %s", full_key, e)
+            finally:
+                with self._inflight_lock:
+                    self._revalidating.discard(full_key)
+
+        self._revalidate_pool.submit(run)
+
+    def _lookup(self, namespace, key):
+        """(value, seconds until stale) or (None, None)"""
+        try:
+            entry = self.backend.get(self.make_key(namespace, key))
+        except Exception:
+            self.stats.incr(namespace, 'errors')
+            return None, None
+        if entry is None:
+            return None, None
+        value, expires_at = entry
+        return value, expires_at - self.grace_for(namespace) - now()
+
+    def summary(self):
+        """Backend description and per-namespace stats for this process"""
+        return {
+            'backend': self.backend.name,
+            'ttls': dict(self.ttls, default=self.default_ttl),
+            'stale_grace': self.stale_grace,
+            'entries': self.backend.size(),
+            'namespaces': self.stats.snapshot()
+        }
+
+    def _record(self, namespace, hit):
+        self.stats.incr(namespace, 'hits' if hit else 'misses')
+        outcomes = _request_outcomes.get()
+        if outcomes is not None:
+            outcomes['hits' if hit else 'misses'] += 1
+
+
+def now():
+    """Wall-clock time used for expiry (shared across processes and hosts)"""
+    return time.time()
@@ -0,0 +1,68 @@
+"""
+In-process LRU cache backend
+"""
+import threading
+from collections import OrderedDict
+
+from .core import now
+
+
+class MemoryBackend:
+    """Size-bounded, thread-safe LRU with per-entry expiry (one per worker process)"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (value, expires_at) or None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= now():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl):
+        """Store a value; returns the number of entries evicted to make room"""
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, now() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def add(self, key, value, ttl):
+        """Store a value only if the key is absent (or expired); True if stored"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] > now():
+                return False
+            self._data[key] = (value, now() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self, prefix=None):
+        with self._lock:
+            if prefix is None:
+                self._data.clear()
+            else:
+                for key in [k for k in self._data if k.startswith(prefix)]:
+                    del self._data[key]
+
+    def size(self):
+        return len(self._data)
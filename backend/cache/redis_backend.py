@@ -0,0 +1,167 @@
+"""
+Redis-protocol cache backend
+
+Speaks RESP directly over a socket, so it works against Redis, Valkey,
+KeyDB or the local stand-in in cache/resp_standin.py without extra
+dependencies. Size bounds and eviction are the server's job (maxmemory
+policy); expiry uses PX so keys disappear at the end of their TTL.
+"""
+import json
+import os
+import socket
+import threading
+from urllib.parse import urlparse, unquote
+
+from .core import now
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RespConnection:
+    """Minimal blocking RESP2 client connection"""
+
+    def __init__(self, host, port, db=0, password=None, username=None, timeout=2.0):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.username = username
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._pid = None
+
+    def connect(self):
+        self._pid = os.getpid()
+        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile('rb')
+        if self.password:
+            args = ('AUTH', self.username, self.password) if self.username else ('AUTH', self.password)
+            self._send(*args)
+        if self.db:
+            self._send('SELECT', self.db)
+
+    def close(self):
+        for handle in (self._file, self._sock):
+            try:
+                if handle:
+                    handle.close()
+            except OSError:
+                pass
+        self._sock = self._file = None
+
+    def execute(self, *args):
+        """Send a command and return its reply, reconnecting once on a dropped socket"""
+        for attempt in (1, 2):
+            try:
+                if self._sock is None or self._pid != os.getpid():
+                    # Never share a socket with a forked worker
+                    self._sock = self._file = None
+                    self.connect()
+                return self._send(*args)
+            except (OSError, EOFError):
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def _send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b''.join(parts))
+        return self._read()
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise EOFError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RespError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise RespError(f"Unexpected reply type: {line!r}")
+
+
+class RedisBackend:
+    """Cache backend on any Redis-protocol server"""
+
+    name = 'redis'
+
+    def __init__(self, url='redis://localhost:6379/0', key_prefix='ta:', timeout=2.0):
+        parsed = urlparse(url)
+        self.key_prefix = key_prefix
+        self._conn = RespConnection(
+            parsed.hostname or 'localhost',
+            parsed.port or 6379,
+            db=int(parsed.path.lstrip('/') or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+            username=unquote(parsed.username) if parsed.username else None,
+            timeout=timeout
+        )
+        # One connection shared by the worker's threads; commands are tiny
+        self._lock = threading.Lock()
+
+    def _execute(self, *args):
+        with self._lock:
+            return self._conn.execute(*args)
+
+    def get(self, key):
+        """Return (value, expires_at) or None"""
+        raw = self._execute('GET', self.key_prefix + key)
+        if raw is None:
+            return None
+        envelope = json.loads(raw)
+        if envelope['e'] <= now():
+            return None
+        return envelope['v'], envelope['e']
+
+    def set(self, key, value, ttl):
+        """Store a value with server-side expiry; eviction is left to the server"""
+        envelope = json.dumps({'v': value, 'e': now() + ttl}, separators=(',', ':'))
+        self._execute('SET', self.key_prefix + key, envelope, 'PX', max(1, int(ttl * 1000)))
+        return 0
+
+    def add(self, key, value, ttl):
+        """Store a value only if the key is absent (SET NX); True if stored"""
+        envelope = json.dumps({'v': value, 'e': now() + ttl}, separators=(',', ':'))
+        reply = self._execute('SET', self.key_prefix + key, envelope, 'PX', max(1, int(ttl * 1000)), 'NX')
+        return reply is not None
+
+    def delete(self, key):
+        self._execute('DEL', self.key_prefix + key)
+
+    def _scan(self, prefix=None):
+        """Yield batches of this cache's keys (optionally under a sub-prefix)"""
+        pattern = self.key_prefix + (prefix or '') + '*'
+        cursor = '0'
+        while True:
+            cursor, keys = self._execute('SCAN', cursor, 'MATCH', pattern, 'COUNT', 500)
+            if keys:
+                yield keys
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            if cursor == '0':
+                break
+
+    def clear(self, prefix=None):
+        for keys in self._scan(prefix):
+            self._execute('DEL', *keys)
+
+    def size(self):
+        """Entries under this cache's key prefix (other data in the database is not counted)"""
+        return sum(len(keys) for keys in self._scan())
@@ -0,0 +1,134 @@
+"""
+Local Redis-protocol stand-in
+
+A tiny in-process RESP server implementing the commands RedisBackend uses
+(PING, AUTH, SELECT, GET, SET [PX] [NX], DEL, SCAN, DBSIZE, FLUSHDB). Meant for
+tests and local development without a Redis install:
+
+    server = LocalRespServer()
+    server.start()
+    backend = RedisBackend(server.url)
+"""
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Handle one client connection"""
+
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            self.wfile.write(self.server.dispatch(args))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command (e.g. from telnet)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+class LocalRespServer(socketserver.ThreadingTCPServer):
+    """Threaded RESP server holding keys in memory"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _RespHandler)
+        self._data = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def dispatch(self, args):
+        command = args[0].decode().upper()
+        handler = getattr(self, f"_cmd_{command.lower()}", None)
+        if handler is None:
+            return f"-ERR unknown command '{command}'\r\n".encode()
+        with self._lock:
+            return handler(args[1:])
+
+    def _alive(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            return None
+        return value
+
+    def _cmd_ping(self, args):
+        return b"+PONG\r\n"
+
+    def _cmd_auth(self, args):
+        return b"+OK\r\n"
+
+    def _cmd_select(self, args):
+        return b"+OK\r\n"
+
+    def _cmd_get(self, args):
+        value = self._alive(args[0])
+        return b"$-1\r\n" if value is None else _bulk(value)
+
+    def _cmd_set(self, args):
+        key, value = args[0], args[1]
+        expires_at = None
+        options = [a.decode().upper() for a in args[2:]]
+        if 'PX' in options:
+            expires_at = time.time() + int(options[options.index('PX') + 1]) / 1000
+        elif 'EX' in options:
+            expires_at = time.time() + int(options[options.index('EX') + 1])
+        if 'NX' in options and self._alive(key) is not None:
+            return b"$-1\r\n"
+        self._data[key] = (value, expires_at)
+        return b"+OK\r\n"
+
+    def _cmd_del(self, args):
+        removed = sum(1 for key in args if self._data.pop(key, None) is not None)
+        return b":%d\r\n" % removed
+
+    def _cmd_scan(self, args):
+        options = [a.decode() for a in args[1:]]
+        pattern = options[options.index('MATCH') + 1] if 'MATCH' in options else '*'
+        keys = [k for k in list(self._data) if self._alive(k) is not None and fnmatch.fnmatchcase(k.decode(), pattern)]
+        return b"*2\r\n" + _bulk(b'0') + b"*%d\r\n" % len(keys) + b''.join(_bulk(k) for k in keys)
+
+    def _cmd_dbsize(self, args):
+        return b":%d\r\n" % sum(1 for k in list(self._data) if self._alive(k) is not None)
+
+    def _cmd_flushdb(self, args):
+        self._data.clear()
+        return b"+OK\r\n"
+
+
+def _bulk(value):
+    return b"$%d\r\n%s\r\n" % (len(value), value)
@@ -0,0 +1,133 @@
+"""
+Shared on-disk cache backend (SQLite, memory-mapped)
+
+Every gunicorn worker on the host opens the same database file, so one
+worker's upstream lookup warms the cache for all of them.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+from .core import now
+
+# Check the size bound every N writes rather than on each one
+_EVICTION_CHECK_INTERVAL = 64
+
+# Only rewrite accessed_at when it is older than this, to keep reads cheap
+_TOUCH_RESOLUTION = 60
+
+
+class SQLiteBackend:
+    """Size-bounded cache in a local SQLite file (WAL mode, mmap reads)"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, max_entries=5000, mmap_size=64 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)")
+
+    def _conn(self):
+        """
+        One connection per thread; sqlite3 connections are not thread-safe.
+        Connections inherited from a preloading parent process are replaced.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """Return (value, expires_at) or None"""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at, accessed_at = row
+        current = now()
+        if expires_at <= current:
+            conn.execute("DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?", (key, current))
+            return None
+        if current - accessed_at > _TOUCH_RESOLUTION:
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (current, key))
+
+        return json.loads(value), expires_at
+
+    def set(self, key, value, ttl):
+        """Store a value; returns the number of entries evicted to make room"""
+        current = now()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, separators=(',', ':')), current + ttl, current)
+        )
+
+        with self._writes_lock:
+            self._writes += 1
+            check = self._writes % _EVICTION_CHECK_INTERVAL == 0
+        return self._evict(conn, current) if check else 0
+
+    def add(self, key, value, ttl):
+        """Store a value only if the key is absent (or expired); True if stored"""
+        current = now()
+        # The upsert only overwrites an expired row, atomically across workers
+        cursor = self._conn().execute(
+            "INSERT INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at,"
+            " accessed_at = excluded.accessed_at WHERE cache_entries.expires_at <= excluded.accessed_at",
+            (key, json.dumps(value, separators=(',', ':')), current + ttl, current)
+        )
+        return cursor.rowcount == 1
+
+    def _evict(self, conn, current):
+        """Drop expired entries, then least recently used ones above the bound"""
+        conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (current,))
+        count = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            " SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)",
+            (excess,)
+        )
+        return excess
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self, prefix=None):
+        conn = self._conn()
+        if prefix is None:
+            conn.execute("DELETE FROM cache_entries")
+        else:
+            escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conn.execute("DELETE FROM cache_entries WHERE key LIKE ? ESCAPE '\\'", (escaped + '%',))
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
@@ -0,0 +1,15 @@
+"""
+Concurrency helpers
+"""
+import contextvars
+
+
+def submit_with_context(pool, fn, *args, **kwargs):
+    """
+    Submit fn to an executor, running it in a copy of the caller's context
+
+    Keeps per-request context (cache hit/miss tracking, request IDs) visible
+    to work fanned out to pool threads.
+    """
+    context = contextvars.copy_context()
+    return pool.submit(context.run, fn, *args, **kwargs)
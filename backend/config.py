@@ -24,11 +24,176 @@ class Config:
     OPENWEATHER_BASE_URL = 'https://api.openweathermap.org/data/2.5'
     REST_COUNTRIES_BASE_URL = 'https://restcountries.com/v3.1'
     EXCHANGE_RATE_BASE_URL = 'https://v6.exchangerate-api.com/v6'
+    EXCHANGE_RATE_BASE_CURRENCY = os.getenv('EXCHANGE_RATE_BASE_CURRENCY', 'USD')
+    EXCHANGE_RATE_TIMEOUT = 3  # seconds; the rate lookup sits on the prompt-building path
+    EXCHANGE_RATE_RETRY_SECONDS = 300  # after a failed fetch, plans go without rates this long
     
     # App Settings
     MAX_TRAVELERS = 20
     MAX_DAYS = 365
+    ITINERARY_MAX_LEGS = 10
+    ITINERARY_MAX_WORKERS = 6
+    FORECAST_HORIZON_DAYS = 5  # OpenWeatherMap free forecast range
+    WEATHER_BATCH_MAX = 50
+    WEATHER_BATCH_WORKERS = 8
+    # Destinations within this distance of a location already fetched reuse
+    # its forecast and climate series (0 disables). Kept small: weather can
+    # differ a lot over tens of km (coast vs. hills), and the index is per
+    # worker, so workers may pick different neighbours for the same place.
+    WEATHER_REUSE_RADIUS_KM = float(os.getenv('WEATHER_REUSE_RADIUS_KM', 5))
+    WEATHER_INDEX_MAX_POINTS = 10000
     CACHE_TIMEOUT = 3600  # 1 hour
+
+    # Cache backend: memory (per worker), sqlite (shared on this host) or redis.
+    # With several gunicorn workers the default is sqlite, so cached data and
+    # duplicate-submission claims are shared between them
+    CACHE_BACKEND = os.getenv(
+        'CACHE_BACKEND', 'sqlite' if int(os.getenv('WEB_CONCURRENCY', 1)) > 1 else 'memory'
+    )
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 5000))
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', '/tmp/travellers-assistant/cache.sqlite3')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'ta:')
+
+    # Per-namespace TTLs (seconds); unlisted namespaces use CACHE_TIMEOUT
+    CACHE_TTLS = {
+        'geocode': int(os.getenv('CACHE_TTL_GEOCODE', 30 * 86400)),
+        'forecast': int(os.getenv('CACHE_TTL_FORECAST', CACHE_TIMEOUT)),
+        'climate': int(os.getenv('CACHE_TTL_CLIMATE', 7 * 86400)),
+        'country': int(os.getenv('CACHE_TTL_COUNTRY', 7 * 86400)),
+        'advice': int(os.getenv('CACHE_TTL_ADVICE', 6 * 3600)),
+        'exchange_rates': int(os.getenv('CACHE_TTL_EXCHANGE_RATES', 86400)),
+        # Replay window for completed plan submissions
+        'idempotency': int(os.getenv('IDEMPOTENCY_REPLAY_SECONDS', 300)),
+    }
+    # Stale-while-revalidate: seconds past the TTL an entry may still be
+    # served by get_or_set() while it is reloaded in the background
+    CACHE_STALE_GRACE = {
+        'forecast': int(os.getenv('CACHE_GRACE_FORECAST', 1800)),
+        'climate': int(os.getenv('CACHE_GRACE_CLIMATE', 86400)),
+        'country': int(os.getenv('CACHE_GRACE_COUNTRY', 86400)),
+        'advice': int(os.getenv('CACHE_GRACE_ADVICE', 3600)),
+    }
+    CACHE_REVALIDATE_WORKERS = 2
+
+    # Claude routing per call type: full plan, section subsets (itinerary
+    # legs/countries) and follow-up Q&A. With CLAUDE_HEDGING on, a call still
+    # running after its SLO budget is duplicated on the hedge model (only when
+    # that is a different model); first answer wins.
+    CLAUDE_MODELS = {
+        'plan': os.getenv('CLAUDE_PLAN_MODEL', 'claude-haiku-4-5'),
+        'section': os.getenv('CLAUDE_SECTION_MODEL', 'claude-haiku-4-5'),
+        'qa': os.getenv('CLAUDE_QA_MODEL', 'claude-haiku-4-5'),
+    }
+    CLAUDE_HEDGE_MODELS = {
+        'plan': os.getenv('CLAUDE_PLAN_HEDGE_MODEL', CLAUDE_MODELS['plan']),
+        'section': os.getenv('CLAUDE_SECTION_HEDGE_MODEL', CLAUDE_MODELS['section']),
+        'qa': os.getenv('CLAUDE_QA_HEDGE_MODEL', CLAUDE_MODELS['qa']),
+    }
+    CLAUDE_SLO_SECONDS = {
+        'plan': float(os.getenv('CLAUDE_PLAN_SLO', 60)),
+        'section': float(os.getenv('CLAUDE_SECTION_SLO', 30)),
+        'qa': float(os.getenv('CLAUDE_QA_SLO', 8)),
+    }
+    # Plans and sections size max_tokens from the prompt budget below
+    CLAUDE_MAX_TOKENS = {
+        'qa': int(os.getenv('CLAUDE_QA_MAX_TOKENS', 400)),
+    }
+    CLAUDE_HEDGING = os.getenv('CLAUDE_HEDGING', 'False') == 'True'
+    CLAUDE_MAX_CONCURRENT_CALLS = int(os.getenv('CLAUDE_MAX_CONCURRENT_CALLS', 16))
+    # Hedges run on their own threads; with all of them busy, calls are not hedged
+    CLAUDE_MAX_HEDGE_CALLS = int(os.getenv('CLAUDE_MAX_HEDGE_CALLS', 4))
+    MODEL_LATENCY_WINDOW = 50  # recent calls per model and call type (latency and TTFT)
+
+    # Prompt budget: daily weather lines beyond this are summarized by week;
+    # output max_tokens = base + per section + per trip day (capped)
+    PROMPT_MAX_WEATHER_DAYS = 14
+    PROMPT_BASE_OUTPUT_TOKENS = 600
+    PROMPT_TOKENS_PER_SECTION = 650
+    PROMPT_TOKENS_PER_TRIP_DAY = 20
+    PROMPT_MIN_OUTPUT_TOKENS = 1500
+    PROMPT_MAX_OUTPUT_TOKENS = 12000
+
+    # Startup: 'lazy' builds services (and imports anthropic/httpx) on first
+    # use; 'eager' builds them at import time
+    STARTUP_MODE = os.getenv('STARTUP_MODE', 'lazy')
+    # Gunicorn worker processes (shared budgets are split between them)
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+    # Share the imported app and warmed caches across gunicorn workers
+    GUNICORN_PRELOAD = os.getenv('GUNICORN_PRELOAD', 'False') == 'True'
+    # Gunicorn kills a worker whose request runs longer than this
+    GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+    # Duplicate plan submissions: how long a duplicate waits for the original
+    # (kept well below GUNICORN_TIMEOUT so it can still answer 409), how often
+    # it polls for a generation running in another worker, and how long a
+    # claim on a key lasts if its worker dies mid-generation
+    IDEMPOTENCY_WAIT_TIMEOUT = min(
+        int(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', GUNICORN_TIMEOUT * 3 // 4)), GUNICORN_TIMEOUT * 3 // 4
+    )
+    IDEMPOTENCY_RETRY_AFTER = 10  # Retry-After (seconds) when that wait runs out
+    IDEMPOTENCY_POLL_INTERVAL = 0.25
+    IDEMPOTENCY_CLAIM_TTL = GUNICORN_TIMEOUT
+    # Prime geocode/forecast/country caches for popular destinations on start
+    WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'True') == 'True'
+    WARMUP_DESTINATIONS = [
+        d.strip() for d in os.getenv(
+            'WARMUP_DESTINATIONS',
+            'Paris, France;London, United Kingdom;Rome, Italy;Tokyo, Japan;'
+            'New York, United States;Barcelona, Spain;Amsterdam, Netherlands;'
+            'Bangkok, Thailand;Dubai, United Arab Emirates;Singapore'
+        ).split(';') if d.strip()
+    ]
+    WARMUP_WORKERS = 4
+    # /api/prefetch: background lookups while the user fills in the form
+    PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', 4))
+    PREFETCH_MAX_PENDING = int(os.getenv('PREFETCH_MAX_PENDING', 32))
+    # Background refresh of the most requested destinations' forecast,
+    # country and advice entries before they expire, while the worker is idle
+    REFRESH_ENABLED = os.getenv('REFRESH_ENABLED', 'True') == 'True'
+    REFRESH_INTERVAL = int(os.getenv('REFRESH_INTERVAL', 60))  # seconds between passes
+    REFRESH_TOP_K = int(os.getenv('REFRESH_TOP_K', 20))
+    REFRESH_TRACKED_MAX = 500  # destinations whose popularity is tracked
+    REFRESH_HALF_LIFE = int(os.getenv('REFRESH_HALF_LIFE', 6 * 3600))  # popularity decay (seconds)
+    REFRESH_AHEAD_FRACTION = 0.2  # refresh entries in the last 20% of their TTL
+    REFRESH_IDLE_MAX_ACTIVE = int(os.getenv('REFRESH_IDLE_MAX_ACTIVE', 0))  # in-flight requests still "idle"
+    # Upstream calls the scheduler may make per rolling hour across all
+    # WEB_CONCURRENCY workers, e.g. "weather=120,country=30,advice=12"
+    REFRESH_BUDGET = {
+        name.strip(): int(limit)
+        for name, _, limit in (
+            item.partition('=') for item in os.getenv('REFRESH_BUDGET', 'weather=120,country=30,advice=12').split(',')
+        )
+        if name.strip() and limit.strip()
+    }
+
+    # HTTP cache lifetimes for read endpoints (seconds)
+    # OpenWeatherMap refreshes its 5-day forecast every 3 hours; climate
+    # normals and country facts change far less often.
+    HTTP_FORECAST_MAX_AGE = int(os.getenv('HTTP_FORECAST_MAX_AGE', 1800))
+    HTTP_FORECAST_SWR = int(os.getenv('HTTP_FORECAST_SWR', 3600))
+    HTTP_CLIMATE_MAX_AGE = int(os.getenv('HTTP_CLIMATE_MAX_AGE', 86400))
+    HTTP_CLIMATE_SWR = int(os.getenv('HTTP_CLIMATE_SWR', 604800))
+    HTTP_COUNTRY_MAX_AGE = int(os.getenv('HTTP_COUNTRY_MAX_AGE', 604800))
+    HTTP_COUNTRY_SWR = int(os.getenv('HTTP_COUNTRY_SWR', 2592000))
+
+    # Logging: records are queued and written by a background thread
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json | text
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    # Kept fraction of sub-WARNING records per logger, e.g. "services.weather_service=0.1,cache=0.5"
+    LOG_SAMPLING = {
+        name.strip(): float(rate)
+        for name, _, rate in (item.partition('=') for item in os.getenv('LOG_SAMPLING', '').split(','))
+        if name.strip() and rate.strip()
+    }
+
+    # Response shaping and compression
+    DEFAULT_RESPONSE_PROFILE = os.getenv('DEFAULT_RESPONSE_PROFILE', 'full')  # full | slim | sections
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'True') == 'True'
+    COMPRESS_MIN_SIZE = 1024  # bytes
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 5
     
     @staticmethod
     def validate_config():
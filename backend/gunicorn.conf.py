@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for Traveller's Assistant
+
+Loaded automatically when gunicorn starts from the backend directory.
+
+With GUNICORN_PRELOAD=True the app is imported once in the master and the
+caches are warmed there before workers fork, so every worker starts with
+the same read-only data (country index, plug tables, warmed in-process
+cache) shared copy-on-write. Without preload each worker warms itself in
+the background after it boots; with a shared cache backend (sqlite/redis)
+only the first one actually reaches upstream APIs.
+"""
+import os
+
+from config import Config
+
+bind = f"0.0.0.0:{os.getenv('PORT', Config.PORT)}"
+workers = Config.WEB_CONCURRENCY
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = Config.GUNICORN_TIMEOUT
+preload_app = Config.GUNICORN_PRELOAD
+
+
+def when_ready(server):
+    """Master is ready; workers fork right after this returns"""
+    if preload_app and Config.WARMUP_ON_START:
+        from warmup import warm_caches
+        warm_caches()
+
+
+def post_worker_init(worker):
+    """Warm the worker's caches unless the master already did; start its refresh thread"""
+    if not preload_app and Config.WARMUP_ON_START:
+        from warmup import start_background_warmup
+        start_background_warmup()
+
+    from refresh_scheduler import start_refresh_scheduler
+    start_refresh_scheduler()
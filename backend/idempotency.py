@@ -0,0 +1,191 @@
+"""
+Idempotent request handling
+Duplicate plan submissions (double-clicks, retries after a slow response)
+share one generation instead of each starting their own.
+
+A request's key is the client's Idempotency-Key header, or a hash of the
+normalized payload. Before generating, a request claims the key in the cache
+('idempotency' namespace, add-if-absent). Duplicates in the same process wait
+on the owner's Future; duplicates in other workers see the claim and poll the
+cache for the result. Once it completes, the result is replayed for
+Config.CACHE_TTLS['idempotency'] seconds.
+
+Across workers this needs a shared cache backend (sqlite or redis); the
+memory backend only deduplicates within one worker.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from flask import jsonify
+
+from cache import get_cache
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Outcomes: the request ran the work, joined a running duplicate, or was replayed
+NEW, JOINED, REPLAYED = 'new', 'joined', 'replayed'
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class IdempotencyConflict(Exception):
+    """A client key was reused with a different payload"""
+
+
+class IdempotencyInProgress(Exception):
+    """The original request is still running after a duplicate's wait ran out"""
+
+    def __init__(self, key, retry_after):
+        super().__init__(key)
+        self.retry_after = retry_after
+
+
+def _normalize(value):
+    """Collapse whitespace in strings so trivially different payloads match"""
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def payload_fingerprint(payload, ignore=()):
+    """sha256 of the normalized payload (canonical JSON), minus ignored top-level fields"""
+    body = {key: value for key, value in (payload or {}).items() if key not in ignore}
+    canonical = json.dumps(_normalize(body), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def idempotency_key(scope, payload, client_key=None, ignore=()):
+    """
+    Key and payload fingerprint for a request
+
+    Args:
+        scope: Endpoint name, so keys from different endpoints never collide
+        payload: Request JSON
+        client_key: Idempotency-Key header value, if the client sent one
+        ignore: Top-level payload fields that do not change the result
+            (e.g. the response profile, which is applied afterwards)
+
+    Returns:
+        Tuple of (key, fingerprint)
+    """
+    fingerprint = payload_fingerprint(payload, ignore)
+    if client_key:
+        return f"{scope}:client:{client_key.strip()[:128]}", fingerprint
+    return f"{scope}:payload:{fingerprint}", fingerprint
+
+
+def run_idempotent(key, fingerprint, work):
+    """
+    Run work() once per key
+
+    Args:
+        key: From idempotency_key
+        fingerprint: Payload fingerprint for the same request
+        work: Callable producing a JSON-serializable result
+
+    Returns:
+        Tuple of (result, outcome) where outcome is NEW, JOINED or REPLAYED
+
+    Raises:
+        IdempotencyConflict: The key belongs to a different payload
+        IdempotencyInProgress: A duplicate waited Config.IDEMPOTENCY_WAIT_TIMEOUT
+            seconds and the original is still running
+    """
+    cache = get_cache()
+    stored = cache.get('idempotency', key)
+    if stored and 'result' in stored:
+        return _check(stored, fingerprint)['result'], REPLAYED
+
+    with _inflight_lock:
+        running = _inflight.get(key)
+        if running is None:
+            future = Future()
+            _inflight[key] = (fingerprint, future)
+
+    if running is not None:
+        running_fingerprint, future = running
+        if running_fingerprint != fingerprint:
+            raise IdempotencyConflict(key)
+        logger.info("Duplicate request joined in-flight generation %s", key[:48])
+        try:
+            return future.result(timeout=Config.IDEMPOTENCY_WAIT_TIMEOUT), JOINED
+        except FutureTimeoutError:
+            raise IdempotencyInProgress(key, Config.IDEMPOTENCY_RETRY_AFTER) from None
+
+    try:
+        result, outcome = _run_claimed(cache, key, fingerprint, work)
+        future.set_result(result)
+        return result, outcome
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _run_claimed(cache, key, fingerprint, work):
+    """
+    Run work() under a cache claim on the key, or wait for another worker's claim
+
+    Returns:
+        Tuple of (result, outcome)
+    """
+    deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT_TIMEOUT
+    waited = False
+    claim = {'fingerprint': fingerprint, 'pending': True}
+    while not cache.add('idempotency', key, claim, ttl=Config.IDEMPOTENCY_CLAIM_TTL):
+        stored = cache.peek('idempotency', key)
+        if stored:
+            _check(stored, fingerprint)
+            if 'result' in stored:
+                return stored['result'], JOINED if waited else REPLAYED
+        # No entry: the other worker failed and released its claim, so try again
+        if time.monotonic() >= deadline:
+            raise IdempotencyInProgress(key, Config.IDEMPOTENCY_RETRY_AFTER)
+        if not waited:
+            logger.info("Duplicate request waiting for generation %s in another worker", key[:48])
+            waited = True
+        time.sleep(Config.IDEMPOTENCY_POLL_INTERVAL)
+
+    try:
+        result = work()
+    except BaseException:
+        # Release the claim so a retry (or a waiting duplicate) can run it
+        cache.delete('idempotency', key)
+        raise
+    cache.set('idempotency', key, {'fingerprint': fingerprint, 'result': result})
+    return result, NEW
+
+
+def _check(stored, fingerprint):
+    if stored.get('fingerprint') != fingerprint:
+        raise IdempotencyConflict()
+    return stored
+
+
+def in_progress_response(error):
+    """409 telling the client to retry once the original request has finished"""
+    response = jsonify({'error': 'An identical request is still being processed, retry shortly'})
+    response.status_code = 409
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def add_idempotency_headers(response, key, outcome):
+    """Tell the client whether the response was shared with an earlier request"""
+    response.headers['Idempotency-Replayed'] = 'false' if outcome == NEW else 'true'
+    if key.split(':', 2)[1] == 'client':
+        response.headers[IDEMPOTENCY_HEADER] = key.split(':', 2)[2]
+    return response
@@ -0,0 +1,219 @@
+"""
+Logging setup
+Non-blocking, structured logging for the web app
+
+Request threads only put records on a bounded in-memory queue; a
+QueueListener thread formats them and writes to the sink, so a slow stdout or
+log collector never stalls a request. When the queue is full, records are
+dropped and counted rather than blocking. Message formatting (msg % args)
+also happens on the listener thread, so loggers should pass arguments
+instead of pre-formatting f-strings.
+
+Each record carries the current request ID, and per-stage durations collected
+with stage() are reported on the request's completion record.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from config import Config
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+_stage_timings = contextvars.ContextVar('stage_timings', default=None)
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+def start_request(request_id=None):
+    """Begin a request context: set its ID and reset stage timings"""
+    request_id = request_id or uuid.uuid4().hex[:16]
+    _request_id.set(request_id)
+    _stage_timings.set({})
+    return request_id
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def stage_timings():
+    """Stage name -> milliseconds for the current request"""
+    return dict(_stage_timings.get() or {})
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a stage of the current request
+
+    Usage:
+        with stage('weather'):
+            weather_data = ...
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _stage_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0) + round((time.perf_counter() - started) * 1000, 1)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request_id, plus extra fields"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != 'request_id':
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic format, with the request ID when there is one"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        request_id = getattr(record, 'request_id', None)
+        return f"{line} [{request_id}]" if request_id else line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of records below WARNING for the configured loggers
+
+    Rates apply to a logger and its children, e.g. {'services.weather_service': 0.1}
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = dict(rates)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return random.random() < rate
+            name = name.rpartition('.')[0]
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Attach the request ID here (the listener thread has no request
+        # context) but leave message formatting to the listener
+        record.request_id = _request_id.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room in a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def configure_logging(level=None, fmt=None, sampling=None, queue_size=None, stream=None):
+    """
+    Route all logging through a bounded queue to a background writer
+
+    Args:
+        level: Root level (default: Config.LOG_LEVEL)
+        fmt: 'json' or 'text' (default: Config.LOG_FORMAT)
+        sampling: Logger name -> kept fraction (default: Config.LOG_SAMPLING)
+        queue_size: Maximum queued records (default: Config.LOG_QUEUE_SIZE)
+        stream: Output stream (default: stderr)
+
+    Returns:
+        The queue handler installed on the root logger
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    log_queue = queue.Queue(maxsize=queue_size or Config.LOG_QUEUE_SIZE)
+    sink = logging.StreamHandler(stream or sys.stderr)
+    sink.setFormatter(JsonFormatter() if (fmt or Config.LOG_FORMAT) == 'json' else TextFormatter())
+
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(Config.LOG_SAMPLING if sampling is None else sampling))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level or Config.LOG_LEVEL)
+
+    _listener = _Listener(log_queue, sink, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork():
+    # Threads do not survive fork: a preloading gunicorn master's listener
+    # is gone in each worker, so start the worker's own on a fresh queue
+    global _listener
+    if _listener is None:
+        return
+    handler = next(
+        (h for h in logging.getLogger().handlers if isinstance(h, NonBlockingQueueHandler)), None
+    )
+    if handler is None:
+        return
+    handler.queue = queue.Queue(maxsize=handler.queue.maxsize)
+    _listener = _Listener(handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+atexit.register(stop_logging)
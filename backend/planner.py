@@ -0,0 +1,227 @@
+"""
+Trip Planner
+Shared lookup logic for single-destination plans and multi-leg itineraries
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import Config
+from concurrency import submit_with_context
+from logging_setup import stage
+from services import get_claude_service, get_country_service, get_weather_service
+
+logger = logging.getLogger(__name__)
+
+# Itinerary sections generated once per country vs. once per leg (city)
+COUNTRY_SECTIONS = ('currency_payments', 'cultural_guide', 'practical_info', 'safety_health')
+LEG_SECTIONS = ('accommodation', 'transportation', 'food_dining', 'activities', 'packing')
+# Trip-wide answers are generated once, with the first country's sections
+TRIP_SECTIONS = ('specific_answers',)
+
+# Traveler fields shared by every leg of an itinerary
+_PROFILE_FIELDS = ('purpose', 'travelers', 'food_preferences', 'accommodation')
+
+
+def trip_duration(dates):
+    """Inclusive number of days between dates['start'] and dates['end']"""
+    start_date = datetime.strptime(dates['start'], '%Y-%m-%d')
+    end_date = datetime.strptime(dates['end'], '%Y-%m-%d')
+    return (end_date - start_date).days + 1
+
+
+def resolve_country_data(destination, weather_data):
+    """
+    Look up country information for a destination
+
+    Prefers the ISO code from geocoding; falls back to the last part of the
+    destination string ("Paris, France" -> "France").
+    """
+    country_data = None
+
+    if weather_data and weather_data.get('coordinates', {}).get('country'):
+        country_code = weather_data['coordinates']['country']
+        logger.info("Using country code from geocoding: %s", country_code)
+        country_data = get_country_service().get_country_info_by_code(country_code)
+
+    if not country_data:
+        country_name = destination.split(',')[-1].strip() if ',' in destination else destination
+        logger.info("Fallback: trying country name '%s' from destination", country_name)
+        country_data = get_country_service().get_country_info(country_name)
+
+    return country_data
+
+
+def validate_legs(legs):
+    """
+    Check an itinerary's legs
+
+    Returns:
+        Error message, or None if the legs are valid
+    """
+    if not isinstance(legs, list) or not legs:
+        return "legs must be a non-empty list"
+    if len(legs) > Config.ITINERARY_MAX_LEGS:
+        return f"At most {Config.ITINERARY_MAX_LEGS} legs are supported"
+
+    for i, leg in enumerate(legs, 1):
+        if not isinstance(leg, dict) or not leg.get('destination'):
+            return f"Leg {i} is missing a destination"
+        dates = leg.get('dates') or {}
+        if not dates.get('start') or not dates.get('end'):
+            return f"Leg {i} is missing start/end dates"
+        try:
+            duration = trip_duration(dates)
+            if duration < 1:
+                return f"Leg {i} ends before it starts"
+            if duration > Config.MAX_DAYS:
+                return f"Leg {i} is longer than {Config.MAX_DAYS} days"
+        except ValueError:
+            return f"Leg {i} has invalid dates (expected YYYY-MM-DD)"
+
+    return None
+
+
+def plan_itinerary(payload):
+    """
+    Plan a multi-leg trip with deduplicated, parallel lookups
+
+    Weather for every leg is fetched concurrently; country information is
+    fetched once per ISO code; country-level advice (currency, culture,
+    practical info, safety) is generated once per country and city-level
+    advice (accommodation, transport, food, activities, packing) once per leg.
+
+    Args:
+        payload: {"legs": [{"destination", "dates": {"start", "end"}}, ...],
+                  plus the single-plan traveler fields}
+
+    Returns:
+        Dictionary with per-leg and per-country results
+    """
+    legs = [
+        {
+            'destination': leg['destination'],
+            'dates': dict(leg['dates'], duration_days=trip_duration(leg['dates']))
+        }
+        for leg in payload['legs']
+    ]
+    profile = {field: payload[field] for field in _PROFILE_FIELDS if field in payload}
+    route = ' → '.join(
+        f"{leg['destination']} ({leg['dates']['start']} to {leg['dates']['end']})" for leg in legs
+    )
+
+    with ThreadPoolExecutor(max_workers=Config.ITINERARY_MAX_WORKERS) as pool:
+        # Geocode + weather for all legs in parallel
+        with stage('weather'):
+            weather_futures = [
+                submit_with_context(
+                    pool, get_weather_service().get_weather_forecast,
+                    leg['destination'], leg['dates']['start'], leg['dates']['end']
+                )
+                for leg in legs
+            ]
+            lookup_keys = []
+            for leg, future in zip(legs, weather_futures):
+                leg['weather'] = future.result()
+                coords = (leg['weather'] or {}).get('coordinates', {})
+                # Legs without a geocoded ISO code are looked up by destination country name
+                lookup_keys.append(coords.get('country') or leg['destination'].split(',')[-1].strip())
+
+        # One country lookup per distinct ISO code (or country name)
+        with stage('country'):
+            country_futures = {}
+            for leg, lookup_key in zip(legs, lookup_keys):
+                if lookup_key not in country_futures:
+                    country_futures[lookup_key] = submit_with_context(
+                        pool, resolve_country_data, leg['destination'], leg['weather']
+                    )
+            looked_up = {lookup_key: future.result() for lookup_key, future in country_futures.items()}
+
+            # Name lookups resolve to an ISO code, so a country reached by name
+            # and by code is grouped (and advised on) once
+            country_by_code = {}
+            for leg, lookup_key in zip(legs, lookup_keys):
+                country = looked_up[lookup_key]
+                leg['country_code'] = (country or {}).get('code') or lookup_key
+                country_by_code.setdefault(leg['country_code'], country)
+            countries = [
+                {
+                    'code': code,
+                    'country': country,
+                    'legs': [i for i, leg in enumerate(legs) if leg['country_code'] == code]
+                }
+                for code, country in country_by_code.items()
+            ]
+
+        # Country-level advice once per country, city-level advice once per leg
+        claude_service = get_claude_service()
+        country_advice = []
+        for n, entry in enumerate(countries):
+            country_legs = [legs[i] for i in entry['legs']]
+            sections = COUNTRY_SECTIONS + (TRIP_SECTIONS if n == 0 else ())
+            user_input = dict(
+                profile,
+                destination=_country_label(entry, country_legs),
+                dates=_span(country_legs),
+                itinerary_context=route,
+                specific_questions=payload.get('specific_questions', '') if n == 0 else ''
+            )
+            country_advice.append(submit_with_context(
+                pool, claude_service.generate_travel_advice,
+                user_input, _merged_weather(country_legs), entry['country'], sections
+            ))
+
+        leg_advice = []
+        for leg in legs:
+            user_input = dict(
+                profile,
+                destination=leg['destination'],
+                dates=leg['dates'],
+                itinerary_context=route
+            )
+            leg_advice.append(submit_with_context(
+                pool, claude_service.generate_travel_advice,
+                user_input, leg['weather'], country_by_code.get(leg['country_code']), LEG_SECTIONS
+            ))
+
+        with stage('advice'):
+            for entry, future in zip(countries, country_advice):
+                entry['advice'] = future.result()
+            for leg, future in zip(legs, leg_advice):
+                leg['advice'] = future.result()
+
+    logger.info("Planned itinerary with %s legs across %s countries", len(legs), len(countries))
+    return {
+        'success': True,
+        'input': payload,
+        'legs': legs,
+        'countries': countries,
+        'generated_at': datetime.now().isoformat()
+    }
+
+
+def _country_label(entry, country_legs):
+    """e.g. "Italy (Rome, Florence, Venice)" """
+    name = (entry['country'] or {}).get('name') or entry['code']
+    cities = ', '.join(dict.fromkeys(leg['destination'].split(',')[0].strip() for leg in country_legs))
+    return f"{name} ({cities})"
+
+
+def _span(country_legs):
+    """Date range covering a set of legs"""
+    start = min(leg['dates']['start'] for leg in country_legs)
+    end = max(leg['dates']['end'] for leg in country_legs)
+    return {'start': start, 'end': end, 'duration_days': trip_duration({'start': start, 'end': end})}
+
+
+def _merged_weather(country_legs):
+    """
+    The legs' daily forecasts merged by date for country-level advice
+
+    A day shared by two legs (one ends where the next starts) appears once,
+    with the later leg's weather.
+    """
+    by_date = {}
+    for leg in country_legs:
+        by_date.update((day['date'], day) for day in (leg['weather'] or {}).get('forecast', []))
+    return {'forecast': [by_date[date] for date in sorted(by_date)]} if by_date else None
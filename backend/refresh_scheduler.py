@@ -0,0 +1,285 @@
+"""
+Refresh scheduler
+Keeps the most requested destinations warm: plan requests are counted per
+resolved location, and a background thread re-fetches the forecast, country
+and advice entries of the top destinations shortly before they expire, so
+their users never hit a cold cache.
+
+The scheduler only works while the worker is idle (no more than
+Config.REFRESH_IDLE_MAX_ACTIVE requests in flight, checked before every
+upstream call) and within an hourly upstream budget per API
+(Config.REFRESH_BUDGET, for the whole deployment and split evenly across
+Config.WEB_CONCURRENCY workers). Every upstream call it makes is charged to
+the budget: the inputs for pregenerated advice are read from the cache only.
+Each worker tracks its own traffic; with a shared cache backend, a refresh
+made by one worker is seen as fresh by the others.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from cache import cache_only, get_cache
+from config import Config
+from planner import resolve_country_data
+from services import get_claude_service, get_country_service, get_weather_service
+
+logger = logging.getLogger(__name__)
+
+_active_requests = 0
+_active_lock = threading.Lock()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def request_started():
+    global _active_requests
+    with _active_lock:
+        _active_requests += 1
+
+
+def request_finished():
+    global _active_requests
+    with _active_lock:
+        _active_requests = max(0, _active_requests - 1)
+
+
+def is_idle():
+    """True when this worker has spare capacity for background refreshes"""
+    return _active_requests <= Config.REFRESH_IDLE_MAX_ACTIVE
+
+
+class PopularityTracker:
+    """Exponentially decayed request counts per resolved destination"""
+
+    def __init__(self, half_life=None, max_tracked=None):
+        self.half_life = half_life or Config.REFRESH_HALF_LIFE
+        self.max_tracked = max_tracked or Config.REFRESH_TRACKED_MAX
+        # key -> [score, updated_at, latest trip]
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, entry, at):
+        return entry[0] * 0.5 ** ((at - entry[1]) / self.half_life)
+
+    def record(self, key, trip):
+        """Count one request for a destination and remember its latest trip"""
+        at = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            score = self._decayed(entry, at) if entry else 0.0
+            self._entries[key] = [score + 1, at, trip]
+            if len(self._entries) > self.max_tracked:
+                coldest = min(self._entries, key=lambda k: self._decayed(self._entries[k], at))
+                del self._entries[coldest]
+
+    def top(self, k):
+        """The k most requested destinations as (key, score, trip), hottest first"""
+        at = time.time()
+        with self._lock:
+            ranked = [(key, self._decayed(entry, at), entry[2]) for key, entry in self._entries.items()]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:k]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def worker_budget():
+    """This worker's share of Config.REFRESH_BUDGET (rounded down)"""
+    workers = max(1, Config.WEB_CONCURRENCY)
+    return {kind: limit // workers for kind, limit in Config.REFRESH_BUDGET.items()}
+
+
+class UpstreamBudget:
+    """At most N upstream calls per kind in any rolling hour"""
+
+    WINDOW = 3600
+
+    def __init__(self, limits=None):
+        self.limits = dict(worker_budget() if limits is None else limits)
+        self._calls = {kind: deque() for kind in self.limits}
+        self._lock = threading.Lock()
+
+    def take(self, kind):
+        """Reserve one call; False when the kind's budget is spent (or has none)"""
+        at = time.time()
+        with self._lock:
+            calls = self._calls.get(kind)
+            if calls is None:
+                return False
+            while calls and calls[0] <= at - self.WINDOW:
+                calls.popleft()
+            if len(calls) >= self.limits[kind]:
+                return False
+            calls.append(at)
+            return True
+
+    def remaining(self):
+        at = time.time()
+        with self._lock:
+            return {
+                kind: self.limits[kind] - sum(1 for t in calls if t > at - self.WINDOW)
+                for kind, calls in self._calls.items()
+            }
+
+
+class RefreshScheduler:
+    """Background loop refreshing near-expiry entries of the top destinations"""
+
+    def __init__(self, tracker=None, budget=None, interval=None, top_k=None):
+        self.tracker = tracker or PopularityTracker()
+        self.budget = budget or UpstreamBudget()
+        self.interval = interval or Config.REFRESH_INTERVAL
+        self.top_k = top_k or Config.REFRESH_TOP_K
+        self.refreshed = {'weather': 0, 'country': 0, 'advice': 0}
+        self.passes = 0
+        self.skipped_busy = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record_plan(self, user_input, weather_data):
+        """Count a plan request under its geocoded location"""
+        coords = (weather_data or {}).get('coordinates') or {}
+        if 'lat' not in coords or 'lon' not in coords:
+            return
+        self.tracker.record(f"{coords['lat']:.2f},{coords['lon']:.2f}", {
+            'user_input': dict(user_input),
+            'lat': coords['lat'],
+            'lon': coords['lon'],
+            'country_code': coords.get('country', ''),
+            'data_type': weather_data.get('data_type')
+        })
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='cache-refresh', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            if not is_idle():
+                self.skipped_busy += 1
+                continue
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Refresh pass failed: %s", e)
+
+    def run_once(self):
+        """
+        One pass over the top destinations, hottest first
+
+        Stops early when requests arrive or every budget is spent.
+
+        Returns:
+            Number of upstream refreshes made
+        """
+        self.passes += 1
+        made = 0
+        # Advice calls can take minutes, so at most one per pass
+        advice_allowed = True
+        for key, score, trip in self.tracker.top(self.top_k):
+            if not is_idle() or not any(self.budget.remaining().values()):
+                break
+            try:
+                refreshed = self._refresh_destination(trip, advice_allowed)
+            except Exception as e:
+                logger.warning("Refresh failed for %s: %s", key, e)
+                continue
+            made += sum(refreshed.values())
+            advice_allowed = advice_allowed and not refreshed['advice']
+        if made:
+            logger.info("Refreshed %s cache entries for popular destinations", made)
+        return made
+
+    def _refresh_destination(self, trip, advice_allowed=True):
+        """
+        Refresh one destination's due entries
+
+        Returns:
+            Dictionary of kind -> number of upstream refreshes made
+        """
+        cache = get_cache()
+        refreshed = dict.fromkeys(self.refreshed, 0)
+        user_input = trip['user_input']
+        dates = user_input['dates']
+        today = datetime.now().strftime('%Y-%m-%d')
+        if dates['end'] < today:
+            return refreshed
+
+        # Entries in the last REFRESH_AHEAD_FRACTION of their TTL (or already stale) are due
+        def due(namespace, fresh_for):
+            return fresh_for is None or fresh_for < cache.ttl_for(namespace) * Config.REFRESH_AHEAD_FRACTION
+
+        def refresh(kind, namespace, fresh_for, call):
+            # Idle is re-checked right before each upstream call
+            if due(namespace, fresh_for) and is_idle() and self.budget.take(kind) and call():
+                self.refreshed[kind] += 1
+                refreshed[kind] += 1
+
+        weather_service = get_weather_service()
+        if trip['data_type'] in ('forecast', 'hybrid'):
+            refresh('weather', 'forecast', weather_service.forecast_freshness(trip['lat'], trip['lon']),
+                    lambda: weather_service.refresh_forecast(trip['lat'], trip['lon']))
+
+        country_service = get_country_service()
+        if trip['country_code']:
+            refresh('country', 'country', country_service.country_freshness(trip['country_code']),
+                    lambda: country_service.refresh_country_by_code(trip['country_code']))
+
+        # Advice is keyed by its inputs, so pregenerate it for the current
+        # (just refreshed) data; trips already under way are not planned again
+        if not advice_allowed or dates['start'] < today:
+            return refreshed
+        destination = user_input['destination']
+        with cache_only():
+            weather_data = weather_service.get_weather_forecast(destination, dates['start'], dates['end'])
+            country_data = resolve_country_data(destination, weather_data)
+            if not (weather_data and weather_data.get('forecast') and country_data):
+                # Inputs not all cached: advice built now would not match a real request
+                return refreshed
+            claude_service = get_claude_service()
+            refresh('advice', 'advice', claude_service.advice_freshness(user_input, weather_data, country_data),
+                    lambda: claude_service.generate_travel_advice(
+                        user_input, weather_data, country_data, refresh=True
+                    ))
+        return refreshed
+
+    def stats(self):
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'tracked': len(self.tracker),
+            'top': [
+                {'location': key, 'destination': trip['user_input']['destination'], 'score': round(score, 2)}
+                for key, score, trip in self.tracker.top(self.top_k)
+            ],
+            'passes': self.passes,
+            'skipped_busy': self.skipped_busy,
+            'refreshed': dict(self.refreshed),
+            'budget_remaining': self.budget.remaining()
+        }
+
+
+def get_refresh_scheduler():
+    """Process-wide scheduler, created on first use"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RefreshScheduler()
+    return _scheduler
+
+
+def start_refresh_scheduler():
+    """Start the background refresh thread (call in each worker, after any fork)"""
+    if not Config.REFRESH_ENABLED:
+        return None
+    return get_refresh_scheduler().start()
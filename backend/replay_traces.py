@@ -0,0 +1,294 @@
+"""
+Trace Replay Load Generator
+Replays recorded request traces (JSONL) against a running Traveller's Assistant
+
+Each trace line is one request. Recognised fields:
+    ts / offset        Seconds since the start of the trace (absolute arrival time)
+    delay              Seconds since the previous request (inter-arrival time)
+    endpoint           generate-plan | ask-question | weather | country
+    destination        e.g. "Paris, France"
+    dates              {"start": "YYYY-MM-DD", "end": "YYYY-MM-DD"}
+    travelers, purpose, food_preferences, accommodation, specific_questions
+    question, context  For ask-question traces
+    country            For country traces (defaults to the destination's last part)
+
+When `endpoint` is missing it is inferred: a `question` means ask-question,
+anything with a destination and dates means generate-plan.
+
+Usage:
+    python replay_traces.py traces.jsonl --base-url http://localhost:5000 --speed 10
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+SPEEDS = (1, 10, 100)
+
+
+def load_traces(path):
+    """
+    Load trace records and resolve each one to an arrival offset
+
+    Args:
+        path: Path to a JSONL trace file
+
+    Returns:
+        Tuple of (list of (offset_seconds, record), number of skipped lines:
+        invalid JSON, bad timing fields or records no request can be built from)
+    """
+    traces = []
+    skipped = 0
+    clock = 0.0
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+
+            # Records that cannot become a request (unknown endpoint, weather
+            # without dates, ...) are counted here rather than dropped at replay
+            if not isinstance(record, dict) or _request_parts(record) is None:
+                skipped += 1
+                continue
+
+            try:
+                if 'ts' in record or 'offset' in record:
+                    arrival = float(record.get('ts', record.get('offset')))
+                else:
+                    arrival = clock + float(record.get('delay', 0))
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            clock = arrival
+            traces.append((clock, record))
+
+    # Absolute timestamps may be out of order in merged logs
+    traces.sort(key=lambda item: item[0])
+    if traces:
+        origin = traces[0][0]
+        traces = [(offset - origin, record) for offset, record in traces]
+
+    return traces, skipped
+
+
+def _infer_endpoint(record):
+    """Work out which API endpoint a trace record targets"""
+    endpoint = record.get('endpoint')
+    if endpoint:
+        return endpoint.strip('/').replace('api/', '')
+    if record.get('question'):
+        return 'ask-question'
+    if record.get('destination') and record.get('dates'):
+        return 'generate-plan'
+    return None
+
+
+def build_request(base_url, record):
+    """
+    Turn a trace record into (method, url, json_body)
+
+    Returns:
+        Tuple ready for requests.request, or None if the record is incomplete
+    """
+    parts = _request_parts(record)
+    if parts is None:
+        return None
+    method, path, body = parts
+    return method, f"{base_url.rstrip('/')}/api{path}", body
+
+
+def _request_parts(record):
+    """(method, path under /api, json_body) for a trace record, or None if it is incomplete"""
+    endpoint = _infer_endpoint(record)
+    destination = record.get('destination', '')
+    dates = record.get('dates') or {}
+
+    if endpoint == 'generate-plan':
+        body = {
+            key: record[key] for key in (
+                'destination', 'dates', 'purpose', 'travelers', 'food_preferences',
+                'accommodation', 'specific_questions'
+            ) if key in record
+        }
+        return 'POST', '/generate-plan', body
+
+    if endpoint == 'ask-question':
+        context = record.get('context') or {
+            'destination': destination,
+            'dates': dates,
+            'country': record.get('country', '')
+        }
+        return 'POST', '/ask-question', {'question': record.get('question', ''), 'context': context}
+
+    if endpoint == 'weather' and destination and dates.get('start') and dates.get('end'):
+        path = f"/weather/{quote(destination, safe='')}?start={dates['start']}&end={dates['end']}"
+        return 'GET', path, None
+
+    if endpoint == 'country':
+        country = record.get('country') or destination.split(',')[-1].strip()
+        if country:
+            return 'GET', f"/country/{quote(country, safe='')}", None
+
+    return None
+
+
+class ReplayStats:
+    """Thread-safe latency and cache-outcome collector, grouped by endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.cache = defaultdict(lambda: defaultdict(int))
+        self.lag = []
+
+    def record(self, endpoint, latency, status, cache_state, lag):
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+            self.statuses[endpoint][status] += 1
+            self.cache[endpoint][cache_state] += 1
+            self.lag.append(lag)
+
+    def report(self, wall_time):
+        """Build a printable summary of the run"""
+        lines = []
+        total = sum(len(v) for v in self.latencies.values())
+        lines.append(f"Replayed {total} requests in {wall_time:.1f}s")
+        if self.lag:
+            lines.append(f"Scheduler lag p99: {_percentile(sorted(self.lag), 99) * 1000:.0f}ms")
+
+        for endpoint in sorted(self.latencies):
+            samples = sorted(self.latencies[endpoint])
+            cache = self.cache[endpoint]
+            hits, partial = cache.get('HIT', 0), cache.get('PARTIAL', 0)
+            known = hits + partial + cache.get('MISS', 0)
+            hit_rate = f"{(hits + 0.5 * partial) / known:.0%}" if known else 'n/a'
+
+            lines.append('')
+            lines.append(f"[{endpoint}] n={len(samples)}")
+            lines.append(
+                "  latency ms: "
+                + ', '.join(f"p{p}={_percentile(samples, p) * 1000:.0f}" for p in (50, 90, 95, 99))
+                + f", max={samples[-1] * 1000:.0f}"
+            )
+            lines.append(
+                "  status: " + ', '.join(f"{code}={count}" for code, count in sorted(self.statuses[endpoint].items(), key=lambda kv: str(kv[0])))
+            )
+            lines.append(
+                f"  cache: hit rate {hit_rate} ("
+                + ', '.join(f"{state}={count}" for state, count in sorted(cache.items()))
+                + ')'
+            )
+
+        return '\n'.join(lines)
+
+
+def _percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100 * len(sorted_samples))) - 1))
+    return sorted_samples[rank]
+
+
+def _cache_state(response):
+    """
+    Classify a response for hit-rate accounting
+
+    A 304 is a client-side reuse; otherwise the server's X-Cache header
+    (HIT / MISS / PARTIAL) is used when present.
+    """
+    if response is None:
+        return 'ERROR'
+    if response.status_code == 304:
+        return 'HIT'
+    state = response.headers.get('X-Cache', '').upper()
+    return state if state in ('HIT', 'MISS', 'PARTIAL') else 'UNKNOWN'
+
+
+def replay(traces, base_url, speed=1.0, workers=32, timeout=120):
+    """
+    Replay traces open-loop: arrivals follow the trace clock scaled by `speed`,
+    independent of how quickly earlier requests complete.
+
+    Returns:
+        Tuple of (ReplayStats with per-endpoint results, wall time in seconds)
+    """
+    stats = ReplayStats()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    def fire(record, scheduled_at):
+        prepared = build_request(base_url, record)
+        if not prepared:
+            return
+        method, url, body = prepared
+        endpoint = _infer_endpoint(record)
+        lag = time.perf_counter() - scheduled_at
+
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, json=body, timeout=timeout)
+            status = response.status_code
+        except requests.RequestException as e:
+            response = None
+            status = type(e).__name__
+        stats.record(endpoint, time.perf_counter() - started, status, _cache_state(response), lag)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for offset, record in traces:
+            scheduled_at = start + offset / speed
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, record, scheduled_at)
+
+    return stats, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded request traces against the app")
+    parser.add_argument('traces', help='JSONL trace file')
+    parser.add_argument('--base-url', default='http://localhost:5000', help='App base URL')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help=f"Time compression factor, typically one of {SPEEDS}")
+    parser.add_argument('--workers', type=int, default=32, help='Max concurrent in-flight requests')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-request timeout in seconds')
+    parser.add_argument('--limit', type=int, default=0, help='Only replay the first N requests')
+    args = parser.parse_args(argv)
+
+    traces, skipped = load_traces(args.traces)
+    if args.limit:
+        traces = traces[:args.limit]
+    if not traces:
+        print(f"No replayable requests found in {args.traces} (skipped {skipped} lines)")
+        return 1
+
+    duration = traces[-1][0] / args.speed
+    print(f"Replaying {len(traces)} requests at {args.speed:g}x against {args.base_url} "
+          f"(~{duration:.0f}s of arrivals, {skipped} lines skipped)")
+
+    stats, wall_time = replay(traces, args.base_url, args.speed, args.workers, args.timeout)
+    print()
+    print(stats.report(wall_time))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Response helpers
+HTTP caching semantics (ETag, Cache-Control, conditional GET) for read endpoints,
+plan response profiles, a fast JSON provider and response compression
+"""
+import gzip
+import hashlib
+import json
+import logging
+
+from flask import jsonify, make_response, request
+from flask.json.provider import DefaultJSONProvider
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional speedup
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Response profiles for /api/generate-plan
+RESPONSE_PROFILES = ('full', 'slim', 'sections')
+
+# Fields the frontend actually renders; everything else is dropped in slim mode
+_SLIM_WEATHER_FIELDS = ('destination', 'forecast', 'summary', 'data_type', 'reused_from')
+_SLIM_COORDINATE_FIELDS = ('name', 'country', 'state')
+_SLIM_COUNTRY_FIELDS = (
+    'name', 'capital', 'currency', 'languages', 'timezone',
+    'calling_code', 'driving_side', 'flag'
+)
+
+_COMPRESSIBLE_TYPES = (
+    'application/json', 'application/javascript', 'text/html', 'text/css',
+    'text/plain', 'text/javascript', 'application/manifest+json'
+)
+
+# Suffixes appended to a strong ETag per content-coding, so each encoded
+# representation keeps a distinct validator
+_ENCODING_ETAG_SUFFIXES = {'br': '-br', 'gzip': '-gzip'}
+
+
+def compute_etag(data):
+    """
+    Derive a strong ETag from the underlying data
+
+    The hash is taken over a canonical JSON encoding (sorted keys, compact
+    separators) so the same cached data always yields the same validator,
+    independent of dict ordering or the response encoder.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+def cacheable_json(data, max_age, stale_while_revalidate=0):
+    """
+    Build a JSON response with validators and freshness lifetimes
+
+    Answers a matching If-None-Match (weak comparison, against the validator
+    of the encoding being served) with 304 Not Modified.
+
+    Args:
+        data: JSON-serializable payload
+        max_age: Seconds the response may be reused without revalidation
+        stale_while_revalidate: Extra seconds a stale copy may be served
+            while a background revalidation runs
+
+    Returns:
+        Flask response (200 with body, or 304 without)
+    """
+    etag = compute_etag(data)
+
+    cache_control = f"public, max-age={int(max_age)}"
+    if stale_while_revalidate:
+        cache_control += f", stale-while-revalidate={int(stale_while_revalidate)}"
+
+    response = jsonify(data)
+    response.headers['Cache-Control'] = cache_control
+
+    # Each encoding has its own validator; only the one for the representation
+    # being served matches. Weak comparison (RFC 7232 3.2), as proxies and CDNs
+    # mark ETags weak when they compress
+    encoding = served_encoding(response)
+    served_etag = etag + _ENCODING_ETAG_SUFFIXES[encoding] if encoding else etag
+    if request.if_none_match.contains_weak(served_etag):
+        not_modified = make_response('', 304)
+        not_modified.set_etag(served_etag)
+        not_modified.headers['Cache-Control'] = cache_control
+        not_modified.vary.add('Accept-Encoding')
+        return not_modified
+
+    response.set_etag(etag)
+    return response
+
+
+def shape_plan_response(plan, profile='full'):
+    """
+    Reduce a generated plan to the requested response profile
+
+    Profiles:
+        full: Everything, as generated
+        slim: What the UI renders - no echoed request details, raw country
+              fields (currencies_raw, borders, timezones_all) or full_text
+        sections: Only the advice sections
+
+    Args:
+        plan: Complete plan response dictionary
+        profile: One of RESPONSE_PROFILES
+
+    Returns:
+        New dictionary; the input is not modified
+    """
+    if profile == 'full':
+        return plan
+
+    advice = {
+        key: value for key, value in (plan.get('advice') or {}).items()
+        if key != 'full_text'
+    }
+
+    if profile == 'sections':
+        return {
+            'success': plan.get('success', True),
+            'advice': advice,
+            'generated_at': plan.get('generated_at')
+        }
+
+    user_input = plan.get('input') or {}
+    weather = plan.get('weather')
+    if weather:
+        slim_weather = {key: weather[key] for key in _SLIM_WEATHER_FIELDS if key in weather}
+        coords = weather.get('coordinates') or {}
+        slim_weather['coordinates'] = {key: coords[key] for key in _SLIM_COORDINATE_FIELDS if key in coords}
+        weather = slim_weather
+
+    country = plan.get('country')
+    if country:
+        country = {key: country[key] for key in _SLIM_COUNTRY_FIELDS if key in country}
+
+    slim = dict(plan)
+    slim.update({
+        'input': {
+            'destination': user_input.get('destination'),
+            'dates': user_input.get('dates')
+        },
+        'weather': weather,
+        'country': country,
+        'advice': advice
+    })
+    return slim
+
+
+def resolve_profile(payload=None):
+    """Pick the response profile from ?profile=, the JSON payload or Config"""
+    profile = request.args.get('profile') or (payload or {}).get('response_profile')
+    profile = (profile or Config.DEFAULT_RESPONSE_PROFILE).lower()
+    return profile if profile in RESPONSE_PROFILES else 'full'
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson; falls back to the stdlib for unsupported types"""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def _negotiate_encoding(accept_encodings):
+    """Pick the best content-coding the client accepts and we can produce"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def served_encoding(response):
+    """Content-coding compress_response will apply to a response, or None"""
+    if (
+        not Config.COMPRESS_RESPONSES
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in _COMPRESSIBLE_TYPES
+    ):
+        return None
+
+    encoding = _negotiate_encoding(request.accept_encodings)
+    if not encoding or len(response.get_data()) < Config.COMPRESS_MIN_SIZE:
+        return None
+    return encoding
+
+
+def compress_response(response):
+    """
+    Compress eligible responses with brotli or gzip (after_request hook)
+
+    Skips streamed/file responses, small bodies, already-encoded content and
+    non-text content types.
+    """
+    response.vary.add('Accept-Encoding')
+
+    encoding = served_encoding(response)
+    if not encoding:
+        return response
+
+    body = response.get_data()
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=Config.COMPRESS_BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=Config.COMPRESS_GZIP_LEVEL)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag + _ENCODING_ETAG_SUFFIXES[encoding])
+
+    return response
+
+
+def init_app(app):
+    """Install the fast JSON provider and response compression on the app"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        logger.info("orjson not installed; using the default JSON provider")
+
+    if Config.COMPRESS_RESPONSES:
+        app.after_request(compress_response)
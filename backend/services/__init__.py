@@ -1,8 +1,36 @@
 """
 Services package
+
+Service classes are imported on first access, so importing the package
+(or the registry) does not pull in the anthropic/httpx stack until a
+service that needs it is actually used.
 """
-from .claude_service import ClaudeService
-from .weather_service import WeatherService
-from .country_service import CountryService
+import importlib
+
+from .registry import (
+    get_claude_service, get_weather_service, get_country_service,
+    get_exchange_rate_service, init_services
+)
+
+_SERVICE_MODULES = {
+    'ClaudeService': '.claude_service',
+    'WeatherService': '.weather_service',
+    'CountryService': '.country_service',
+    'ExchangeRateService': '.exchange_rate_service',
+}
+
+
+def __getattr__(name):
+    module_name = _SERVICE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['ClaudeService', 'WeatherService', 'CountryService']
+__all__ = [
+    'ClaudeService', 'WeatherService', 'CountryService', 'ExchangeRateService',
+    'get_claude_service', 'get_weather_service', 'get_country_service',
+    'get_exchange_rate_service', 'init_services'
+]
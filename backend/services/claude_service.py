@@ -2,40 +2,121 @@
 AI Service (using Anthropic Claude)
 Handles all interactions with Anthropic's Claude API
 """
-from anthropic import Anthropic
 from config import Config
+from cache import get_cache
+from .exchange_rate_service import local_currency
+from .power_plugs import describe_power_plugs, get_power_plug_info, info_url_for_name
+from .prompt_budget import (
+    country_fields_for, estimate_tokens, format_country, format_weather, output_token_budget
+)
+from .model_router import ModelRouter
+from .registry import get_exchange_rate_service
+import hashlib
 import logging
-import httpx
+import threading
 
 logger = logging.getLogger(__name__)
 
-# Worldstandards.eu uses idiosyncratic slugs for some countries — natural
-# slugifications of the long-form names 404. Maps the slug we'd otherwise
-# produce to the slug the site actually serves.
-_POWER_PLUG_SLUG_ALIASES = {
-    'united-kingdom': 'uk',
-    'united-states': 'usa',
-    'united-states-of-america': 'usa',
-    'czech-republic': 'czechia',
-    'cote-divoire': 'ivory-coast',
-    'trinidad-and-tobago': 'trinidad-tobago',
-    'democratic-republic-of-the-congo': 'congo-kinshasa',
-    'burma': 'myanmar',
-}
+# Advice sections in prompt order: (key, heading, header keywords, guidance).
+# The heading keywords identify a section header in the response; the
+# specific-answers guidance is filled in per request.
+ADVICE_SECTIONS = (
+    ('accommodation', 'ACCOMMODATION RECOMMENDATIONS', ('ACCOMMODATION',), """\
+   - Recommend specific areas to stay based on their preferences
+   - Suggest types of accommodation (hotels, Airbnb, hostels, etc.)
+   - Budget considerations
+   - Booking tips"""),
+    ('currency_payments', 'CURRENCY & PAYMENTS', ('CURRENCY',), """\
+   - Local currency details
+   - Should they carry cash or rely on cards?
+   - Is mobile payment (Apple Pay, Google Pay) widely accepted?
+   - Where to exchange money
+   - Typical costs for meals, transport, activities"""),
+    ('transportation', 'TRANSPORTATION', ('TRANSPORTATION',), """\
+   - PUBLIC TRANSPORT: How it works, payment methods, advisability
+   - CAR RENTAL: Process, cost, advisability, driving tips
+   - TAXIS/RIDE-SHARING: How they work, apps to use, typical costs
+   - Getting from airport to city
+   - Best way to get around based on their itinerary"""),
+    ('cultural_guide', 'CULTURAL GUIDE', ('CULTURAL', 'CULTURE'), """\
+   - TIPPING CULTURE: Where, when, how much
+   - DRESS CODE: What to wear, cultural considerations
+   - LOCAL CUSTOMS: Important etiquette, do's and don'ts
+   - GREETINGS: Essential phrases in local language with pronunciation
+   - CULTURAL SENSITIVITIES: Things to avoid or be aware of"""),
+    ('food_dining', 'FOOD & DINING', ('FOOD',), """\
+   - Must-try local dishes
+   - Restaurant recommendations fitting their preferences
+   - Where to find specific cuisine types
+   - Dietary restriction considerations
+   - Street food safety
+   - Tipping at restaurants"""),
+    ('activities', 'ACTIVITIES & ATTRACTIONS', ('ACTIVITIES', 'ATTRACTIONS'), """\
+   - Top recommendations based on their purpose and traveler profile
+   - Hidden gems
+   - Day trip options
+   - Activity costs and booking tips
+   - What to do in bad weather"""),
+    ('practical_info', 'PRACTICAL INFORMATION', ('PRACTICAL',), """\
+   - SIM CARDS: Where to buy, recommended providers, costs
+   - EMERGENCY CONTACTS: Police, ambulance, tourist police
+   - LANGUAGE: How much English is spoken
+   - INTERNET: WiFi availability, data options
+   - SAFETY: General safety level, areas to avoid, common scams"""),
+    ('packing', 'PACKING RECOMMENDATIONS', ('PACKING',), """\
+   - Clothing based on weather and activities
+   - Essential items to bring
+   - Things you can buy there vs. bring from home
+   - Prohibited items"""),
+    ('safety_health', 'SAFETY & HEALTH', ('SAFETY', 'HEALTH'), """\
+   - General safety tips
+   - Common scams to watch for
+   - Health precautions
+   - Water safety
+   - Areas to avoid"""),
+    ('specific_answers', 'ANSWERS TO SPECIFIC QUESTIONS', ('SPECIFIC',), None),
+)
+
+ADVICE_SECTION_KEYS = tuple(section[0] for section in ADVICE_SECTIONS)
 
 
 class ClaudeService:
     """Service for interacting with Anthropic Claude AI"""
 
-    def __init__(self):
-        # Configure Anthropic API with SSL verification disabled (corporate environment workaround)
-        http_client = httpx.Client(verify=False)
-        self.client = Anthropic(api_key=Config.ANTHROPIC_API_KEY, http_client=http_client)
-
-        # Use Claude Haiku 4.5 (fast and cost-effective)
-        self.model = "claude-haiku-4-5"
+    def __init__(self, cache=None, exchange_rates=None, router=None):
+        self.cache = cache or get_cache()
+        self.exchange_rates = exchange_rates
+        # Model, output cap and hedging per call type (plan, section, qa)
+        self.router = router or ModelRouter()
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """Model for full travel plans"""
+        return self.router.policy('plan').model
+
+    @property
+    def client(self):
+        """
+        Anthropic client, created on first use
 
-    def generate_travel_advice(self, user_input, weather_data, country_data):
+        The anthropic/httpx import and client construction are deferred so
+        worker startup does not pay for them, and so a preloading gunicorn
+        master never opens connections that forked workers would share.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from anthropic import Anthropic
+                    import httpx
+
+                    # Configure Anthropic API with SSL verification disabled (corporate environment workaround)
+                    http_client = httpx.Client(verify=False)
+                    self._client = Anthropic(api_key=Config.ANTHROPIC_API_KEY, http_client=http_client)
+        return self._client
+
+    def generate_travel_advice(self, user_input, weather_data, country_data, sections=None, refresh=False):
         """
         Generate comprehensive travel advice based on user input and data
 
@@ -43,42 +124,170 @@ class ClaudeService:
             user_input: Dictionary with destination, dates, preferences, etc.
             weather_data: Weather forecast data
             country_data: Country information (currency, language, etc.)
+            sections: Advice section keys to generate (default: all of
+                ADVICE_SECTION_KEYS)
+            refresh: Regenerate even if cached advice is still fresh
 
         Returns:
             Dictionary with comprehensive travel advice
         """
-        prompt = self._build_travel_prompt(user_input, weather_data, country_data)
-
-        try:
-            logger.info(f"Generating travel advice for {user_input.get('destination')}")
-
-            # Generate content using Claude
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=12000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            response_text = response.content[0].text
-
-            # Parse the response into structured sections
-            advice = self._parse_advice_response(response_text)
-
-            # Add power adapter information with images
-            advice['power_adapter'] = self._get_power_adapter_info(
-                country_data, response_text, user_input.get('destination')
-            )
+        sections = self._select_sections(sections)
+        call_type = self._call_type(sections)
+        currency, currency_symbol = local_currency(country_data)
+        exchange = self._get_exchange_info(currency)
+        prompt = self._build_travel_prompt(user_input, weather_data, country_data, sections, exchange)
+        model = self.router.policy(call_type).model
+        max_tokens = output_token_budget(sections, user_input.get('dates', {}).get('duration_days'))
+
+        def generate():
+            try:
+                logger.info(
+                    "Generating travel advice for %s (%d sections, ~%d prompt tokens, max_tokens=%d)",
+                    user_input.get('destination'), len(sections), estimate_tokens(prompt), max_tokens
+                )
+
+                # Generate content using Claude (hedged if it overruns its latency budget)
+                response, used_model = self.router.create(
+                    self.client,
+                    call_type,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=max_tokens
+                )
+                if used_model != model:
+                    logger.info("Travel advice served by %s", used_model)
+
+                response_text = response.content[0].text
+                self._log_usage(response, max_tokens)
+
+                # Parse the response into structured sections
+                advice = self._parse_advice_response(response_text, sections)
+
+                # Base-currency equivalents are computed locally, not generated
+                if exchange:
+                    texts = {key: advice[key] for key in (*sections, 'full_text')}
+                    advice.update(self._exchange_service().annotate_costs(texts, currency, currency_symbol))
+                    advice['exchange'] = exchange
+
+                # Plug types and voltage come from the bundled table, not the model
+                if 'practical_info' in sections:
+                    advice['power_adapter'] = self._get_power_adapter_info(
+                        country_data, weather_data, user_input.get('destination')
+                    )
+
+                logger.info("Travel advice generated successfully")
+                return advice
+
+            except Exception as e:
+                logger.error("Error generating travel advice: %s", e)
+                raise
+
+        # Identical prompts (same trip, profile and data) reuse the generated
+        # advice; stale advice is served while it is regenerated in the background
+        cache_key = self._advice_cache_key(model, prompt)
+        if refresh:
+            return self.cache.refresh('advice', cache_key, generate)
+        return self.cache.get_or_set('advice', cache_key, generate)
+
+    def advice_freshness(self, user_input, weather_data, country_data, sections=None):
+        """Seconds until the cached advice for these inputs goes stale (None if not cached)"""
+        sections = self._select_sections(sections)
+        call_type = self._call_type(sections)
+        currency, _ = local_currency(country_data)
+        prompt = self._build_travel_prompt(
+            user_input, weather_data, country_data, sections, self._get_exchange_info(currency)
+        )
+        model = self.router.policy(call_type).model
+        return self.cache.freshness('advice', self._advice_cache_key(model, prompt))
+
+    def answer_question(self, question, context):
+        """
+        Answer a follow-up question about a trip
 
-            logger.info("Travel advice generated successfully")
-            return advice
+        Args:
+            question: The traveler's question
+            context: Dictionary with destination, dates and country
 
+        Returns:
+            Answer text
+        """
+        destination = context.get('destination', 'this destination')
+        country = context.get('country', '')
+        dates = context.get('dates', {})
+
+        prompt = f"""You are a knowledgeable travel assistant. A traveler is planning a trip to {destination}"""
+        if country:
+            prompt += f" in {country}"
+        if dates.get('start'):
+            prompt += f" from {dates.get('start')} to {dates.get('end')}"
+
+        prompt += f""".
+
+They have a question: {question}
+
+Please provide a helpful, practical, and specific answer. Keep it concise (2-4 sentences) but informative."""
+
+        response, _ = self.router.create(
+            self.client,
+            'qa',
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        self._log_usage(response, self.router.policy('qa').max_tokens, 'Answer')
+        return response.content[0].text
+
+    def _exchange_service(self):
+        return self.exchange_rates or get_exchange_rate_service()
+
+    def _get_exchange_info(self, currency):
+        """Today's rate for the local currency, or None (no rate, or it is the base)"""
+        if not currency:
+            return None
+        try:
+            exchange = self._exchange_service().exchange_info(currency)
         except Exception as e:
-            logger.error(f"Error generating travel advice: {str(e)}")
-            raise
+            logger.error("Error getting exchange rate for %s: %s", currency, e)
+            return None
+        if not exchange or exchange['currency'] == exchange['base']:
+            return None
+        return exchange
+
+    @staticmethod
+    def _select_sections(sections):
+        """Normalize a requested subset to ADVICE_SECTIONS order"""
+        if not sections:
+            return ADVICE_SECTION_KEYS
+        unknown = set(sections) - set(ADVICE_SECTION_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown advice sections: {', '.join(sorted(unknown))}")
+        return tuple(key for key in ADVICE_SECTION_KEYS if key in sections)
+
+    @staticmethod
+    def _call_type(sections):
+        """'plan' for a full plan, 'section' for a subset"""
+        return 'plan' if len(sections) == len(ADVICE_SECTION_KEYS) else 'section'
+
+    @staticmethod
+    def _advice_cache_key(model, prompt):
+        return hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _log_usage(response, max_tokens, label='Travel advice'):
+        """Log input/output token counts; warn when the output hit max_tokens"""
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            logger.info(
+                "Claude usage: input_tokens=%s, output_tokens=%s, max_tokens=%s",
+                usage.input_tokens, usage.output_tokens, max_tokens,
+                extra={'input_tokens': usage.input_tokens, 'output_tokens': usage.output_tokens}
+            )
+        if getattr(response, 'stop_reason', None) == 'max_tokens':
+            logger.warning("%s truncated at max_tokens=%s", label, max_tokens)
 
-    def _build_travel_prompt(self, user_input, weather_data, country_data):
+    def _build_travel_prompt(self, user_input, weather_data, country_data, sections=ADVICE_SECTION_KEYS,
+                             exchange=None):
         """Build the prompt for Claude"""
 
         destination = user_input.get('destination', '')
@@ -88,6 +297,13 @@ class ClaudeService:
         food_prefs = user_input.get('food_preferences', [])
         accommodation = user_input.get('accommodation', {})
         specific_questions = user_input.get('specific_questions', '')
+        itinerary = user_input.get('itinerary_context', '')
+        itinerary_line = f"\n- Itinerary: {itinerary}" if itinerary else ''
+        if exchange:
+            costs = (f"Include actual costs where relevant, in local currency only, written with the currency code "
+                     f"(e.g. 25 {exchange['currency']}); {exchange['base']} equivalents are added automatically.")
+        else:
+            costs = "Include actual costs where relevant (in local currency and USD)."
 
         prompt = f"""You are an expert travel advisor. Provide comprehensive, practical travel advice for the following trip:
 
@@ -95,7 +311,7 @@ TRIP DETAILS:
 - Destination: {destination}
 - Travel Dates: {dates.get('start')} to {dates.get('end')}
 - Duration: {dates.get('duration_days')} days
-- Purpose: {purpose}
+- Purpose: {purpose}{itinerary_line}
 
 TRAVELER PROFILE:
 - Type: {travelers.get('type', 'Individual')}
@@ -113,181 +329,111 @@ WEATHER FORECAST:
 {self._format_weather_data(weather_data)}
 
 COUNTRY INFORMATION:
-{self._format_country_data(country_data)}
+{self._format_country_data(country_data, sections)}
 
 SPECIFIC QUESTIONS:
 {specific_questions if specific_questions else 'None'}
 
-Provide concise, scannable advice across ALL 10 sections below. Critical requirements:
-- Use short bullet points, not prose paragraphs.
-- Aim for ~200 words per section. Do not exceed 300.
-- Cover EVERY section — sections 7-10 (Practical Info, Packing, Safety, Specific Answers) are as important as 1-6. Budget your output so you reach them.
-- Skip throat-clearing and obvious context; jump straight to actionable points.
+{self._format_section_instructions(sections, specific_questions)}
 
-Sections:
+Please be specific, practical, and realistic. {costs} Make recommendations tailored to their travel profile and purpose."""
 
-1. ACCOMMODATION RECOMMENDATIONS
-   - Recommend specific areas to stay based on their preferences
-   - Suggest types of accommodation (hotels, Airbnb, hostels, etc.)
-   - Budget considerations
-   - Booking tips
-
-2. CURRENCY & PAYMENTS
-   - Local currency details
-   - Should they carry cash or rely on cards?
-   - Is mobile payment (Apple Pay, Google Pay) widely accepted?
-   - Where to exchange money
-   - Typical costs for meals, transport, activities
-
-3. TRANSPORTATION
-   - PUBLIC TRANSPORT: How it works, payment methods, advisability
-   - CAR RENTAL: Process, cost, advisability, driving tips
-   - TAXIS/RIDE-SHARING: How they work, apps to use, typical costs
-   - Getting from airport to city
-   - Best way to get around based on their itinerary
-
-4. CULTURAL GUIDE
-   - TIPPING CULTURE: Where, when, how much
-   - DRESS CODE: What to wear, cultural considerations
-   - LOCAL CUSTOMS: Important etiquette, do's and don'ts
-   - GREETINGS: Essential phrases in local language with pronunciation
-   - CULTURAL SENSITIVITIES: Things to avoid or be aware of
-
-5. FOOD & DINING
-   - Must-try local dishes
-   - Restaurant recommendations fitting their preferences
-   - Where to find specific cuisine types
-   - Dietary restriction considerations
-   - Street food safety
-   - Tipping at restaurants
-
-6. ACTIVITIES & ATTRACTIONS
-   - Top recommendations based on their purpose and traveler profile
-   - Hidden gems
-   - Day trip options
-   - Activity costs and booking tips
-   - What to do in bad weather
-
-7. PRACTICAL INFORMATION
-   - POWER ADAPTERS: Type needed, voltage
-   - SIM CARDS: Where to buy, recommended providers, costs
-   - EMERGENCY CONTACTS: Police, ambulance, tourist police
-   - LANGUAGE: How much English is spoken
-   - INTERNET: WiFi availability, data options
-   - SAFETY: General safety level, areas to avoid, common scams
-
-8. PACKING RECOMMENDATIONS
-   - Clothing based on weather and activities
-   - Essential items to bring
-   - Things you can buy there vs. bring from home
-   - Prohibited items
-
-9. SAFETY & HEALTH
-   - General safety tips
-   - Common scams to watch for
-   - Health precautions
-   - Water safety
-   - Areas to avoid
-
-10. ANSWERS TO SPECIFIC QUESTIONS
-    {f"- {specific_questions}" if specific_questions else "- None provided"}
+        return prompt
 
-Please be specific, practical, and realistic. Include actual costs where relevant (in local currency and USD). Make recommendations tailored to their travel profile and purpose."""
+    def _format_section_instructions(self, sections, specific_questions):
+        """Writing requirements plus the numbered outline of the requested sections"""
+        if len(sections) == len(ADVICE_SECTION_KEYS):
+            coverage = ("- Cover EVERY section — sections 7-10 (Practical Info, Packing, Safety, Specific Answers) "
+                        "are as important as 1-6. Budget your output so you reach them.")
+        else:
+            coverage = "- Cover EVERY section below and nothing else. Budget your output so you reach the last one."
+
+        lines = [
+            f"Provide concise, scannable advice across ALL {len(sections)} sections below. Critical requirements:",
+            "- Use short bullet points, not prose paragraphs.",
+            "- Aim for ~200 words per section. Do not exceed 300.",
+            coverage,
+            "- Skip throat-clearing and obvious context; jump straight to actionable points.",
+            "",
+            "Sections:",
+        ]
+
+        number = 0
+        for key, heading, _, guidance in ADVICE_SECTIONS:
+            if key not in sections:
+                continue
+            number += 1
+            if guidance is None:
+                guidance = f"    - {specific_questions}" if specific_questions else "    - None provided"
+            lines.append("")
+            lines.append(f"{number}. {heading}")
+            lines.append(guidance)
 
-        return prompt
+        return '\n'.join(lines)
 
     def _format_weather_data(self, weather_data):
-        """Format weather data for prompt"""
+        """Format weather data for prompt (weekly summaries for long trips)"""
         if not weather_data:
             return "Weather data not available"
 
-        formatted = []
-        for day in weather_data.get('forecast', []):
-            formatted.append(
-                f"- {day.get('date')}: {day.get('condition')}, "
-                f"High: {day.get('temp_max')}°C, Low: {day.get('temp_min')}°C, "
-                f"Rain: {day.get('rain_chance')}%"
-            )
+        return format_weather(weather_data.get('forecast', []))
 
-        return '\n'.join(formatted) if formatted else "No forecast available"
+    def _format_country_data(self, country_data, sections=ADVICE_SECTION_KEYS):
+        """Format the country data the requested sections need"""
+        fields = country_fields_for(sections, all_sections=len(sections) == len(ADVICE_SECTION_KEYS))
+        return format_country(country_data, fields)
 
-    def _format_country_data(self, country_data):
-        """Format country data for prompt"""
-        if not country_data:
-            return "Country data not available"
+    def _get_power_adapter_info(self, country_data, weather_data=None, destination_fallback=None):
+        """
+        Power adapter info for the destination country
 
-        return f"""- Currency: {country_data.get('currency', 'N/A')}
-- Languages: {', '.join(country_data.get('languages', []))}
-- Capital: {country_data.get('capital', 'N/A')}
-- Region: {country_data.get('region', 'N/A')}
-- Timezone: {country_data.get('timezone', 'N/A')}"""
+        Looks the country up by ISO alpha-2 code (from the country data, or
+        from geocoding) in the bundled plug table.
 
-    def _get_power_adapter_info(self, country_data, response_text, destination_fallback=None):
-        """Extract power adapter info and provide helpful URL"""
+        Args:
+            country_data: Country information (may be None)
+            weather_data: Weather data whose coordinates carry the country code
+            destination_fallback: Destination string, used for the guide URL
+                when the country is not in the table
 
-        # Build country-specific URL
-        country_name = country_data.get('name', '') if country_data else ''
+        Returns:
+            Dictionary with description, info_url, plug_types, voltage and frequency
+        """
+        country_code = (country_data or {}).get('code') or \
+            ((weather_data or {}).get('coordinates') or {}).get('country')
+        plugs = get_power_plug_info(country_code)
+        if plugs:
+            return {'description': describe_power_plugs(plugs), **plugs}
 
-        # Fallback: derive country from destination string
+        # Unknown country: no structured data, just the closest guide page
         # "Paris, France" -> "France"; "Singapore" -> "Singapore"
+        country_name = (country_data or {}).get('name', '')
         if not country_name and destination_fallback:
             country_name = destination_fallback.split(',')[-1].strip()
+        logger.info("No plug table entry for '%s'", country_code or country_name)
 
-        logger.info(f"Building power adapter URL - Country data: {country_data}")
-        logger.info(f"Country name extracted: '{country_name}'")
-
-        if country_name:
-            # Convert country name to URL format (lowercase, replace spaces with hyphens)
-            country_slug = country_name.lower().replace(' ', '-')
-            # Remove special characters
-            country_slug = ''.join(c if c.isalnum() or c == '-' else '' for c in country_slug)
-            # Normalize to the slug worldstandards.eu actually uses
-            country_slug = _POWER_PLUG_SLUG_ALIASES.get(country_slug, country_slug)
-            info_url = f'https://www.worldstandards.eu/electricity/plug-voltage-by-country/{country_slug}/'
-            logger.info(f"Generated country-specific URL: {info_url}")
-        else:
-            # Fallback to general page
-            info_url = 'https://www.worldstandards.eu/electricity/plugs-and-sockets/'
-            logger.info(f"Using fallback URL (no country name): {info_url}")
-
-        adapter_info = {
+        return {
             'description': '',
-            'info_url': info_url
+            'info_url': info_url_for_name(country_name),
+            'plug_types': [],
+            'voltage': None,
+            'frequency': []
         }
 
-        # Extract description (look for POWER ADAPTERS section)
-        lines = response_text.split('\n')
-        in_power_section = False
-        for line in lines:
-            if 'POWER ADAPTER' in line.upper():
-                in_power_section = True
-                continue
-            elif in_power_section and line.strip().startswith('-'):
-                adapter_info['description'] += line.strip() + ' '
-            elif in_power_section and line.strip() and not line.strip().startswith('-'):
-                if any(keyword in line.upper() for keyword in ['SIM', 'EMERGENCY', 'LANGUAGE']):
-                    break
-
-        return adapter_info
-
-    def _parse_advice_response(self, response_text):
+    def _parse_advice_response(self, response_text, sections=ADVICE_SECTION_KEYS):
         """Parse AI response into structured sections"""
 
-        sections = {
-            'accommodation': '',
-            'currency_payments': '',
-            'transportation': '',
-            'cultural_guide': '',
-            'food_dining': '',
-            'activities': '',
-            'practical_info': '',
-            'packing': '',
-            'safety_health': '',
-            'specific_answers': '',
-            'full_text': response_text
-        }
+        parsed = {key: '' for key in sections}
+        parsed['full_text'] = response_text
+
+        # Header patterns in prompt order: "N." / "N)" plus a section keyword,
+        # e.g. "1. ACCOMMODATION" or "**1) ACCOMMODATION RECOMMENDATIONS**"
+        headers = []
+        for key, _, keywords, _ in ADVICE_SECTIONS:
+            if key in sections:
+                number = len(headers) + 1
+                headers.append((key, (f"{number}.", f"{number})"), keywords))
 
-        # Improved parsing with better section detection
         current_section = None
         lines = response_text.split('\n')
 
@@ -295,41 +441,17 @@ Please be specific, practical, and realistic. Include actual costs where relevan
             line_upper = line.upper()
             line_stripped = line_upper.strip()
 
-            # Check for section headers (with or without numbers)
-            # Match patterns like "1. ACCOMMODATION" or "ACCOMMODATION RECOMMENDATIONS"
-            if ('1.' in line_stripped or '1)' in line_stripped) and 'ACCOMMODATION' in line_upper:
-                current_section = 'accommodation'
-                continue
-            elif ('2.' in line_stripped or '2)' in line_stripped) and 'CURRENCY' in line_upper:
-                current_section = 'currency_payments'
-                continue
-            elif ('3.' in line_stripped or '3)' in line_stripped) and 'TRANSPORTATION' in line_upper:
-                current_section = 'transportation'
-                continue
-            elif ('4.' in line_stripped or '4)' in line_stripped) and ('CULTURAL' in line_upper or 'CULTURE' in line_upper):
-                current_section = 'cultural_guide'
-                continue
-            elif ('5.' in line_stripped or '5)' in line_stripped) and 'FOOD' in line_upper:
-                current_section = 'food_dining'
-                continue
-            elif ('6.' in line_stripped or '6)' in line_stripped) and ('ACTIVITIES' in line_upper or 'ATTRACTIONS' in line_upper):
-                current_section = 'activities'
-                continue
-            elif ('7.' in line_stripped or '7)' in line_stripped) and 'PRACTICAL' in line_upper:
-                current_section = 'practical_info'
-                continue
-            elif ('8.' in line_stripped or '8)' in line_stripped) and 'PACKING' in line_upper:
-                current_section = 'packing'
-                continue
-            elif ('9.' in line_stripped or '9)' in line_stripped) and ('SAFETY' in line_upper or 'HEALTH' in line_upper):
-                current_section = 'safety_health'
-                continue
-            elif ('10.' in line_stripped or '10)' in line_stripped) and 'SPECIFIC' in line_upper:
-                current_section = 'specific_answers'
+            header = next(
+                (key for key, markers, keywords in headers
+                 if any(m in line_stripped for m in markers) and any(k in line_upper for k in keywords)),
+                None
+            )
+            if header:
+                current_section = header
                 continue
 
             # Add content to current section
             if current_section and line.strip():
-                sections[current_section] += line + '\n'
+                parsed[current_section] += line + '\n'
 
-        return sections
+        return parsed
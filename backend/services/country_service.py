@@ -4,6 +4,7 @@ Fetches country information from REST Countries API
 """
 import requests
 from config import Config
+from cache import get_cache
 import logging
 import urllib3
 
@@ -15,9 +16,10 @@ logger = logging.getLogger(__name__)
 class CountryService:
     """Service for fetching country information"""
     
-    def __init__(self):
+    def __init__(self, cache=None):
         self.base_url = Config.REST_COUNTRIES_BASE_URL
-    
+        self.cache = cache or get_cache()
+
     def get_country_info(self, country_name):
         """
         Get country information
@@ -28,6 +30,11 @@ class CountryService:
         Returns:
             Dictionary with country information
         """
+        key = f"name:{country_name.strip().lower()}"
+        return self.cache.get_or_set('country', key, lambda: self._fetch_country_info(country_name))
+
+    def _fetch_country_info(self, country_name):
+        """Fetch country information by name from REST Countries"""
         try:
             # Try to fetch country data
             url = f"{self.base_url}/name/{country_name}"
@@ -43,7 +50,7 @@ class CountryService:
             return None
 
         except Exception as e:
-            logger.error(f"Error fetching country info: {str(e)}")
+            logger.error("Error fetching country info: %s", e)
             return None
 
     def get_country_info_by_code(self, country_code):
@@ -56,6 +63,20 @@ class CountryService:
         Returns:
             Dictionary with country information
         """
+        key = f"code:{country_code.strip().upper()}"
+        return self.cache.get_or_set('country', key, lambda: self._fetch_country_info_by_code(country_code))
+
+    def country_freshness(self, country_code):
+        """Seconds until the cached entry for an ISO code goes stale (None if not cached)"""
+        return self.cache.freshness('country', f"code:{country_code.strip().upper()}")
+
+    def refresh_country_by_code(self, country_code):
+        """Re-fetch country information for an ISO code into the cache; returns True on success"""
+        key = f"code:{country_code.strip().upper()}"
+        return bool(self.cache.refresh('country', key, lambda: self._fetch_country_info_by_code(country_code)))
+
+    def _fetch_country_info_by_code(self, country_code):
+        """Fetch country information by ISO code from REST Countries"""
         try:
             # Fetch country data by code
             url = f"{self.base_url}/alpha/{country_code}"
@@ -76,7 +97,7 @@ class CountryService:
             return self._parse_country_data(country)
 
         except Exception as e:
-            logger.error(f"Error fetching country info by code '{country_code}': {str(e)}")
+            logger.error("Error fetching country info by code '%s': %s", country_code, e)
             return None
     
     def _parse_country_data(self, country):
@@ -96,6 +117,7 @@ class CountryService:
         
         return {
             'name': country.get('name', {}).get('common', ''),
+            'code': country.get('cca2', ''),
             'official_name': country.get('name', {}).get('official', ''),
             'capital': country.get('capital', [''])[0] if country.get('capital') else '',
             'region': country.get('region', ''),
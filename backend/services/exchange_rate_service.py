@@ -0,0 +1,267 @@
+"""
+Exchange Rate Service
+Daily base-currency rate table from ExchangeRate-API, held in memory, and
+local (bulk) conversion of the costs that appear in generated advice
+"""
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from cache import get_cache, is_cache_only
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 1,234.50 / 1234 / 12.5, never ending (or starting) in the middle of a number,
+# so backtracking cannot split "25" into "2" + "5" to dodge the check below
+_AMOUNT = r'(?<!\d)(?<!\d[.,])(?:\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)(?!\d|[.,]\d)'
+
+# Values that mean "no key configured" (.env.example ships a placeholder)
+_PLACEHOLDER_KEYS = ('', 'your-key-here')
+
+# Skip amounts the text already converts, e.g. "25 EUR (~$27)" or "(USD 27)"
+_ALREADY_CONVERTED = r'(?!\s*\(\s*(?:(?:~|≈|approx\.?|about)\s*)?(?:US\$|\$|USD))'
+
+
+def _today():
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class StaticRates:
+    """
+    Local stand-in for the rate API (tests, offline development)
+
+    Usage:
+        ExchangeRateService(fetcher=StaticRates({'EUR': 0.92, 'JPY': 150.0}))
+    """
+
+    def __init__(self, rates, base='USD', date=None):
+        self.rates = {base: 1.0, **rates}
+        self.base = base
+        self.date = date
+        self.calls = 0
+
+    def __call__(self, base):
+        """Return a rate table in the service's format, rebased if needed"""
+        self.calls += 1
+        pivot = self.rates.get(base)
+        if not pivot:
+            return None
+        return {
+            'base': base,
+            'date': self.date or _today(),
+            'rates': {code: rate / pivot for code, rate in self.rates.items()}
+        }
+
+
+class ExchangeRateService:
+    """Service for currency rates and cost conversion"""
+
+    def __init__(self, cache=None, fetcher=None, base_currency=None):
+        self.api_key = Config.EXCHANGE_RATE_API_KEY
+        self.base_url = Config.EXCHANGE_RATE_BASE_URL
+        self.base_currency = base_currency or Config.EXCHANGE_RATE_BASE_CURRENCY
+        self.cache = cache or get_cache()
+        self.fetcher = fetcher or self._fetch_rates
+        # One table per base currency, replaced when the UTC day changes
+        self._tables = {}
+        # Base currency -> monotonic time of the last failed fetch
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._warned_no_key = False
+
+    def get_rate_table(self, base=None):
+        """
+        Get today's rate table
+
+        Args:
+            base: Base currency code (default: EXCHANGE_RATE_BASE_CURRENCY)
+
+        Returns:
+            Dictionary with base, date and rates (units per 1 base), or None
+            (also for Config.EXCHANGE_RATE_RETRY_SECONDS after a failed fetch)
+        """
+        base = (base or self.base_currency).upper()
+        today = _today()
+        table = self._tables.get(base)
+        if table and table['fetched_on'] == today:
+            return table
+        if self._recently_failed(base):
+            return None
+
+        with self._lock:
+            table = self._tables.get(base)
+            if table and table['fetched_on'] == today:
+                return table
+            if self._recently_failed(base):
+                return None
+            table = self.cache.get_or_set('exchange_rates', f"{base}:{today}", lambda: self.fetcher(base))
+            if not table:
+                # A cache-only read that found nothing is not a failed fetch
+                if not is_cache_only():
+                    self._failures[base] = time.monotonic()
+                return None
+            self._failures.pop(base, None)
+            table = {**table, 'fetched_on': today}
+            self._tables[base] = table
+            return table
+
+    def _recently_failed(self, base):
+        failed_at = self._failures.get(base)
+        return failed_at is not None and time.monotonic() - failed_at < Config.EXCHANGE_RATE_RETRY_SECONDS
+
+    def _fetch_rates(self, base):
+        """Fetch the latest rate table from ExchangeRate-API"""
+        if (self.api_key or '').strip() in _PLACEHOLDER_KEYS:
+            if not self._warned_no_key:
+                self._warned_no_key = True
+                logger.warning("EXCHANGE_RATE_API_KEY not set, currency conversion disabled")
+            return None
+        try:
+            url = f"{self.base_url}/{self.api_key}/latest/{base}"
+            response = requests.get(url, timeout=Config.EXCHANGE_RATE_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+            if data.get('result') != 'success':
+                logger.error("Exchange rate API error for %s: %s", base, data.get('error-type'))
+                return None
+
+            updated = data.get('time_last_update_unix')
+            return {
+                'base': data.get('base_code', base),
+                'date': datetime.fromtimestamp(updated, timezone.utc).date().isoformat() if updated else _today(),
+                'rates': data.get('conversion_rates', {})
+            }
+        except Exception as e:
+            logger.error("Error fetching exchange rates for %s: %s", base, e)
+            return None
+
+    def rate(self, from_currency, to_currency=None):
+        """Units of to_currency per unit of from_currency, or None if unknown"""
+        table = self.get_rate_table()
+        if not table:
+            return None
+        rates = table['rates']
+        source = rates.get(from_currency.upper())
+        target = rates.get((to_currency or table['base']).upper())
+        if not source or not target:
+            return None
+        return target / source
+
+    def convert_many(self, amounts, from_currency, to_currency=None):
+        """
+        Convert a batch of amounts with one rate lookup
+
+        Args:
+            amounts: Iterable of numbers in from_currency
+            from_currency: ISO 4217 code of the amounts
+            to_currency: Target code (default: the base currency)
+
+        Returns:
+            List of converted amounts, or None if the rate is unavailable
+        """
+        rate = self.rate(from_currency, to_currency)
+        if rate is None:
+            return None
+        return [amount * rate for amount in amounts]
+
+    def convert(self, amount, from_currency, to_currency=None):
+        converted = self.convert_many((amount,), from_currency, to_currency)
+        return converted[0] if converted else None
+
+    def exchange_info(self, currency):
+        """
+        Rate summary for a local currency against the base currency
+
+        Returns:
+            Dictionary with currency, base, rate (base per 1 local) and
+            date, or None when the rate is unavailable
+        """
+        table = self.get_rate_table()
+        rate = self.rate(currency) if table else None
+        if rate is None:
+            return None
+        return {
+            'currency': currency.upper(),
+            'base': table['base'],
+            'rate': rate,
+            'date': table['date']
+        }
+
+    def annotate_costs(self, texts, currency, symbol=None):
+        """
+        Append base-currency equivalents to local-currency amounts
+
+        "25 EUR" becomes "25 EUR (~$27)" and "€10-15" becomes
+        "€10-15 (~$11-16)". Every amount in every text is converted in one
+        batch.
+
+        Args:
+            texts: Dictionary of name -> text
+            currency: ISO 4217 code of the local currency
+            symbol: Local currency symbol, matched unless it is a bare '$'
+
+        Returns:
+            Dictionary of name -> annotated text (unchanged if no rate)
+        """
+        table = self.get_rate_table()
+        if not table or currency.upper() == table['base'] or self.rate(currency) is None:
+            return dict(texts)
+
+        pattern = _cost_pattern(currency, symbol)
+        matches = {name: list(pattern.finditer(text)) for name, text in texts.items()}
+        amounts = [
+            float(value.replace(',', ''))
+            for found in matches.values() for m in found for value in _amounts(m)
+        ]
+        converted = iter(self.convert_many(amounts, currency))
+
+        annotated = {}
+        for name, text in texts.items():
+            parts, position = [], 0
+            for m in matches[name]:
+                values = [next(converted) for _ in _amounts(m)]
+                parts.append(text[position:m.end()])
+                parts.append(f" ({_format_equivalent(values, table['base'])})")
+                position = m.end()
+            parts.append(text[position:])
+            annotated[name] = ''.join(parts)
+        return annotated
+
+
+def _cost_pattern(currency, symbol=None):
+    """Regex for amounts written with the currency code or symbol, single or as a range"""
+    tokens = [re.escape(currency.upper())]
+    if symbol and symbol.strip() and symbol.strip() != '$':
+        tokens.append(re.escape(symbol.strip()))
+    token = '(?<![A-Za-z])(?:' + '|'.join(tokens) + ')'
+    # A single amount may not be the first half of a range (backtracking out of the range part)
+    prefixed = (
+        rf'{token}\s?(?P<p1>{_AMOUNT})'
+        rf'(?:\s?[-–]\s?(?:{token}\s?)?(?P<p2>{_AMOUNT})|(?!\s?[-–]\s?(?:{token}\s?)?\d))'
+    )
+    suffixed = rf'(?P<s1>{_AMOUNT})(?:\s?[-–]\s?(?P<s2>{_AMOUNT}))?\s?{token}(?![A-Za-z])'
+    return re.compile(rf'(?:{prefixed}|{suffixed}){_ALREADY_CONVERTED}')
+
+
+def _amounts(match):
+    """The one or two amounts captured by a cost match"""
+    return [value for value in match.group('p1', 'p2', 's1', 's2') if value]
+
+
+def _format_equivalent(values, base):
+    """'~$27' / '~$11-16' / '~23 GBP'"""
+    numbers = '-'.join(f"{value:,.0f}" if value >= 10 else f"{value:.2f}" for value in values)
+    return f"~${numbers}" if base == 'USD' else f"~{numbers} {base}"
+
+
+def local_currency(country_data):
+    """(code, symbol) of the country's first listed currency, or (None, None)"""
+    currencies = (country_data or {}).get('currencies_raw') or {}
+    for code, details in currencies.items():
+        return code, (details or {}).get('symbol')
+    return None, None
@@ -0,0 +1,144 @@
+"""
+Geo Index
+Geohash-bucketed index of the locations weather data is fetched for, so a
+nearby destination can reuse an existing location's forecast and climate
+series instead of fetching its own
+
+Points are bucketed by geohash cells at least as tall as the search radius;
+a lookup only scans the cells overlapping the radius around the query point.
+"""
+import math
+import threading
+from collections import OrderedDict
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_EARTH_RADIUS_KM = 6371.0
+_KM_PER_DEGREE = 111.32
+
+
+def geohash_encode(lat, lon, precision):
+    """Geohash string of the cell containing (lat, lon)"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, interval = (lon, lon_range) if even else (lat, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(lat degrees, lon degrees) spanned by a geohash cell"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex:
+    """
+    Thread-safe nearest-point lookup within a fixed radius
+
+    Holds at most max_points points; the oldest are dropped first.
+    """
+
+    def __init__(self, radius_km, max_points=10000):
+        self.radius_km = radius_km
+        self.max_points = max_points
+        # Finest precision whose cells are still at least radius_km tall
+        self.precision = 1
+        while self.precision < 9 and cell_size(self.precision + 1)[0] * _KM_PER_DEGREE >= radius_km:
+            self.precision += 1
+        self._cell_lat, self._cell_lon = cell_size(self.precision)
+        self._buckets = {}
+        # (lat, lon) -> (cell, payload), in insertion order
+        self._points = OrderedDict()
+        self._lock = threading.Lock()
+
+    def nearest(self, lat, lon):
+        """
+        Closest indexed point within the radius
+
+        Returns:
+            Tuple of (lat, lon, payload, distance_km), or None
+        """
+        with self._lock:
+            return self._nearest(lat, lon)
+
+    def nearest_or_add(self, lat, lon, payload=None):
+        """
+        Closest indexed point within the radius; if there is none, index this one
+
+        Returns:
+            Tuple of (lat, lon, payload, distance_km) - the point itself at
+            distance 0 when it was added
+        """
+        with self._lock:
+            found = self._nearest(lat, lon)
+            if found:
+                return found
+            self._add(lat, lon, payload)
+            return lat, lon, payload, 0.0
+
+    def add(self, lat, lon, payload=None):
+        with self._lock:
+            self._add(lat, lon, payload)
+
+    def _add(self, lat, lon, payload):
+        if (lat, lon) in self._points:
+            return
+        cell = geohash_encode(lat, lon, self.precision)
+        self._buckets.setdefault(cell, []).append((lat, lon))
+        self._points[(lat, lon)] = (cell, payload)
+        while len(self._points) > self.max_points:
+            point, (old_cell, _) = self._points.popitem(last=False)
+            bucket = self._buckets[old_cell]
+            bucket.remove(point)
+            if not bucket:
+                del self._buckets[old_cell]
+
+    def _nearest(self, lat, lon):
+        best = None
+        for cell in self._cells_within(lat, lon):
+            for point in self._buckets.get(cell, ()):
+                distance = haversine_km(lat, lon, *point)
+                if distance <= self.radius_km and (best is None or distance < best[3]):
+                    best = (point[0], point[1], self._points[point][1], distance)
+        return best
+
+    def _cells_within(self, lat, lon):
+        """Cells overlapping the radius's bounding box (one sample per cell row and column)"""
+        dlat = self.radius_km / _KM_PER_DEGREE
+        dlon = min(180.0, dlat / max(math.cos(math.radians(lat)), 1e-6))
+        rows = int(dlat / self._cell_lat) + 1
+        columns = min(int(dlon / self._cell_lon) + 1, int(180.0 / self._cell_lon))
+        cells = set()
+        for i in range(-rows, rows + 1):
+            cell_lat = max(-90.0, min(90.0 - 1e-9, lat + i * self._cell_lat))
+            for j in range(-columns, columns + 1):
+                cell_lon = (lon + j * self._cell_lon + 180.0) % 360.0 - 180.0
+                cells.add(geohash_encode(cell_lat, cell_lon, self.precision))
+        return cells
+
+    def __len__(self):
+        return len(self._points)
@@ -0,0 +1,273 @@
+"""
+Model Router
+Per-call-type model and token policies for Claude, rolling time-to-first-token
+and latency stats per model, and hedged requests for calls that overrun their
+latency budget
+
+Calls are streamed, so time to first token is measured and a hedge race's
+loser can be aborted mid-response instead of running to completion.
+"""
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from concurrency import submit_with_context
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# model: first choice; hedge_model: where the hedged duplicate goes;
+# slo_seconds: latency budget before hedging; max_tokens: default output cap
+RoutePolicy = namedtuple('RoutePolicy', ('model', 'hedge_model', 'slo_seconds', 'max_tokens'))
+
+CALL_TYPES = ('plan', 'section', 'qa')
+
+# Samples needed before rolling stats influence routing or hedge timing
+_MIN_SAMPLES = 5
+
+
+def default_policies():
+    """Route policies from Config"""
+    return {
+        call_type: RoutePolicy(
+            model=Config.CLAUDE_MODELS[call_type],
+            hedge_model=Config.CLAUDE_HEDGE_MODELS[call_type],
+            slo_seconds=Config.CLAUDE_SLO_SECONDS[call_type],
+            max_tokens=Config.CLAUDE_MAX_TOKENS.get(call_type)
+        )
+        for call_type in CALL_TYPES
+    }
+
+
+class LatencyTracker:
+    """Rolling windows of time to first token and total latency per (model, call type)"""
+
+    METRICS = ('latency', 'ttft')
+
+    def __init__(self, window=None):
+        self.window = window or Config.MODEL_LATENCY_WINDOW
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, call_type, seconds, ttft=None):
+        """Record a completed call's latency and, if it streamed any text, its time to first token"""
+        with self._lock:
+            for metric, value in (('latency', seconds), ('ttft', ttft)):
+                if value is None:
+                    continue
+                samples = self._samples.get((model, call_type, metric))
+                if samples is None:
+                    samples = self._samples[(model, call_type, metric)] = deque(maxlen=self.window)
+                samples.append(value)
+
+    def percentile(self, model, call_type, q, metric='latency'):
+        """q-th percentile (0-100) of a metric, or None with too few samples"""
+        with self._lock:
+            samples = sorted(self._samples.get((model, call_type, metric), ()))
+        if len(samples) < _MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def snapshot(self):
+        with self._lock:
+            keys = sorted({(model, call_type) for model, call_type, _ in self._samples})
+            counts = {key: len(self._samples.get(key + ('latency',), ())) for key in keys}
+        return [
+            {
+                'model': model,
+                'call_type': call_type,
+                'samples': counts[(model, call_type)],
+                'p50': self.percentile(model, call_type, 50),
+                'p95': self.percentile(model, call_type, 95),
+                'ttft_p50': self.percentile(model, call_type, 50, 'ttft'),
+                'ttft_p95': self.percentile(model, call_type, 95, 'ttft')
+            }
+            for model, call_type in keys
+        ]
+
+
+class _Aborted(Exception):
+    """A hedge race's losing call was stopped"""
+
+
+class ModelRouter:
+    """Chooses the model for each Claude call and hedges slow ones"""
+
+    def __init__(self, policies=None, tracker=None, hedging=None):
+        self.policies = policies or default_policies()
+        self.tracker = tracker or LatencyTracker()
+        self.hedging = Config.CLAUDE_HEDGING if hedging is None else hedging
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+        self._counter_lock = threading.Lock()
+        self._pool = None
+        self._hedge_pool = None
+        self._pool_lock = threading.Lock()
+        # Hedges get their own threads, so they never queue behind the slow
+        # calls they race; with every slot busy, a call is not hedged
+        self._hedge_slots = threading.BoundedSemaphore(Config.CLAUDE_MAX_HEDGE_CALLS)
+
+    def policy(self, call_type):
+        return self.policies[call_type]
+
+    def models_for(self, call_type):
+        """
+        (first, hedge) models for a call
+
+        The configured model goes first unless its recent median latency
+        already exceeds the budget and the hedge model's is lower.
+        """
+        policy = self.policies[call_type]
+        first, hedge = policy.model, policy.hedge_model or policy.model
+        first_p50 = self.tracker.percentile(first, call_type, 50)
+        hedge_p50 = self.tracker.percentile(hedge, call_type, 50)
+        if first_p50 and hedge_p50 and first_p50 > policy.slo_seconds and hedge_p50 < first_p50:
+            return hedge, first
+        return first, hedge
+
+    def hedge_delay(self, call_type, model):
+        """Seconds to wait before hedging: the SLO budget, or sooner if this model's p95 is well under it"""
+        budget = self.policies[call_type].slo_seconds
+        p95 = self.tracker.percentile(model, call_type, 95)
+        return min(budget, p95 * 1.5) if p95 else budget
+
+    def create(self, client, call_type, messages, max_tokens=None):
+        """
+        Run a streamed messages call under the route policy
+
+        Args:
+            client: Anthropic client
+            call_type: One of CALL_TYPES
+            messages: Messages for the request
+            max_tokens: Output cap (default: the policy's)
+
+        Returns:
+            Tuple of (final message, model that produced it)
+        """
+        policy = self.policies[call_type]
+        max_tokens = max_tokens or policy.max_tokens
+        first, hedge = self.models_for(call_type)
+
+        # Hedging onto the same model only doubles the load on a slow model
+        if not self.hedging or hedge == first:
+            return self._call(client, call_type, first, messages, max_tokens), first
+
+        started = threading.Event()
+        primary, abort = self._submit(self._executor(), client, call_type, first, messages, max_tokens, started)
+        calls = {primary: (first, abort)}
+        delay = self.hedge_delay(call_type, first)
+        # The budget runs from when the call starts; a call still waiting for a
+        # pool thread after a whole budget is hedged right away
+        done = wait([primary], timeout=delay)[0] if started.wait(delay) else ()
+
+        if not done:
+            hedged = self._submit_hedge(client, call_type, hedge, messages, max_tokens)
+            if not hedged:
+                with self._counter_lock:
+                    self.hedges_skipped += 1
+                logger.warning("%s call on %s exceeded %.1fs, no hedge capacity left", call_type, first, delay)
+            else:
+                with self._counter_lock:
+                    self.hedges_fired += 1
+                logger.warning("%s call on %s exceeded %.1fs, hedging on %s", call_type, first, delay, hedge)
+                future, abort = hedged
+                calls[future] = (hedge, abort)
+
+        # First successful response wins; losers are cancelled if still queued,
+        # or aborted mid-stream (which closes their connection)
+        pending = set(calls)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        with self._counter_lock:
+                            self.hedges_won += 1
+                    for loser in pending:
+                        loser.cancel()
+                        calls[loser][1].set()
+                    return future.result(), calls[future][0]
+                error = future.exception()
+        raise error
+
+    def _submit(self, pool, client, call_type, model, messages, max_tokens, started_event=None, on_done=None):
+        """
+        Run _call on a pool
+
+        Returns:
+            Tuple of (future, abort event that stops the call)
+        """
+        abort = threading.Event()
+
+        def run():
+            try:
+                return self._call(client, call_type, model, messages, max_tokens, started_event, abort)
+            finally:
+                if on_done is not None:
+                    on_done()
+
+        future = submit_with_context(pool, run)
+        if on_done is not None:
+            # A cancelled future never runs, so release its slot here
+            future.add_done_callback(lambda f: f.cancelled() and on_done())
+        return future, abort
+
+    def _submit_hedge(self, client, call_type, model, messages, max_tokens):
+        """Start a hedge on its own capacity: (future, abort event), or None if every hedge slot is busy"""
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+        return self._submit(
+            self._hedge_executor(), client, call_type, model, messages, max_tokens,
+            on_done=self._hedge_slots.release
+        )
+
+    def _call(self, client, call_type, model, messages, max_tokens, started_event=None, abort=None):
+        """Stream one messages call; returns the final message"""
+        if started_event is not None:
+            started_event.set()
+        started = time.perf_counter()
+        ttft = None
+        with client.messages.stream(model=model, max_tokens=max_tokens, messages=messages) as stream:
+            for event in stream:
+                if abort is not None and abort.is_set():
+                    # Leaving the block closes the connection
+                    raise _Aborted(model)
+                if ttft is None and event.type == 'content_block_delta':
+                    ttft = time.perf_counter() - started
+            response = stream.get_final_message()
+        self.tracker.record(model, call_type, time.perf_counter() - started, ttft)
+        return response
+
+    def _executor(self):
+        # Created on first use so a preloading gunicorn master starts no threads
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=Config.CLAUDE_MAX_CONCURRENT_CALLS, thread_name_prefix='claude'
+                    )
+        return self._pool
+
+    def _hedge_executor(self):
+        if self._hedge_pool is None:
+            with self._pool_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=Config.CLAUDE_MAX_HEDGE_CALLS, thread_name_prefix='claude-hedge'
+                    )
+        return self._hedge_pool
+
+    def stats(self):
+        """Policies, hedge counters and rolling latencies"""
+        return {
+            'hedging': self.hedging,
+            'hedges_fired': self.hedges_fired,
+            'hedges_won': self.hedges_won,
+            'hedges_skipped': self.hedges_skipped,
+            'policies': {call_type: policy._asdict() for call_type, policy in self.policies.items()},
+            'latency': self.tracker.snapshot()
+        }
@@ -0,0 +1,331 @@
+"""
+Power Plugs
+Bundled plug-type / voltage / frequency table keyed by ISO 3166-1 alpha-2 code
+Source: IEC World Plugs and worldstandards.eu country pages
+"""
+
+INFO_BASE_URL = 'https://www.worldstandards.eu/electricity/plug-voltage-by-country/'
+GENERAL_INFO_URL = 'https://www.worldstandards.eu/electricity/plugs-and-sockets/'
+
+# Worldstandards.eu uses idiosyncratic slugs for some countries — natural
+# slugifications of the long-form names 404. Maps the slug we'd otherwise
+# produce to the slug the site actually serves.
+_POWER_PLUG_SLUG_ALIASES = {
+    'united-kingdom': 'uk',
+    'united-states': 'usa',
+    'united-states-of-america': 'usa',
+    'czech-republic': 'czechia',
+    'cote-divoire': 'ivory-coast',
+    'trinidad-and-tobago': 'trinidad-tobago',
+    'democratic-republic-of-the-congo': 'congo-kinshasa',
+    'dr-congo': 'congo-kinshasa',
+    'republic-of-the-congo': 'congo-brazzaville',
+    'burma': 'myanmar',
+}
+
+PLUG_TYPE_DESCRIPTIONS = {
+    'A': 'two flat parallel pins',
+    'B': 'two flat parallel pins plus a round earth pin',
+    'C': 'two round pins (Europlug)',
+    'D': 'three large round pins in a triangle',
+    'E': 'two round pins plus a hole for the socket\'s earth pin',
+    'F': 'two round pins with earth clips on the sides (Schuko)',
+    'G': 'three rectangular pins in a triangle',
+    'H': 'three pins in a V-shape',
+    'I': 'two flat pins in a V-shape plus an earth pin',
+    'J': 'three round pins (Swiss)',
+    'K': 'three round pins with a U-shaped earth pin (Danish)',
+    'L': 'three round pins in a row (Italian)',
+    'M': 'three large round pins in a triangle (larger than type D)',
+    'N': 'three round pins (Brazilian)',
+    'O': 'three round pins (Thai)',
+}
+
+# code: (country name as used for the URL slug, plug types, volts, hertz - a tuple where the grid is split)
+_PLUG_TABLE = {
+    'AD': ('Andorra', 'CF', 230, 50),
+    'AE': ('United Arab Emirates', 'CDG', 230, 50),
+    'AF': ('Afghanistan', 'CF', 220, 50),
+    'AG': ('Antigua and Barbuda', 'AB', 230, 60),
+    'AI': ('Anguilla', 'AB', 110, 60),
+    'AL': ('Albania', 'CF', 230, 50),
+    'AM': ('Armenia', 'CF', 230, 50),
+    'AO': ('Angola', 'C', 220, 50),
+    'AR': ('Argentina', 'CI', 220, 50),
+    'AS': ('American Samoa', 'ABFI', 120, 60),
+    'AT': ('Austria', 'CF', 230, 50),
+    'AU': ('Australia', 'I', 230, 50),
+    'AW': ('Aruba', 'ABF', 120, 60),
+    'AZ': ('Azerbaijan', 'CF', 220, 50),
+    'BA': ('Bosnia and Herzegovina', 'CF', 230, 50),
+    'BB': ('Barbados', 'AB', 115, 50),
+    'BD': ('Bangladesh', 'CDGK', 220, 50),
+    'BE': ('Belgium', 'CE', 230, 50),
+    'BF': ('Burkina Faso', 'CE', 220, 50),
+    'BG': ('Bulgaria', 'CF', 230, 50),
+    'BH': ('Bahrain', 'G', 230, 50),
+    'BI': ('Burundi', 'CE', 220, 50),
+    'BJ': ('Benin', 'CE', 220, 50),
+    'BM': ('Bermuda', 'AB', 120, 60),
+    'BN': ('Brunei', 'G', 240, 50),
+    'BO': ('Bolivia', 'AC', 230, 50),
+    'BQ': ('Bonaire', 'ABCF', 127, 50),
+    'BR': ('Brazil', 'CN', 127, 60),
+    'BS': ('Bahamas', 'AB', 120, 60),
+    'BT': ('Bhutan', 'CDG', 230, 50),
+    'BW': ('Botswana', 'DG', 230, 50),
+    'BY': ('Belarus', 'CF', 220, 50),
+    'BZ': ('Belize', 'ABG', 110, 60),
+    'CA': ('Canada', 'AB', 120, 60),
+    'CD': ('DR Congo', 'CDE', 220, 50),
+    'CF': ('Central African Republic', 'CE', 220, 50),
+    'CG': ('Republic of the Congo', 'CE', 230, 50),
+    'CH': ('Switzerland', 'CJ', 230, 50),
+    'CI': ('Cote dIvoire', 'CE', 230, 50),
+    'CK': ('Cook Islands', 'I', 240, 50),
+    'CL': ('Chile', 'CL', 220, 50),
+    'CM': ('Cameroon', 'CE', 220, 50),
+    'CN': ('China', 'ACI', 220, 50),
+    'CO': ('Colombia', 'AB', 110, 60),
+    'CR': ('Costa Rica', 'AB', 120, 60),
+    'CU': ('Cuba', 'ABCL', 110, 60),
+    'CV': ('Cape Verde', 'CF', 230, 50),
+    'CW': ('Curacao', 'ABF', 127, 50),
+    'CY': ('Cyprus', 'G', 230, 50),
+    'CZ': ('Czechia', 'CE', 230, 50),
+    'DE': ('Germany', 'CF', 230, 50),
+    'DJ': ('Djibouti', 'CE', 220, 50),
+    'DK': ('Denmark', 'CEFK', 230, 50),
+    'DM': ('Dominica', 'DG', 230, 50),
+    'DO': ('Dominican Republic', 'AB', 120, 60),
+    'DZ': ('Algeria', 'CF', 230, 50),
+    'EC': ('Ecuador', 'AB', 120, 60),
+    'EE': ('Estonia', 'CF', 230, 50),
+    'EG': ('Egypt', 'CF', 220, 50),
+    'EH': ('Western Sahara', 'CE', 220, 50),
+    'ER': ('Eritrea', 'CL', 230, 50),
+    'ES': ('Spain', 'CF', 230, 50),
+    'ET': ('Ethiopia', 'CEFL', 220, 50),
+    'FI': ('Finland', 'CF', 230, 50),
+    'FJ': ('Fiji', 'I', 240, 50),
+    'FK': ('Falkland Islands', 'G', 240, 50),
+    'FM': ('Micronesia', 'AB', 120, 60),
+    'FO': ('Faroe Islands', 'CEFK', 230, 50),
+    'FR': ('France', 'CE', 230, 50),
+    'GA': ('Gabon', 'C', 220, 50),
+    'GB': ('United Kingdom', 'G', 230, 50),
+    'GD': ('Grenada', 'G', 230, 50),
+    'GE': ('Georgia', 'CF', 220, 50),
+    'GF': ('French Guiana', 'CDE', 220, 50),
+    'GG': ('Guernsey', 'CG', 230, 50),
+    'GH': ('Ghana', 'DG', 230, 50),
+    'GI': ('Gibraltar', 'CG', 240, 50),
+    'GL': ('Greenland', 'CEFK', 230, 50),
+    'GM': ('Gambia', 'G', 230, 50),
+    'GN': ('Guinea', 'CFK', 220, 50),
+    'GP': ('Guadeloupe', 'CDE', 230, 50),
+    'GQ': ('Equatorial Guinea', 'CE', 220, 50),
+    'GR': ('Greece', 'CF', 230, 50),
+    'GT': ('Guatemala', 'AB', 120, 60),
+    'GU': ('Guam', 'AB', 110, 60),
+    'GW': ('Guinea-Bissau', 'C', 220, 50),
+    'GY': ('Guyana', 'ABDG', 240, 60),
+    'HK': ('Hong Kong', 'G', 220, 50),
+    'HN': ('Honduras', 'AB', 120, 60),
+    'HR': ('Croatia', 'CF', 230, 50),
+    'HT': ('Haiti', 'AB', 110, 60),
+    'HU': ('Hungary', 'CF', 230, 50),
+    'ID': ('Indonesia', 'CF', 230, 50),
+    'IE': ('Ireland', 'G', 230, 50),
+    'IL': ('Israel', 'CH', 230, 50),
+    'IM': ('Isle of Man', 'CG', 240, 50),
+    'IN': ('India', 'CDM', 230, 50),
+    'IQ': ('Iraq', 'CDG', 230, 50),
+    'IR': ('Iran', 'CF', 220, 50),
+    'IS': ('Iceland', 'CF', 230, 50),
+    'IT': ('Italy', 'CFL', 230, 50),
+    'JE': ('Jersey', 'G', 230, 50),
+    'JM': ('Jamaica', 'AB', 110, 50),
+    'JO': ('Jordan', 'BCDFGJ', 230, 50),
+    'JP': ('Japan', 'AB', 100, (50, 60)),  # 50 Hz in the east (Tokyo), 60 Hz in the west (Osaka)
+    'KE': ('Kenya', 'G', 240, 50),
+    'KG': ('Kyrgyzstan', 'CF', 220, 50),
+    'KH': ('Cambodia', 'ACG', 230, 50),
+    'KI': ('Kiribati', 'I', 240, 50),
+    'KM': ('Comoros', 'CE', 220, 50),
+    'KN': ('Saint Kitts and Nevis', 'DG', 230, 60),
+    'KP': ('North Korea', 'CF', 220, 50),
+    'KR': ('South Korea', 'CF', 220, 60),
+    'KW': ('Kuwait', 'CG', 240, 50),
+    'KY': ('Cayman Islands', 'AB', 120, 60),
+    'KZ': ('Kazakhstan', 'CF', 220, 50),
+    'LA': ('Laos', 'ABCEF', 230, 50),
+    'LB': ('Lebanon', 'ABCDG', 230, 50),
+    'LC': ('Saint Lucia', 'G', 240, 50),
+    'LI': ('Liechtenstein', 'CJ', 230, 50),
+    'LK': ('Sri Lanka', 'DG', 230, 50),
+    'LR': ('Liberia', 'AB', 120, 60),
+    'LS': ('Lesotho', 'M', 220, 50),
+    'LT': ('Lithuania', 'CF', 230, 50),
+    'LU': ('Luxembourg', 'CF', 230, 50),
+    'LV': ('Latvia', 'CF', 230, 50),
+    'LY': ('Libya', 'CL', 230, 50),
+    'MA': ('Morocco', 'CE', 220, 50),
+    'MC': ('Monaco', 'CDEF', 230, 50),
+    'MD': ('Moldova', 'CF', 230, 50),
+    'ME': ('Montenegro', 'CF', 230, 50),
+    'MF': ('Saint Martin', 'CE', 220, 60),
+    'MG': ('Madagascar', 'CDEJK', 220, 50),
+    'MH': ('Marshall Islands', 'AB', 120, 60),
+    'MK': ('North Macedonia', 'CF', 230, 50),
+    'ML': ('Mali', 'CE', 220, 50),
+    'MM': ('Myanmar', 'CDFG', 230, 50),
+    'MN': ('Mongolia', 'CE', 230, 50),
+    'MO': ('Macau', 'DGM', 220, 50),
+    'MP': ('Northern Mariana Islands', 'AB', 110, 60),
+    'MQ': ('Martinique', 'CDE', 220, 50),
+    'MR': ('Mauritania', 'C', 220, 50),
+    'MS': ('Montserrat', 'AB', 230, 60),
+    'MT': ('Malta', 'G', 230, 50),
+    'MU': ('Mauritius', 'CG', 230, 50),
+    'MV': ('Maldives', 'CDGJKL', 230, 50),
+    'MW': ('Malawi', 'G', 230, 50),
+    'MX': ('Mexico', 'AB', 127, 60),
+    'MY': ('Malaysia', 'G', 240, 50),
+    'MZ': ('Mozambique', 'CFM', 220, 50),
+    'NA': ('Namibia', 'DM', 220, 50),
+    'NC': ('New Caledonia', 'CF', 220, 50),
+    'NE': ('Niger', 'ABCDEF', 220, 50),
+    'NG': ('Nigeria', 'DG', 230, 50),
+    'NI': ('Nicaragua', 'AB', 120, 60),
+    'NL': ('Netherlands', 'CF', 230, 50),
+    'NO': ('Norway', 'CF', 230, 50),
+    'NP': ('Nepal', 'CDM', 230, 50),
+    'NR': ('Nauru', 'I', 240, 50),
+    'NU': ('Niue', 'I', 230, 50),
+    'NZ': ('New Zealand', 'I', 230, 50),
+    'OM': ('Oman', 'CG', 240, 50),
+    'PA': ('Panama', 'AB', 120, 60),
+    'PE': ('Peru', 'ABC', 220, 60),
+    'PF': ('French Polynesia', 'AE', 220, 60),
+    'PG': ('Papua New Guinea', 'I', 240, 50),
+    'PH': ('Philippines', 'ABC', 220, 60),
+    'PK': ('Pakistan', 'CD', 230, 50),
+    'PL': ('Poland', 'CE', 230, 50),
+    'PR': ('Puerto Rico', 'AB', 120, 60),
+    'PS': ('Palestine', 'CH', 230, 50),
+    'PT': ('Portugal', 'CF', 230, 50),
+    'PW': ('Palau', 'AB', 120, 60),
+    'PY': ('Paraguay', 'C', 220, 50),
+    'QA': ('Qatar', 'DG', 240, 50),
+    'RE': ('Reunion', 'E', 220, 50),
+    'RO': ('Romania', 'CF', 230, 50),
+    'RS': ('Serbia', 'CF', 230, 50),
+    'RU': ('Russia', 'CF', 220, 50),
+    'RW': ('Rwanda', 'CJ', 230, 50),
+    'SA': ('Saudi Arabia', 'G', 230, 60),
+    'SB': ('Solomon Islands', 'GI', 230, 50),
+    'SC': ('Seychelles', 'G', 240, 50),
+    'SD': ('Sudan', 'CD', 230, 50),
+    'SE': ('Sweden', 'CF', 230, 50),
+    'SG': ('Singapore', 'G', 230, 50),
+    'SH': ('Saint Helena', 'G', 230, 50),
+    'SI': ('Slovenia', 'CF', 230, 50),
+    'SK': ('Slovakia', 'CE', 230, 50),
+    'SL': ('Sierra Leone', 'DG', 230, 50),
+    'SM': ('San Marino', 'CFL', 230, 50),
+    'SN': ('Senegal', 'CDEK', 230, 50),
+    'SO': ('Somalia', 'C', 220, 50),
+    'SR': ('Suriname', 'CF', 127, 60),
+    'SS': ('South Sudan', 'CD', 230, 50),
+    'ST': ('Sao Tome and Principe', 'CF', 220, 50),
+    'SV': ('El Salvador', 'AB', 115, 60),
+    'SX': ('Sint Maarten', 'AB', 110, 60),
+    'SY': ('Syria', 'CEL', 220, 50),
+    'SZ': ('Eswatini', 'M', 230, 50),
+    'TC': ('Turks and Caicos Islands', 'AB', 120, 60),
+    'TD': ('Chad', 'CDEF', 220, 50),
+    'TG': ('Togo', 'C', 220, 50),
+    'TH': ('Thailand', 'ABCFO', 230, 50),
+    'TJ': ('Tajikistan', 'CF', 220, 50),
+    'TL': ('Timor-Leste', 'CEFI', 220, 50),
+    'TM': ('Turkmenistan', 'CF', 220, 50),
+    'TN': ('Tunisia', 'CE', 230, 50),
+    'TO': ('Tonga', 'I', 240, 50),
+    'TR': ('Turkey', 'CF', 230, 50),
+    'TT': ('Trinidad and Tobago', 'AB', 115, 60),
+    'TV': ('Tuvalu', 'I', 220, 50),
+    'TW': ('Taiwan', 'AB', 110, 60),
+    'TZ': ('Tanzania', 'DG', 230, 50),
+    'UA': ('Ukraine', 'CF', 230, 50),
+    'UG': ('Uganda', 'G', 240, 50),
+    'US': ('United States', 'AB', 120, 60),
+    'UY': ('Uruguay', 'CFIL', 220, 50),
+    'UZ': ('Uzbekistan', 'CF', 220, 50),
+    'VA': ('Vatican City', 'CFL', 230, 50),
+    'VC': ('Saint Vincent and the Grenadines', 'CEG', 230, 50),
+    'VE': ('Venezuela', 'AB', 120, 60),
+    'VG': ('British Virgin Islands', 'AB', 110, 60),
+    'VI': ('US Virgin Islands', 'AB', 110, 60),
+    'VN': ('Vietnam', 'ABC', 220, 50),
+    'VU': ('Vanuatu', 'I', 230, 50),
+    'WS': ('Samoa', 'I', 230, 50),
+    'XK': ('Kosovo', 'CF', 230, 50),
+    'YE': ('Yemen', 'ADG', 230, 50),
+    'YT': ('Mayotte', 'CE', 230, 50),
+    'ZA': ('South Africa', 'CDMN', 230, 50),
+    'ZM': ('Zambia', 'CDG', 230, 50),
+    'ZW': ('Zimbabwe', 'DG', 240, 50),
+}
+
+
+def country_slug(country_name):
+    """Worldstandards.eu slug for a country name"""
+    slug = country_name.lower().replace(' ', '-')
+    slug = ''.join(c if c.isalnum() or c == '-' else '' for c in slug)
+    return _POWER_PLUG_SLUG_ALIASES.get(slug, slug)
+
+
+def info_url_for_name(country_name):
+    """Country page URL from a name, or the general plugs page"""
+    return f"{INFO_BASE_URL}{country_slug(country_name)}/" if country_name else GENERAL_INFO_URL
+
+
+# Structured entries, built once at import (shared copy-on-write by preloaded workers)
+POWER_PLUGS = {
+    code: {
+        'plug_types': tuple(types),
+        'voltage': voltage,
+        # Always a sequence of hertz values (a JSON list), e.g. (50,) or (50, 60)
+        'frequency': frequency if isinstance(frequency, tuple) else (frequency,),
+        'info_url': info_url_for_name(name),
+    }
+    for code, (name, types, voltage, frequency) in _PLUG_TABLE.items()
+}
+
+
+def get_power_plug_info(country_code):
+    """
+    Plug types, voltage and frequency for a country
+
+    Args:
+        country_code: ISO 3166-1 alpha-2 code (e.g. 'FR')
+
+    Returns:
+        Dictionary with plug_types, voltage, frequency (list of Hz) and info_url, or None
+    """
+    if not country_code:
+        return None
+    return POWER_PLUGS.get(country_code.strip().upper())
+
+
+def describe_power_plugs(info):
+    """Bullet-point description of a plug table entry"""
+    lines = [
+        f"- Plug types: {', '.join(info['plug_types'])}",
+        f"- Voltage: {info['voltage']} V, {'/'.join(str(hz) for hz in info['frequency'])} Hz",
+    ]
+    lines.extend(
+        f"- Type {plug}: {PLUG_TYPE_DESCRIPTIONS[plug]}" for plug in info['plug_types']
+    )
+    return '\n'.join(lines)
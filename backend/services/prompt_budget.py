@@ -0,0 +1,130 @@
+"""
+Prompt Budget
+Keeps travel-advice prompts and output limits proportional to what a request
+actually needs: long weather series are summarized by week, country context
+is trimmed to the requested sections, and max_tokens follows the number of
+sections and the trip length.
+"""
+from collections import Counter
+
+from config import Config
+
+# Country fields each advice section draws on; general context (capital,
+# region) helps accommodation and activity suggestions
+SECTION_COUNTRY_FIELDS = {
+    'accommodation': ('capital', 'region'),
+    'currency_payments': ('currency',),
+    'transportation': ('driving_side',),
+    'cultural_guide': ('languages', 'region'),
+    'food_dining': ('region',),
+    'activities': ('capital', 'region'),
+    'practical_info': ('languages', 'timezone', 'calling_code'),
+    'packing': (),
+    'safety_health': (),
+    'specific_answers': ('currency', 'languages', 'capital', 'region', 'timezone'),
+}
+
+# Prompt label and formatter for each country field, in output order
+_COUNTRY_FIELD_LINES = (
+    ('currency', 'Currency', lambda v: v or 'N/A'),
+    ('languages', 'Languages', lambda v: ', '.join(v or [])),
+    ('capital', 'Capital', lambda v: v or 'N/A'),
+    ('region', 'Region', lambda v: v or 'N/A'),
+    ('timezone', 'Timezone', lambda v: v or 'N/A'),
+    ('calling_code', 'Calling code', lambda v: v or 'N/A'),
+    ('driving_side', 'Driving side', lambda v: v or 'N/A'),
+)
+
+# The full plan has always shown these five; keep them for it
+_FULL_PLAN_COUNTRY_FIELDS = ('currency', 'languages', 'capital', 'region', 'timezone')
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English prose)"""
+    return len(text) // 4 + 1
+
+
+def format_weather(forecast, max_daily_lines=None):
+    """
+    Weather lines for the prompt
+
+    Up to max_daily_lines days are listed one per line; longer series are
+    compressed into weekly summaries plus the trip's extremes.
+    """
+    if not forecast:
+        return "No forecast available"
+
+    max_daily_lines = Config.PROMPT_MAX_WEATHER_DAYS if max_daily_lines is None else max_daily_lines
+    if len(forecast) <= max_daily_lines:
+        return '\n'.join(
+            f"- {day.get('date')}: {day.get('condition')}, "
+            f"High: {day.get('temp_max')}°C, Low: {day.get('temp_min')}°C, "
+            f"Rain: {day.get('rain_chance')}%"
+            for day in forecast
+        )
+
+    lines = [f"Summary of {len(forecast)} days ({forecast[0].get('date')} to {forecast[-1].get('date')}), by week:"]
+    for i in range(0, len(forecast), 7):
+        week = forecast[i:i + 7]
+        highs = [day.get('temp_max') for day in week]
+        lows = [day.get('temp_min') for day in week]
+        conditions = Counter(day.get('condition') for day in week).most_common(2)
+        rainy_days = sum(1 for day in week if (day.get('rain_chance') or 0) >= 50)
+        lines.append(
+            f"- {week[0].get('date')} to {week[-1].get('date')}: "
+            f"Highs {_span(highs)}°C, Lows {_span(lows)}°C, "
+            f"mostly {' / '.join(c for c, _ in conditions)}, "
+            f"{rainy_days} rainy day{'s' if rainy_days != 1 else ''}"
+        )
+
+    hottest = max(forecast, key=lambda day: day.get('temp_max'))
+    coldest = min(forecast, key=lambda day: day.get('temp_min'))
+    wettest = max(forecast, key=lambda day: day.get('rain_chance') or 0)
+    lines.append(
+        f"- Extremes: hottest {hottest.get('date')} ({hottest.get('temp_max')}°C), "
+        f"coldest {coldest.get('date')} ({coldest.get('temp_min')}°C), "
+        f"wettest {wettest.get('date')} ({wettest.get('rain_chance')}% rain)"
+    )
+    return '\n'.join(lines)
+
+
+def _span(values):
+    """'12-18' for a range, or '12' when every value is the same"""
+    low, high = min(values), max(values)
+    return f"{low}" if low == high else f"{low}-{high}"
+
+
+def country_fields_for(sections, all_sections=False):
+    """Country fields needed by the requested sections, in prompt order"""
+    if all_sections:
+        return _FULL_PLAN_COUNTRY_FIELDS
+    needed = {field for key in sections for field in SECTION_COUNTRY_FIELDS.get(key, ())}
+    return tuple(field for field, _, _ in _COUNTRY_FIELD_LINES if field in needed)
+
+
+def format_country(country_data, fields):
+    """Country lines for the prompt, limited to the given fields"""
+    if not country_data:
+        return "Country data not available"
+    lines = [
+        f"- {label}: {render(country_data.get(field))}"
+        for field, label, render in _COUNTRY_FIELD_LINES
+        if field in fields
+    ]
+    return '\n'.join(lines) if lines else "Not needed for these sections"
+
+
+def output_token_budget(sections, duration_days=None):
+    """
+    max_tokens for a generation
+
+    Each section is asked for ~200 (max 300) words; longer trips get a
+    little more room for day-by-day activity and packing detail.
+    """
+    days = min(int(duration_days or 1), 30)
+    budget = (
+        Config.PROMPT_BASE_OUTPUT_TOKENS
+        + Config.PROMPT_TOKENS_PER_SECTION * len(sections)
+        + Config.PROMPT_TOKENS_PER_TRIP_DAY * days
+    )
+    return max(Config.PROMPT_MIN_OUTPUT_TOKENS, min(Config.PROMPT_MAX_OUTPUT_TOKENS, budget))
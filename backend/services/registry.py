@@ -0,0 +1,50 @@
+"""
+Service registry
+Lazily constructed, process-wide service instances
+"""
+import importlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def _get(class_name):
+    """Return the shared instance of a service class, constructing it on first use"""
+    instance = _instances.get(class_name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(class_name)
+            if instance is None:
+                service_class = getattr(importlib.import_module(__package__), class_name)
+                instance = service_class()
+                _instances[class_name] = instance
+                logger.info("Initialized %s", class_name)
+    return instance
+
+
+def get_claude_service():
+    return _get('ClaudeService')
+
+
+def get_weather_service():
+    return _get('WeatherService')
+
+
+def get_country_service():
+    return _get('CountryService')
+
+
+def get_exchange_rate_service():
+    return _get('ExchangeRateService')
+
+
+def init_services():
+    """Construct every service up front (eager startup mode)"""
+    get_weather_service()
+    get_country_service()
+    get_exchange_rate_service()
+    get_claude_service().client
@@ -0,0 +1,196 @@
+"""
+Weather Series
+Columnar (array-based) weather data with group-by-day aggregation
+
+Forecast items are stored as parallel typed arrays instead of per-item dicts,
+and days are bucketed with integer arithmetic on epoch seconds, so no
+datetime objects are created per item. Condition strings are interned to
+small integer codes so the daily mode is a counting pass, not list.count.
+"""
+import time
+from array import array
+from collections import Counter
+from datetime import date, timedelta
+
+SECONDS_PER_DAY = 86400
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Climate condition estimates by daily precipitation (mm): (threshold, condition, rain chance)
+_PRECIPITATION_BANDS = (
+    (5, "rainy", 70),
+    (2, "partly cloudy with showers", 50),
+    (0.5, "mostly cloudy", 30),
+)
+_DRY_CONDITION = ("mostly sunny", 10)
+
+
+def _day_number(date_str):
+    """Days since the epoch for a YYYY-MM-DD string"""
+    return date.fromisoformat(date_str).toordinal() - _EPOCH_ORDINAL
+
+
+def _day_label(day_number):
+    """(YYYY-MM-DD, weekday name) for a day number"""
+    day = date.fromordinal(day_number + _EPOCH_ORDINAL)
+    return day.isoformat(), _DAY_NAMES[day.weekday()]
+
+
+class WeatherSeries:
+    """Three-hourly forecast samples stored column-wise"""
+
+    __slots__ = ('timestamps', 'temps', 'humidity', 'wind_speed', 'rain_chance', 'condition_codes', 'conditions')
+
+    def __init__(self):
+        self.timestamps = array('q')
+        self.temps = array('d')
+        self.humidity = array('d')
+        self.wind_speed = array('d')
+        self.rain_chance = array('d')
+        self.condition_codes = array('H')
+        self.conditions = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_forecast_items(cls, items):
+        """Build a series from OpenWeatherMap /forecast 'list' items"""
+        series = cls()
+        codes = {}
+        series.timestamps.extend(item['dt'] for item in items)
+        series.temps.extend(item['main']['temp'] for item in items)
+        series.humidity.extend(item['main']['humidity'] for item in items)
+        series.wind_speed.extend(item['wind']['speed'] for item in items)
+        # Probability of precipitation, as a percentage
+        series.rain_chance.extend(item.get('pop', 0) * 100 for item in items)
+        series.condition_codes.extend(
+            codes.setdefault(item['weather'][0]['description'], len(codes)) for item in items
+        )
+        series.conditions = list(codes)
+        return series
+
+    def to_dict(self):
+        """Compact JSON-serializable form (what the cache stores)"""
+        return {
+            'timestamps': self.timestamps.tolist(),
+            'temps': self.temps.tolist(),
+            'humidity': self.humidity.tolist(),
+            'wind_speed': self.wind_speed.tolist(),
+            'rain_chance': self.rain_chance.tolist(),
+            'condition_codes': self.condition_codes.tolist(),
+            'conditions': list(self.conditions),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        series = cls()
+        series.timestamps.extend(data['timestamps'])
+        series.temps.extend(data['temps'])
+        series.humidity.extend(data['humidity'])
+        series.wind_speed.extend(data['wind_speed'])
+        series.rain_chance.extend(data['rain_chance'])
+        series.condition_codes.extend(data['condition_codes'])
+        series.conditions = list(data['conditions'])
+        return series
+
+    def daily_summary(self, start_date, end_date, utc_offset=None):
+        """
+        Aggregate samples into one entry per calendar day
+
+        Args:
+            start_date: First day to include (YYYY-MM-DD)
+            end_date: Last day to include (YYYY-MM-DD)
+            utc_offset: Seconds east of UTC used to assign samples to days
+                (defaults to the server's local offset, as datetime.fromtimestamp does)
+
+        Returns:
+            List of daily dicts (date, day, temp_max/min/avg, condition,
+            rain_chance, humidity, wind_speed) sorted by date
+        """
+        if not len(self):
+            return []
+        if utc_offset is None:
+            utc_offset = time.localtime(self.timestamps[0]).tm_gmtoff
+
+        first_day = _day_number(start_date)
+        last_day = _day_number(end_date)
+
+        # Group-by-day: bucket index per sample, then one pass per column
+        day_of = [(ts + utc_offset) // SECONDS_PER_DAY for ts in self.timestamps]
+        buckets = {}
+        for i, day in enumerate(day_of):
+            if first_day <= day <= last_day:
+                buckets.setdefault(day, []).append(i)
+
+        forecast = []
+        for day in sorted(buckets):
+            idx = buckets[day]
+            count = len(idx)
+            temps = [self.temps[i] for i in idx]
+            date_str, day_name = _day_label(day)
+            condition_code = Counter(self.condition_codes[i] for i in idx).most_common(1)[0][0]
+            forecast.append({
+                'date': date_str,
+                'day': day_name,
+                'temp_max': round(max(temps), 1),
+                'temp_min': round(min(temps), 1),
+                'temp_avg': round(sum(temps) / count, 1),
+                'condition': self.conditions[condition_code],
+                'rain_chance': round(max(self.rain_chance[i] for i in idx)),
+                'humidity': round(sum(self.humidity[i] for i in idx) / count),
+                'wind_speed': round(sum(self.wind_speed[i] for i in idx) / count, 1)
+            })
+
+        return forecast
+
+
+def climate_days(daily):
+    """
+    Turn Open-Meteo climate 'daily' columns into daily entries
+
+    Args:
+        daily: Dict of parallel lists (time, temperature_2m_max/min/mean,
+            precipitation_sum)
+
+    Returns:
+        List of daily dicts in the same shape as WeatherSeries.daily_summary
+    """
+    dates = daily.get('time') or []
+    if not dates:
+        return []
+
+    # Consecutive days: weekday advances by one per entry from the first date
+    first_weekday = date.fromisoformat(dates[0]).weekday()
+    consecutive = dates[-1] == (date.fromisoformat(dates[0]) + timedelta(days=len(dates) - 1)).isoformat()
+
+    forecast = []
+    columns = zip(
+        dates,
+        daily['temperature_2m_max'],
+        daily['temperature_2m_min'],
+        daily['temperature_2m_mean'],
+        daily['precipitation_sum']
+    )
+    for i, (date_str, temp_max, temp_min, temp_avg, precip) in enumerate(columns):
+        # Estimate condition based on precipitation
+        for threshold, condition, rain_chance in _PRECIPITATION_BANDS:
+            if precip > threshold:
+                break
+        else:
+            condition, rain_chance = _DRY_CONDITION
+
+        weekday = (first_weekday + i) % 7 if consecutive else date.fromisoformat(date_str).weekday()
+        forecast.append({
+            'date': date_str,
+            'day': _DAY_NAMES[weekday],
+            'temp_max': round(temp_max, 1),
+            'temp_min': round(temp_min, 1),
+            'temp_avg': round(temp_avg, 1),
+            'condition': condition,
+            'rain_chance': rain_chance,
+            'humidity': 65,  # Average estimate
+            'wind_speed': 3.5  # Average estimate
+        })
+
+    return forecast
@@ -1,11 +1,17 @@
 """
 Weather Service
 Fetches weather forecast data from OpenWeatherMap API
-For dates beyond 5 days, uses Open-Meteo climate data
+For dates beyond 5 days, uses Open-Meteo climate data; trips that straddle
+the forecast horizon get both, merged per day
 """
 import requests
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from config import Config
+from cache import get_cache
+from concurrency import submit_with_context
+from .geo_index import GeoIndex
+from .weather_series import WeatherSeries, climate_days
 import logging
 import urllib3
 import calendar
@@ -18,11 +24,20 @@ logger = logging.getLogger(__name__)
 class WeatherService:
     """Service for fetching weather data"""
     
-    def __init__(self):
+    def __init__(self, cache=None):
         self.api_key = Config.OPENWEATHER_API_KEY
         self.base_url = Config.OPENWEATHER_BASE_URL
+        self.cache = cache or get_cache()
+        # Locations forecasts and climate series are fetched for; destinations
+        # within the reuse radius of one share its data (None: disabled).
+        # The index is per process and filled in request order, so two workers
+        # may pick different neighbours for the same destination (and then miss
+        # each other's advice cache entries, which hash the weather). Keep the
+        # radius to a few km so either choice gives effectively the same weather.
+        radius = Config.WEATHER_REUSE_RADIUS_KM
+        self._locations = GeoIndex(radius, Config.WEATHER_INDEX_MAX_POINTS) if radius > 0 else None
     
-    def get_weather_forecast(self, destination, start_date, end_date):
+    def get_weather_forecast(self, destination, start_date, end_date, index_location=True):
         """
         Get weather forecast for destination and date range
 
@@ -30,29 +45,53 @@ class WeatherService:
             destination: City name (e.g., "Paris, France")
             start_date: Start date string (YYYY-MM-DD)
             end_date: End date string (YYYY-MM-DD)
+            index_location: Add the destination to the reuse index when no
+                indexed location is near it (False for speculative lookups
+                such as prefetches of half-typed destinations)
 
         Returns:
-            Dictionary with weather forecast data
+            Dictionary with weather forecast data; 'reused_from' names the
+            nearby location whose data was used, if any
         """
         try:
             # First, get coordinates for the destination
             coords = self._get_coordinates(destination)
 
             if not coords:
-                logger.warning(f"Could not find coordinates for {destination}")
+                logger.warning("Could not find coordinates for %s", destination)
                 return None
 
-            # Check if dates are within 5 days
+            # Weather comes from the nearest already-known location within the reuse radius
+            lat, lon, reused_from = self._weather_location(coords, index_location)
+            if reused_from:
+                logger.info(
+                    "Reusing weather for %s from %s (%.1f km away)",
+                    destination, reused_from['name'], reused_from['distance_km']
+                )
+
+            # Check if dates are within the forecast horizon (5 days)
             start = datetime.strptime(start_date, '%Y-%m-%d')
-            days_until_trip = (start - datetime.now()).days
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+            now = datetime.now()
+            days_until_trip = (start - now).days
+            days_until_end = (end - now).days
+            horizon = Config.FORECAST_HORIZON_DAYS
 
-            if days_until_trip <= 5:
+            if days_until_trip <= horizon and days_until_end > horizon:
+                # Trip straddles the horizon: real forecast where available, climate for the rest
+                forecast = self._get_hybrid_data(lat, lon, start_date, end_date)
+                data_type = 'hybrid'
+            elif days_until_trip <= horizon:
                 # Use real forecast for near-term trips
-                forecast = self._get_forecast(coords['lat'], coords['lon'], start_date, end_date)
+                forecast = self._tag_days(
+                    self._get_forecast(lat, lon, start_date, end_date), 'forecast'
+                )
                 data_type = 'forecast'
             else:
                 # Use climate data for future trips
-                forecast = self._get_climate_data(coords['lat'], coords['lon'], start_date, end_date)
+                forecast = self._tag_days(
+                    self._get_climate_data(lat, lon, start_date, end_date), 'climate'
+                )
                 data_type = 'climate'
 
             return {
@@ -60,15 +99,73 @@ class WeatherService:
                 'coordinates': coords,
                 'forecast': forecast,
                 'summary': self._generate_summary(forecast, data_type),
-                'data_type': data_type
+                'data_type': data_type,
+                'reused_from': reused_from
             }
 
         except Exception as e:
-            logger.error(f"Error fetching weather data: {str(e)}")
+            logger.error("Error fetching weather data: %s", e)
             return None
     
+    def _get_hybrid_data(self, lat, lon, start_date, end_date):
+        """
+        Fetch forecast and climate data concurrently and merge them per day
+
+        Forecast days take precedence; climate normals fill every date the
+        forecast does not reach. Each day carries its own data_type.
+        """
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            forecast_future = submit_with_context(pool, self._get_forecast, lat, lon, start_date, end_date)
+            climate_future = submit_with_context(pool, self._get_climate_data, lat, lon, start_date, end_date)
+            forecast = self._tag_days(forecast_future.result(), 'forecast')
+            climate = self._tag_days(climate_future.result(), 'climate')
+
+        merged = {day['date']: day for day in climate}
+        merged.update((day['date'], day) for day in forecast)
+        return [merged[date] for date in sorted(merged)]
+
+    @staticmethod
+    def _tag_days(days, data_type):
+        """Copy daily entries with their data source (cached entries stay untouched)"""
+        return [dict(day, data_type=data_type) for day in days]
+
+    def iter_weather_forecasts(self, destinations, start_date, end_date, max_workers=None):
+        """
+        Fetch weather for many destinations concurrently
+
+        Coordinates and forecasts come from cache where available; missing
+        ones are fetched under a bounded thread pool.
+
+        Args:
+            destinations: List of city names
+            start_date: Start date string (YYYY-MM-DD)
+            end_date: End date string (YYYY-MM-DD)
+            max_workers: Pool size (defaults to Config.WEATHER_BATCH_WORKERS)
+
+        Yields:
+            (index, weather_data or None) tuples in completion order
+        """
+        workers = min(max_workers or Config.WEATHER_BATCH_WORKERS, len(destinations)) or 1
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                submit_with_context(pool, self.get_weather_forecast, destination, start_date, end_date): index
+                for index, destination in enumerate(destinations)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # A consumer that stops early (e.g. a disconnected streaming client)
+            # must not wait for lookups nobody will read
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def _get_coordinates(self, destination):
-        """Get lat/lon coordinates for a destination"""
+        """Get lat/lon coordinates for a destination (cached per normalized name)"""
+        key = ' '.join(destination.lower().split())
+        return self.cache.get_or_set('geocode', key, lambda: self._fetch_coordinates(destination))
+
+    def _fetch_coordinates(self, destination):
+        """Geocode a destination with the OpenWeatherMap API"""
         url = f"http://api.openweathermap.org/geo/1.0/direct"
         params = {
             'q': destination,
@@ -94,11 +191,61 @@ class WeatherService:
             return None
             
         except Exception as e:
-            logger.error(f"Error getting coordinates: {str(e)}")
+            logger.error("Error getting coordinates: %s", e)
             return None
     
-    def _get_forecast(self, lat, lon, start_date, end_date):
-        """Get weather forecast for coordinates and date range"""
+    @staticmethod
+    def _coords_key(lat, lon):
+        """Cache key for a location (~1 km precision)"""
+        return f"{lat:.2f},{lon:.2f}"
+
+    def _weather_location(self, coords, index_location=True):
+        """
+        Coordinates whose weather data serves a geocoded destination
+
+        Returns:
+            Tuple of (lat, lon, reused_from): an indexed location within
+            Config.WEATHER_REUSE_RADIUS_KM with a description of it, or the
+            destination's own coordinates (indexed if index_location) and None
+        """
+        lat, lon = coords['lat'], coords['lon']
+        if self._locations is None:
+            return lat, lon, None
+
+        if index_location:
+            found = self._locations.nearest_or_add(lat, lon, coords.get('name', ''))
+        else:
+            found = self._locations.nearest(lat, lon)
+        if found is None or (found[0], found[1]) == (lat, lon):
+            return lat, lon, None
+        found_lat, found_lon, name, distance = found
+        return found_lat, found_lon, {
+            'name': name,
+            'lat': found_lat,
+            'lon': found_lon,
+            'distance_km': round(distance, 1)
+        }
+
+    def _indexed_location(self, lat, lon):
+        """Indexed location whose data serves (lat, lon), without indexing it"""
+        found = self._locations.nearest(lat, lon) if self._locations is not None else None
+        return (found[0], found[1]) if found else (lat, lon)
+
+    def _forecast_key(self, lat, lon):
+        return f"series:{self._coords_key(lat, lon)}"
+
+    def forecast_freshness(self, lat, lon):
+        """Seconds until the cached forecast serving coordinates goes stale (None if not cached)"""
+        return self.cache.freshness('forecast', self._forecast_key(*self._indexed_location(lat, lon)))
+
+    def refresh_forecast(self, lat, lon):
+        """Re-fetch the forecast serving coordinates into the cache; returns True on success"""
+        lat, lon = self._indexed_location(lat, lon)
+        return bool(self.cache.refresh('forecast', self._forecast_key(lat, lon),
+                                       lambda: self._fetch_forecast_series(lat, lon)))
+
+    def _fetch_forecast_series(self, lat, lon):
+        """Fetch the 5-day / 3-hour forecast for coordinates as a columnar series dict"""
         url = f"{self.base_url}/forecast"
         params = {
             'lat': lat,
@@ -107,69 +254,36 @@ class WeatherService:
             'units': 'metric'  # Celsius
         }
 
+        response = requests.get(url, params=params, timeout=10, verify=False)
+        response.raise_for_status()
+        return WeatherSeries.from_forecast_items(response.json().get('list', [])).to_dict()
+
+    def _get_forecast(self, lat, lon, start_date, end_date):
+        """Get weather forecast for coordinates and date range"""
         try:
-            response = requests.get(url, params=params, timeout=10, verify=False)
-            response.raise_for_status()
+            # The forecast series is cached per location so any date range can reuse it
+            series = self.cache.get_or_set(
+                'forecast', self._forecast_key(lat, lon), lambda: self._fetch_forecast_series(lat, lon)
+            )
+            if not series:
+                return []
+
+            return WeatherSeries.from_dict(series).daily_summary(start_date, end_date)
 
-            data = response.json()
-            
-            # Parse forecast data
-            forecast = []
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            end = datetime.strptime(end_date, '%Y-%m-%d')
-            
-            # Group by date
-            daily_data = {}
-            
-            for item in data.get('list', []):
-                dt = datetime.fromtimestamp(item['dt'])
-                date_str = dt.strftime('%Y-%m-%d')
-                
-                # Only include dates in our range
-                if start <= dt <= end + timedelta(days=1):
-                    if date_str not in daily_data:
-                        daily_data[date_str] = {
-                            'temps': [],
-                            'conditions': [],
-                            'rain_chances': [],
-                            'humidity': [],
-                            'wind_speed': []
-                        }
-                    
-                    daily_data[date_str]['temps'].append(item['main']['temp'])
-                    daily_data[date_str]['conditions'].append(item['weather'][0]['description'])
-                    daily_data[date_str]['rain_chances'].append(
-                        item.get('pop', 0) * 100  # Probability of precipitation
-                    )
-                    daily_data[date_str]['humidity'].append(item['main']['humidity'])
-                    daily_data[date_str]['wind_speed'].append(item['wind']['speed'])
-            
-            # Aggregate daily data
-            for date_str, data in sorted(daily_data.items()):
-                forecast.append({
-                    'date': date_str,
-                    'day': datetime.strptime(date_str, '%Y-%m-%d').strftime('%A'),
-                    'temp_max': round(max(data['temps']), 1),
-                    'temp_min': round(min(data['temps']), 1),
-                    'temp_avg': round(sum(data['temps']) / len(data['temps']), 1),
-                    'condition': max(set(data['conditions']), key=data['conditions'].count),
-                    'rain_chance': round(max(data['rain_chances'])),
-                    'humidity': round(sum(data['humidity']) / len(data['humidity'])),
-                    'wind_speed': round(sum(data['wind_speed']) / len(data['wind_speed']), 1)
-                })
-            
-            return forecast
-            
         except Exception as e:
-            logger.error(f"Error getting forecast: {str(e)}")
+            logger.error("Error getting forecast: %s", e)
             return []
 
     def _get_climate_data(self, lat, lon, start_date, end_date):
-        """Get typical climate data for the location and time of year"""
-        try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            end = datetime.strptime(end_date, '%Y-%m-%d')
+        """Get typical climate data for the location and time of year (cached)"""
+        key = f"{self._coords_key(lat, lon)}:{start_date}:{end_date}"
+        return self.cache.get_or_set(
+            'climate', key, lambda: self._fetch_climate_data(lat, lon, start_date, end_date)
+        )
 
+    def _fetch_climate_data(self, lat, lon, start_date, end_date):
+        """Fetch typical climate data from the Open-Meteo Climate API"""
+        try:
             # Use Open-Meteo Climate API (free, no API key needed)
             url = "https://climate-api.open-meteo.com/v1/climate"
             params = {
@@ -185,46 +299,10 @@ class WeatherService:
             response.raise_for_status()
             data = response.json()
 
-            forecast = []
-            daily = data.get('daily', {})
-
-            if 'time' in daily:
-                for i, date_str in enumerate(daily['time']):
-                    temp_max = daily['temperature_2m_max'][i]
-                    temp_min = daily['temperature_2m_min'][i]
-                    temp_avg = daily['temperature_2m_mean'][i]
-                    precip = daily['precipitation_sum'][i]
-
-                    # Estimate condition based on precipitation
-                    if precip > 5:
-                        condition = "rainy"
-                        rain_chance = 70
-                    elif precip > 2:
-                        condition = "partly cloudy with showers"
-                        rain_chance = 50
-                    elif precip > 0.5:
-                        condition = "mostly cloudy"
-                        rain_chance = 30
-                    else:
-                        condition = "mostly sunny"
-                        rain_chance = 10
-
-                    forecast.append({
-                        'date': date_str,
-                        'day': datetime.strptime(date_str, '%Y-%m-%d').strftime('%A'),
-                        'temp_max': round(temp_max, 1),
-                        'temp_min': round(temp_min, 1),
-                        'temp_avg': round(temp_avg, 1),
-                        'condition': condition,
-                        'rain_chance': rain_chance,
-                        'humidity': 65,  # Average estimate
-                        'wind_speed': 3.5  # Average estimate
-                    })
-
-            return forecast
+            return climate_days(data.get('daily', {}))
 
         except Exception as e:
-            logger.error(f"Error getting climate data: {str(e)}")
+            logger.error("Error getting climate data: %s", e)
             return []
 
     def _generate_summary(self, forecast, data_type='forecast'):
@@ -243,6 +321,9 @@ class WeatherService:
         # Add prefix based on data type
         if data_type == 'climate':
             prefix = "Typical weather for this time of year: "
+        elif data_type == 'hybrid':
+            forecast_days = sum(1 for day in forecast if day.get('data_type') == 'forecast')
+            prefix = f"Forecast for the first {forecast_days} days, typical weather for the rest: "
         else:
             prefix = ""
 
@@ -0,0 +1,8 @@
+"""
+Test setup: the backend modules import each other as top-level modules
+(from config import Config), so the backend directory goes on sys.path
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,146 @@
+"""Tests for Cache TTLs, stale-while-revalidate and cache-only reads"""
+import threading
+import time
+
+import pytest
+
+import cache.core
+import cache.memory
+from cache import Cache, MemoryBackend, cache_only
+
+
+class Clock:
+    def __init__(self):
+        self.value = 1000000.0
+
+    def __call__(self):
+        return self.value
+
+    def advance(self, seconds):
+        self.value += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.core, 'now', clock)
+    monkeypatch.setattr(cache.memory, 'now', clock)
+    return clock
+
+
+@pytest.fixture
+def store(clock):
+    return Cache(MemoryBackend(), ttls={'forecast': 100}, stale_grace={'forecast': 50})
+
+
+class Loader:
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+        self.done = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        value = self.values[min(self.calls, len(self.values)) - 1]
+        self.done.set()
+        return value
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_fresh_entry_is_served_without_loading(store):
+    loader = Loader({'v': 1})
+    assert store.get_or_set('forecast', 'k', loader) == {'v': 1}
+    assert store.get_or_set('forecast', 'k', loader) == {'v': 1}
+    assert loader.calls == 1
+    assert store.freshness('forecast', 'k') == pytest.approx(100)
+
+
+def test_stale_entry_is_served_and_reloaded_in_background(store, clock):
+    store.get_or_set('forecast', 'k', Loader({'v': 1}))
+    clock.advance(120)
+
+    # Plain get() treats stale entries as misses
+    assert store.get('forecast', 'k') is None
+    assert store.freshness('forecast', 'k') == pytest.approx(-20)
+
+    reload = Loader({'v': 2})
+    assert store.get_or_set('forecast', 'k', reload) == {'v': 1}
+    wait_for(lambda: store.get('forecast', 'k') == {'v': 2})
+    assert reload.calls == 1
+    assert store.stats.snapshot()['forecast']['stale'] == 1
+
+
+def test_stale_entry_is_reloaded_once_for_concurrent_readers(store, clock):
+    store.get_or_set('forecast', 'k', Loader({'v': 1}))
+    clock.advance(120)
+
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(2)
+        return {'v': 2}
+
+    for _ in range(5):
+        assert store.get_or_set('forecast', 'k', slow_loader) == {'v': 1}
+    release.set()
+    wait_for(lambda: store.get('forecast', 'k') == {'v': 2})
+    assert len(calls) == 1
+
+
+def test_entry_past_grace_is_loaded_synchronously(store, clock):
+    store.get_or_set('forecast', 'k', Loader({'v': 1}))
+    clock.advance(151)
+
+    assert store.freshness('forecast', 'k') is None
+    assert store.get_or_set('forecast', 'k', Loader({'v': 2})) == {'v': 2}
+
+
+def test_namespace_without_grace_expires_at_ttl(clock):
+    store = Cache(MemoryBackend(), ttls={'country': 100}, stale_grace={})
+    store.set('country', 'k', {'v': 1})
+    clock.advance(101)
+    assert store.get_or_set('country', 'k', Loader({'v': 2})) == {'v': 2}
+
+
+def test_empty_results_are_not_cached(store):
+    loader = Loader(None, {'v': 1})
+    assert store.get_or_set('forecast', 'k', loader) is None
+    assert store.get_or_set('forecast', 'k', loader) == {'v': 1}
+    assert loader.calls == 2
+
+
+def test_refresh_replaces_fresh_entry(store):
+    store.set('forecast', 'k', {'v': 1})
+    assert store.refresh('forecast', 'k', Loader({'v': 2})) == {'v': 2}
+    assert store.get('forecast', 'k') == {'v': 2}
+
+
+def test_cache_only_never_loads(store, clock):
+    loader = Loader({'v': 2})
+    with cache_only():
+        assert store.get_or_set('forecast', 'missing', loader) is None
+
+    store.set('forecast', 'k', {'v': 1})
+    clock.advance(120)
+    with cache_only():
+        assert store.get_or_set('forecast', 'k', loader) == {'v': 1}
+    time.sleep(0.05)
+    assert loader.calls == 0
+
+
+def test_add_only_replaces_expired_entries(clock):
+    store = Cache(MemoryBackend(), ttls={'idempotency': 10})
+
+    assert store.add('idempotency', 'k', {'pending': True})
+    assert not store.add('idempotency', 'k', {'pending': False})
+    clock.advance(11)
+    assert store.add('idempotency', 'k', {'pending': False})
+    assert store.peek('idempotency', 'k') == {'pending': False}
@@ -0,0 +1,80 @@
+"""Tests for ExchangeRateService cost annotation and rate-table fetching"""
+import pytest
+
+from cache import Cache, MemoryBackend
+from services.exchange_rate_service import ExchangeRateService, StaticRates
+
+
+@pytest.fixture
+def service():
+    rates = StaticRates({'EUR': 0.92, 'GBP': 0.79, 'JPY': 150.0})
+    return ExchangeRateService(cache=Cache(MemoryBackend()), fetcher=rates)
+
+
+def annotate(service, text, currency='EUR', symbol='€'):
+    return service.annotate_costs({'text': text}, currency, symbol)['text']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Dinner costs 25 EUR.", "Dinner costs 25 EUR (~$27)."),
+    ("Dinner costs EUR 25, drinks extra", "Dinner costs EUR 25 (~$27), drinks extra"),
+    ("Hotels run €100-150 a night", "Hotels run €100-150 (~$109-163) a night"),
+    ("A pass is €1,234.50 total", "A pass is €1,234.50 (~$1,342) total"),
+    ("A coffee is €2.5", "A coffee is €2.5 (~$2.72)"),
+])
+def test_annotate_costs_appends_equivalents(service, text, expected):
+    assert annotate(service, text) == expected
+
+
+@pytest.mark.parametrize('text', [
+    "EUR 25 (~$27)",
+    "€1,234 (about $1300)",
+    "EUR 10-15 (~$11-16)",
+    "25 EUR (USD 27)",
+    "€2.50 (≈ $2.72)",
+])
+def test_annotate_costs_leaves_converted_amounts_alone(service, text):
+    assert annotate(service, text) == text
+
+
+def test_annotate_costs_ignores_bare_dollar_symbol(service):
+    text = "Tickets are $20 or 20 AUD"
+    assert service.annotate_costs({'text': text}, 'AUD', '$')['text'] == text
+
+
+def test_annotate_costs_non_usd_base():
+    rates = StaticRates({'EUR': 0.92, 'GBP': 0.79})
+    service = ExchangeRateService(cache=Cache(MemoryBackend()), fetcher=rates, base_currency='GBP')
+    assert annotate(service, "Lunch is 27 EUR") == "Lunch is 27 EUR (~23 GBP)"
+
+
+def test_annotate_costs_without_rate_returns_text_unchanged():
+    service = ExchangeRateService(cache=Cache(MemoryBackend()), fetcher=lambda base: None)
+    assert annotate(service, "Dinner costs 25 EUR") == "Dinner costs 25 EUR"
+
+
+def test_failed_fetch_is_not_retried_immediately():
+    calls = []
+
+    def failing(base):
+        calls.append(base)
+        return None
+
+    service = ExchangeRateService(cache=Cache(MemoryBackend()), fetcher=failing)
+    assert service.get_rate_table() is None
+    assert service.get_rate_table() is None
+    assert service.exchange_info('EUR') is None
+    assert calls == ['USD']
+
+
+@pytest.mark.parametrize('key', [None, '', 'your-key-here'])
+def test_missing_or_placeholder_key_skips_http(monkeypatch, key):
+    import services.exchange_rate_service as module
+
+    def no_http(*args, **kwargs):
+        raise AssertionError("unexpected HTTP call")
+
+    monkeypatch.setattr(module.requests, 'get', no_http)
+    service = ExchangeRateService(cache=Cache(MemoryBackend()))
+    service.api_key = key
+    assert service.get_rate_table() is None
@@ -0,0 +1,93 @@
+"""Tests for the geohash-bucketed GeoIndex"""
+import random
+
+import pytest
+
+from services.geo_index import GeoIndex, geohash_encode, haversine_km
+
+
+def brute_force_nearest(points, lat, lon, radius_km):
+    best = min(points, key=lambda point: haversine_km(lat, lon, *point))
+    return best if haversine_km(lat, lon, *best) <= radius_km else None
+
+
+def test_geohash_encode_known_value():
+    assert geohash_encode(48.8566, 2.3522, 6) == 'u09tvw'
+
+
+def test_nearest_or_add_reuses_point_within_radius():
+    index = GeoIndex(radius_km=5)
+    montmartre = (48.8867, 2.3431)
+    assert index.nearest_or_add(*montmartre, 'Montmartre') == (*montmartre, 'Montmartre', 0.0)
+
+    lat, lon, name, distance = index.nearest_or_add(48.8606, 2.3376, 'Louvre')
+    assert (lat, lon, name) == (*montmartre, 'Montmartre')
+    assert distance == pytest.approx(2.9, abs=0.1)
+    assert len(index) == 1
+
+
+def test_nearest_or_add_indexes_point_outside_radius():
+    index = GeoIndex(radius_km=5)
+    index.nearest_or_add(48.8867, 2.3431, 'Montmartre')
+    assert index.nearest_or_add(48.8049, 2.1204, 'Versailles')[2] == 'Versailles'
+    assert len(index) == 2
+
+
+def test_nearest_prefers_closest_point():
+    index = GeoIndex(radius_km=10)
+    index.add(48.90, 2.35, 'north')
+    index.add(48.85, 2.35, 'centre')
+    assert index.nearest(48.86, 2.35)[2] == 'centre'
+    assert index.nearest(10.0, 10.0) is None
+
+
+def test_oldest_points_are_dropped():
+    index = GeoIndex(radius_km=5, max_points=2)
+    index.add(10.0, 10.0, 'a')
+    index.add(20.0, 20.0, 'b')
+    index.add(30.0, 30.0, 'c')
+    assert len(index) == 2
+    assert index.nearest(10.0, 10.0) is None
+    assert index.nearest(30.0, 30.0)[2] == 'c'
+
+
+@pytest.mark.parametrize('radius_km', [1, 5, 25, 200])
+@pytest.mark.parametrize('lat_range, lon_range', [
+    ((-60, 60), (-180, 180)),      # anywhere
+    ((84, 90), (-180, 180)),       # near the north pole
+    ((-90, -84), (-180, 180)),     # near the south pole
+    ((-10, 10), (179, 180)),       # just west of the antimeridian
+    ((-10, 10), (-180, -179)),     # just east of it
+])
+def test_nearest_matches_brute_force(radius_km, lat_range, lon_range):
+    rng = random.Random(f"{radius_km}{lat_range}{lon_range}")
+    index = GeoIndex(radius_km)
+    points = [(rng.uniform(*lat_range), rng.uniform(*lon_range)) for _ in range(300)]
+    for point in points:
+        index.add(*point)
+
+    for _ in range(300):
+        lat, lon = rng.uniform(*lat_range), rng.uniform(*lon_range)
+        expected = brute_force_nearest(points, lat, lon, radius_km)
+        found = index.nearest(lat, lon)
+        assert (found[:2] if found else None) == expected
+
+
+@pytest.mark.parametrize('lat, lon', [(89.99, 0.0), (-89.99, 45.0), (0.0, 179.999), (0.0, -180.0), (60.0, 179.9)])
+def test_cells_within_cover_every_point_in_radius(lat, lon):
+    index = GeoIndex(radius_km=5)
+    cells = index._cells_within(lat, lon)
+    rng = random.Random(f"{lat},{lon}")
+    for _ in range(500):
+        other_lat = max(-90.0, min(90.0, lat + rng.uniform(-0.05, 0.05)))
+        other_lon = (lon + rng.uniform(-5, 5) + 180.0) % 360.0 - 180.0
+        if haversine_km(lat, lon, other_lat, other_lon) <= 5:
+            assert geohash_encode(other_lat, other_lon, index.precision) in cells
+
+
+def test_points_across_antimeridian_are_neighbours():
+    index = GeoIndex(radius_km=5)
+    index.add(0.0, 179.99, 'west')
+    found = index.nearest(0.0, -179.99)
+    assert found[2] == 'west'
+    assert found[3] == pytest.approx(2.2, abs=0.1)
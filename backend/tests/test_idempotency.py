@@ -0,0 +1,216 @@
+"""Tests for idempotent plan submissions: join, replay, cross-worker claims, 409/422"""
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import idempotency
+from cache import Cache, MemoryBackend, SQLiteBackend, set_cache
+from config import Config
+from idempotency import (
+    JOINED, NEW, REPLAYED, IdempotencyConflict, IdempotencyInProgress, idempotency_key, run_idempotent
+)
+
+
+@pytest.fixture
+def store():
+    store = Cache(MemoryBackend())
+    set_cache(store)
+    yield store
+    set_cache(None)
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(Config, 'IDEMPOTENCY_POLL_INTERVAL', 0.01)
+
+
+class BlockingWork:
+    """work() that blocks until released, counting its calls"""
+
+    def __init__(self, result=None):
+        self.result = result or {'plan': 1}
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        return self.result
+
+
+def run_in_thread(target, *args):
+    outcome = {}
+
+    def run():
+        try:
+            outcome['value'] = target(*args)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def test_duplicate_joins_running_generation(store):
+    key, fingerprint = idempotency_key('plan', {'destination': 'Rome'})
+    work = BlockingWork()
+    first, first_outcome = run_in_thread(run_idempotent, key, fingerprint, work)
+    assert work.started.wait(5)
+
+    second, second_outcome = run_in_thread(run_idempotent, key, fingerprint, work)
+    time.sleep(0.05)
+    work.release.set()
+    first.join(5)
+    second.join(5)
+
+    assert work.calls == 1
+    assert first_outcome['value'] == ({'plan': 1}, NEW)
+    assert second_outcome['value'] == ({'plan': 1}, JOINED)
+
+
+def test_completed_result_is_replayed(store):
+    key, fingerprint = idempotency_key('plan', {'destination': 'Rome'})
+    calls = []
+    run_idempotent(key, fingerprint, lambda: calls.append(1) or {'plan': 1})
+
+    assert run_idempotent(key, fingerprint, lambda: calls.append(1) or {'plan': 2}) == ({'plan': 1}, REPLAYED)
+    assert calls == [1]
+
+
+def test_payloads_differing_only_in_whitespace_share_a_key():
+    assert idempotency_key('plan', {'destination': 'Rome,  Italy '}) == idempotency_key('plan', {'destination': 'Rome, Italy'})
+
+
+def test_client_key_reused_with_other_payload_conflicts(store):
+    key, fingerprint = idempotency_key('plan', {'destination': 'Rome'}, 'abc')
+    run_idempotent(key, fingerprint, lambda: {'plan': 1})
+
+    other_key, other_fingerprint = idempotency_key('plan', {'destination': 'Oslo'}, 'abc')
+    assert other_key == key
+    with pytest.raises(IdempotencyConflict):
+        run_idempotent(other_key, other_fingerprint, lambda: {'plan': 2})
+
+
+def test_waits_for_claim_held_by_another_worker(store, fast_polling):
+    key, fingerprint = idempotency_key('plan', {'destination': 'Rome'})
+    # Another worker claimed the key and is generating
+    assert store.add('idempotency', key, {'fingerprint': fingerprint, 'pending': True})
+
+    work = BlockingWork()
+    thread, outcome = run_in_thread(run_idempotent, key, fingerprint, work)
+    time.sleep(0.05)
+    store.set('idempotency', key, {'fingerprint': fingerprint, 'result': {'plan': 'other worker'}})
+    thread.join(5)
+
+    assert work.calls == 0
+    assert outcome['value'] == ({'plan': 'other worker'}, JOINED)
+
+
+def test_claim_released_by_failed_worker_is_taken_over(store, fast_polling):
+    key, fingerprint = idempotency_key('plan', {'destination': 'Rome'})
+    store.add('idempotency', key, {'fingerprint': fingerprint, 'pending': True})
+
+    thread, outcome = run_in_thread(run_idempotent, key, fingerprint, lambda: {'plan': 'retried'})
+    time.sleep(0.05)
+    store.delete('idempotency', key)
+    thread.join(5)
+
+    assert outcome['value'] == ({'plan': 'retried'}, NEW)
+
+
+def test_failed_generation_releases_claim(store):
+    key, fingerprint = idempotency_key('plan', {'destination': 'Rome'})
+
+    def fail():
+        raise RuntimeError('upstream down')
+
+    with pytest.raises(RuntimeError):
+        run_idempotent(key, fingerprint, fail)
+    assert store.peek('idempotency', key) is None
+    assert run_idempotent(key, fingerprint, lambda: {'plan': 1}) == ({'plan': 1}, NEW)
+
+
+def test_claim_is_shared_between_workers_on_sqlite(tmp_path):
+    # Two workers: separate Cache objects over the same database file
+    worker_a = Cache(SQLiteBackend(str(tmp_path / 'cache.sqlite3')))
+    worker_b = Cache(SQLiteBackend(str(tmp_path / 'cache.sqlite3')))
+
+    assert worker_a.add('idempotency', 'plan:payload:x', {'pending': True}, ttl=60)
+    assert not worker_b.add('idempotency', 'plan:payload:x', {'pending': True}, ttl=60)
+    worker_a.delete('idempotency', 'plan:payload:x')
+    assert worker_b.add('idempotency', 'plan:payload:x', {'pending': True}, ttl=60)
+
+
+def test_duplicate_gives_up_with_in_progress(store, monkeypatch, fast_polling):
+    monkeypatch.setattr(Config, 'IDEMPOTENCY_WAIT_TIMEOUT', 0.1)
+    key, fingerprint = idempotency_key('plan', {'destination': 'Rome'})
+    store.add('idempotency', key, {'fingerprint': fingerprint, 'pending': True})
+
+    with pytest.raises(IdempotencyInProgress) as raised:
+        run_idempotent(key, fingerprint, BlockingWork())
+    assert raised.value.retry_after == Config.IDEMPOTENCY_RETRY_AFTER
+
+
+def test_wait_stays_below_worker_timeout():
+    assert 0 < Config.IDEMPOTENCY_WAIT_TIMEOUT < Config.GUNICORN_TIMEOUT
+    assert Config.IDEMPOTENCY_CLAIM_TTL >= Config.IDEMPOTENCY_WAIT_TIMEOUT
+
+
+PLAN = {'destination': 'Rome, Italy', 'dates': {'start': '2030-06-01', 'end': '2030-06-03'}}
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(Config, 'DEFAULT_RESPONSE_PROFILE', 'full')
+    return app_module.app.test_client()
+
+
+def fake_plan(user_input, refresh=False):
+    return {'success': True, 'input': user_input, 'advice': {'overview': user_input['destination']}}
+
+
+def test_endpoint_replays_with_header(client, monkeypatch):
+    monkeypatch.setattr(app_module, '_build_travel_plan', fake_plan)
+    headers = {'Idempotency-Key': 'k1'}
+
+    first = client.post('/api/generate-plan', json=PLAN, headers=headers)
+    second = client.post('/api/generate-plan', json=PLAN, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers['Idempotency-Replayed'] == 'false'
+    assert second.headers['Idempotency-Replayed'] == 'true'
+    assert second.headers['Idempotency-Key'] == 'k1'
+
+
+def test_endpoint_rejects_key_reuse_with_422(client, monkeypatch):
+    monkeypatch.setattr(app_module, '_build_travel_plan', fake_plan)
+    headers = {'Idempotency-Key': 'k2'}
+    client.post('/api/generate-plan', json=PLAN, headers=headers)
+
+    response = client.post('/api/generate-plan', json=dict(PLAN, destination='Oslo, Norway'), headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_endpoint_answers_409_with_retry_after_on_timeout(client, monkeypatch, fast_polling):
+    monkeypatch.setattr(Config, 'IDEMPOTENCY_WAIT_TIMEOUT', 0.1)
+    work = BlockingWork()
+    monkeypatch.setattr(app_module, '_build_travel_plan', lambda user_input, refresh=False: work())
+
+    first, first_outcome = run_in_thread(
+        lambda: app_module.app.test_client().post('/api/generate-plan', json=PLAN)
+    )
+    assert work.started.wait(5)
+    response = client.post('/api/generate-plan', json=PLAN)
+    work.release.set()
+    first.join(5)
+
+    assert response.status_code == 409
+    assert response.headers['Retry-After'] == str(Config.IDEMPOTENCY_RETRY_AFTER)
+    assert first_outcome['value'].status_code == 200
+    assert work.calls == 1
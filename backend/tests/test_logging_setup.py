@@ -0,0 +1,105 @@
+"""Tests for the queued, structured logging pipeline"""
+import io
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import pytest
+
+import logging_setup
+from logging_setup import SamplingFilter, configure_logging, stage, stage_timings, start_request, stop_logging
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    yield
+    stop_logging()
+    configure_logging()
+
+
+class BlockedStream(io.StringIO):
+    """A sink that hangs on write until released, like a stalled log collector"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(5)
+        return super().write(text)
+
+
+def test_full_queue_drops_records_without_blocking():
+    stream = BlockedStream()
+    handler = configure_logging(level='INFO', fmt='text', sampling={}, queue_size=5, stream=stream)
+    logger = logging.getLogger('tests.flood')
+
+    started = time.perf_counter()
+    for n in range(200):
+        logger.info("record %s", n)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1
+    # The listener holds at most one record while it is stuck writing
+    assert 200 - 6 <= handler.dropped < 200
+    stream.release.set()
+
+
+def record(name, level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, 'message', (), None)
+
+
+def test_sampling_keeps_configured_fraction():
+    random.seed(42)
+    sampler = SamplingFilter({'services.weather_service': 0.2})
+
+    kept = sum(sampler.filter(record('services.weather_service')) for _ in range(5000))
+    kept_child = sum(sampler.filter(record('services.weather_service.geo')) for _ in range(5000))
+
+    assert 850 <= kept <= 1150
+    assert 850 <= kept_child <= 1150
+    assert all(sampler.filter(record('services.weather_service', logging.WARNING)) for _ in range(100))
+    assert all(sampler.filter(record('services.country_service')) for _ in range(100))
+
+
+def test_json_records_carry_request_id_and_stage_timings():
+    stream = io.StringIO()
+    configure_logging(level='INFO', fmt='json', sampling={}, stream=stream)
+    logger = logging.getLogger('tests.json')
+
+    start_request('req-123')
+    with stage('weather'):
+        time.sleep(0.01)
+    logger.info("%s %s done", 'POST', '/api/generate-plan', extra={'status': 200, 'stages': stage_timings()})
+    stop_logging()
+
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry['message'] == 'POST /api/generate-plan done'
+    assert entry['request_id'] == 'req-123'
+    assert entry['status'] == 200
+    assert entry['stages']['weather'] >= 10
+    assert entry['level'] == 'INFO' and entry['logger'] == 'tests.json'
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_listener_restarts_in_forked_child(tmp_path):
+    path = tmp_path / 'log.txt'
+    with open(path, 'w', buffering=1) as stream:
+        configure_logging(level='INFO', fmt='text', sampling={}, stream=stream)
+
+        pid = os.fork()
+        if pid == 0:
+            # Child: the parent's listener thread did not survive the fork
+            ok = logging_setup._listener._thread.is_alive()
+            logging.getLogger('tests.child').info("written by the child")
+            stop_logging()
+            os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        stop_logging()
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert 'written by the child' in path.read_text()
@@ -0,0 +1,151 @@
+"""Tests for ModelRouter routing, hedging and loser cancellation"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config
+from services.model_router import LatencyTracker, ModelRouter, RoutePolicy
+
+
+class FakeStream:
+    """Stands in for client.messages.stream(): a delay, then text deltas"""
+
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+
+    def __enter__(self):
+        self.client.started.append(self.model)
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is not None:
+            self.client.aborted.append(self.model)
+        return False
+
+    def __iter__(self):
+        first_delay, chunks = self.client.timings[self.model]
+        time.sleep(first_delay)
+        for _ in range(chunks):
+            yield SimpleNamespace(type='content_block_delta')
+            time.sleep(0.01)
+
+    def get_final_message(self):
+        self.client.completed.append(self.model)
+        return SimpleNamespace(model=self.model, content=[SimpleNamespace(text=self.model)])
+
+
+class FakeClient:
+    def __init__(self, timings):
+        # model -> (seconds before the first token, number of 10 ms chunks)
+        self.timings = timings
+        self.started, self.aborted, self.completed = [], [], []
+        self.messages = SimpleNamespace(stream=lambda model, max_tokens, messages: FakeStream(self, model))
+
+
+def router(slo=0.1, hedge_model='backup', hedging=True):
+    policy = RoutePolicy(model='main', hedge_model=hedge_model, slo_seconds=slo, max_tokens=100)
+    return ModelRouter(policies={'plan': policy}, tracker=LatencyTracker(window=20), hedging=hedging)
+
+
+def wait_for(condition, timeout=3):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_models_for_prefers_configured_model():
+    assert router().models_for('plan') == ('main', 'backup')
+
+
+def test_models_for_switches_when_primary_median_exceeds_budget():
+    r = router(slo=1.0)
+    for _ in range(5):
+        r.tracker.record('main', 'plan', 3.0)
+        r.tracker.record('backup', 'plan', 0.5)
+    assert r.models_for('plan') == ('backup', 'main')
+
+
+def test_hedge_delay_uses_budget_then_p95():
+    r = router(slo=10.0)
+    assert r.hedge_delay('plan', 'main') == 10.0
+    for _ in range(5):
+        r.tracker.record('main', 'plan', 2.0)
+    assert r.hedge_delay('plan', 'main') == 3.0
+
+
+def test_tracker_records_time_to_first_token():
+    r = router()
+    client = FakeClient({'main': (0.02, 3)})
+    for _ in range(5):
+        r.create(client, 'plan', [])
+    ttft = r.tracker.percentile('main', 'plan', 50, 'ttft')
+    latency = r.tracker.percentile('main', 'plan', 50)
+    assert 0.02 <= ttft < latency
+    assert r.stats()['latency'][0]['ttft_p50'] == ttft
+
+
+@pytest.mark.parametrize('hedging, hedge_model', [(False, 'backup'), (True, 'main')])
+def test_no_hedge_when_disabled_or_same_model(hedging, hedge_model):
+    r = router(slo=0.01, hedge_model=hedge_model, hedging=hedging)
+    client = FakeClient({'main': (0.1, 1), 'backup': (0, 1)})
+
+    response, model = r.create(client, 'plan', [])
+
+    assert model == 'main'
+    assert client.started == ['main']
+    assert r.hedges_fired == 0
+
+
+def test_fast_primary_is_not_hedged():
+    r = router(slo=0.5)
+    client = FakeClient({'main': (0, 2), 'backup': (0, 1)})
+
+    assert r.create(client, 'plan', [])[1] == 'main'
+    assert client.started == ['main']
+
+
+def test_slow_primary_is_hedged_and_aborted_when_hedge_wins():
+    r = router(slo=0.05)
+    client = FakeClient({'main': (0.01, 100), 'backup': (0, 2)})
+
+    response, model = r.create(client, 'plan', [])
+
+    assert model == 'backup' and response.model == 'backup'
+    assert r.hedges_fired == 1 and r.hedges_won == 1
+    # The losing stream is closed instead of running its remaining chunks
+    assert wait_for(lambda: client.aborted == ['main'])
+    assert 'main' not in client.completed
+
+
+def test_hedge_skipped_without_hedge_capacity(monkeypatch):
+    monkeypatch.setattr(Config, 'CLAUDE_MAX_HEDGE_CALLS', 0)
+    r = router(slo=0.02)
+    client = FakeClient({'main': (0.1, 1), 'backup': (0, 1)})
+
+    assert r.create(client, 'plan', [])[1] == 'main'
+    assert r.hedges_fired == 0 and r.hedges_skipped == 1
+    assert client.started == ['main']
+
+
+def test_hedge_fires_while_primary_waits_for_a_pool_thread(monkeypatch):
+    monkeypatch.setattr(Config, 'CLAUDE_MAX_CONCURRENT_CALLS', 1)
+    r = router(slo=0.05)
+    client = FakeClient({'main': (0, 1), 'backup': (0, 1)})
+    release = threading.Event()
+    # Every primary thread is taken by an earlier slow call
+    r._executor().submit(release.wait, 5)
+
+    started = time.perf_counter()
+    response, model = r.create(client, 'plan', [])
+    elapsed = time.perf_counter() - started
+    release.set()
+
+    assert model == 'backup'
+    assert elapsed < 1
+    # The queued primary was cancelled before it ever ran
+    time.sleep(0.05)
+    assert client.started == ['backup']
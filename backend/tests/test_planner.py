@@ -0,0 +1,145 @@
+"""Tests for multi-leg itinerary validation, grouping and advice fan-out"""
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+import planner
+from config import Config
+from planner import COUNTRY_SECTIONS, LEG_SECTIONS, TRIP_SECTIONS, _merged_weather, plan_itinerary, validate_legs
+
+COUNTRIES = {'IT': 'Italy', 'FR': 'France'}
+
+
+def days(start, end, label):
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    return [
+        {'date': (first + timedelta(n)).isoformat(), 'label': label}
+        for n in range((last - first).days + 1)
+    ]
+
+
+def leg(destination, start, end):
+    return {'destination': destination, 'dates': {'start': start, 'end': end}}
+
+
+class FakeWeather:
+    # Venice is not geocoded, so its country is looked up by name
+    CODES = {'Rome': 'IT', 'Florence': 'IT', 'Nice': 'FR'}
+
+    def get_weather_forecast(self, destination, start, end):
+        city = destination.split(',')[0]
+        if city not in self.CODES:
+            return None
+        return {'coordinates': {'country': self.CODES[city]}, 'forecast': days(start, end, city)}
+
+
+class FakeCountries:
+    def __init__(self):
+        self.lookups = []
+
+    def get_country_info_by_code(self, code):
+        self.lookups.append(code)
+        return {'code': code, 'name': COUNTRIES[code]}
+
+    def get_country_info(self, name):
+        self.lookups.append(name)
+        code = {v: k for k, v in COUNTRIES.items()}[name]
+        return {'code': code, 'name': name}
+
+
+class FakeClaude:
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def generate_travel_advice(self, user_input, weather_data, country_data, sections=None):
+        with self._lock:
+            self.calls.append((user_input, weather_data, country_data, tuple(sections)))
+        return {section: user_input['destination'] for section in sections}
+
+
+@pytest.fixture
+def services(monkeypatch):
+    fakes = {'weather': FakeWeather(), 'countries': FakeCountries(), 'claude': FakeClaude()}
+    monkeypatch.setattr(planner, 'get_weather_service', lambda: fakes['weather'])
+    monkeypatch.setattr(planner, 'get_country_service', lambda: fakes['countries'])
+    monkeypatch.setattr(planner, 'get_claude_service', lambda: fakes['claude'])
+    return fakes
+
+
+@pytest.mark.parametrize('legs, error', [
+    (None, 'legs must be a non-empty list'),
+    ([], 'legs must be a non-empty list'),
+    ([{'dates': {'start': '2030-06-01', 'end': '2030-06-02'}}], 'Leg 1 is missing a destination'),
+    ([leg('Rome', '2030-06-01', '2030-06-02'), {'destination': 'Nice'}], 'Leg 2 is missing start/end dates'),
+    ([leg('Rome', '2030-06-05', '2030-06-01')], 'Leg 1 ends before it starts'),
+    ([leg('Rome', '2030-06-01', '06/05/2030')], 'Leg 1 has invalid dates (expected YYYY-MM-DD)'),
+])
+def test_validate_legs_rejects(legs, error):
+    assert validate_legs(legs) == error
+
+
+def test_validate_legs_limits_count_and_length(monkeypatch):
+    monkeypatch.setattr(Config, 'ITINERARY_MAX_LEGS', 2)
+    monkeypatch.setattr(Config, 'MAX_DAYS', 10)
+    short = leg('Rome', '2030-06-01', '2030-06-02')
+
+    assert validate_legs([short] * 3) == 'At most 2 legs are supported'
+    assert validate_legs([leg('Rome', '2030-06-01', '2030-06-11')]) == 'Leg 1 is longer than 10 days'
+    assert validate_legs([short, leg('Nice', '2030-06-01', '2030-06-10')]) is None
+
+
+def test_itinerary_groups_legs_by_iso_code(services):
+    result = plan_itinerary({'legs': [
+        leg('Rome, Italy', '2030-06-01', '2030-06-04'),
+        leg('Florence, Italy', '2030-06-04', '2030-06-07'),
+        leg('Venice, Italy', '2030-06-07', '2030-06-09'),
+        leg('Nice, France', '2030-06-09', '2030-06-10'),
+    ], 'specific_questions': 'Trains?'})
+
+    assert [(c['code'], c['legs']) for c in result['countries']] == [('IT', [0, 1, 2]), ('FR', [3])]
+    assert [l['country_code'] for l in result['legs']] == ['IT', 'IT', 'IT', 'FR']
+    # One lookup per distinct key: Italy by code and by name, France by code
+    assert sorted(services['countries'].lookups) == ['FR', 'IT', 'Italy']
+
+
+def test_itinerary_advice_once_per_country_and_per_leg(services):
+    result = plan_itinerary({'legs': [
+        leg('Rome, Italy', '2030-06-01', '2030-06-04'),
+        leg('Florence, Italy', '2030-06-04', '2030-06-07'),
+        leg('Nice, France', '2030-06-07', '2030-06-08'),
+    ], 'specific_questions': 'Trains?'})
+
+    calls = services['claude'].calls
+    country_calls = [c for c in calls if set(c[3]) & set(COUNTRY_SECTIONS)]
+    leg_calls = [c for c in calls if c[3] == LEG_SECTIONS]
+    assert len(calls) == 5
+    assert len(country_calls) == 2 and len(leg_calls) == 3
+
+    italy, france = sorted(country_calls, key=lambda c: c[2]['code'], reverse=True)
+    # Trip-wide answers only come with the first country
+    assert italy[3] == COUNTRY_SECTIONS + TRIP_SECTIONS
+    assert italy[0]['specific_questions'] == 'Trains?'
+    assert france[3] == COUNTRY_SECTIONS and france[0]['specific_questions'] == ''
+    assert italy[0]['destination'] == 'Italy (Rome, Florence)'
+    assert italy[0]['dates'] == {'start': '2030-06-01', 'end': '2030-06-07', 'duration_days': 7}
+    assert result['countries'][0]['advice']['cultural_guide'] == 'Italy (Rome, Florence)'
+    assert result['legs'][1]['advice']['activities'] == 'Florence, Italy'
+
+
+def test_merged_weather_has_each_date_once():
+    legs = [
+        {'weather': {'forecast': days('2030-06-01', '2030-06-04', 'Rome')}},
+        {'weather': None},
+        {'weather': {'forecast': days('2030-06-04', '2030-06-06', 'Florence')}},
+    ]
+
+    forecast = _merged_weather(legs)['forecast']
+
+    assert [d['date'] for d in forecast] == [
+        '2030-06-01', '2030-06-02', '2030-06-03', '2030-06-04', '2030-06-05', '2030-06-06'
+    ]
+    # The boundary day goes to the leg that starts on it
+    assert forecast[3]['label'] == 'Florence'
+    assert _merged_weather([{'weather': None}]) is None
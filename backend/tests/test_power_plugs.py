@@ -0,0 +1,27 @@
+"""Tests for the bundled power-plug table"""
+from services.power_plugs import POWER_PLUGS, PLUG_TYPE_DESCRIPTIONS, describe_power_plugs, get_power_plug_info
+
+
+def test_every_entry_has_the_same_field_types():
+    for code, info in POWER_PLUGS.items():
+        assert info['frequency'] and all(hz in (50, 60) for hz in info['frequency']), code
+        assert isinstance(info['voltage'], int), code
+        assert set(info['plug_types']) <= set(PLUG_TYPE_DESCRIPTIONS), code
+
+
+def test_lookup_is_case_insensitive():
+    assert get_power_plug_info(' fr ') is POWER_PLUGS['FR']
+    assert get_power_plug_info('') is None
+    assert get_power_plug_info('XX') is None
+
+
+def test_split_grid_lists_both_frequencies():
+    japan = get_power_plug_info('JP')
+    assert japan['frequency'] == (50, 60)
+    assert '- Voltage: 100 V, 50/60 Hz' in describe_power_plugs(japan).splitlines()
+
+
+def test_description_lists_each_plug_type():
+    lines = describe_power_plugs(get_power_plug_info('GB')).splitlines()
+    assert lines[:2] == ['- Plug types: G', '- Voltage: 230 V, 50 Hz']
+    assert lines[2] == f"- Type G: {PLUG_TYPE_DESCRIPTIONS['G']}"
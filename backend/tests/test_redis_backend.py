@@ -0,0 +1,45 @@
+"""Tests for RedisBackend against the local RESP stand-in"""
+import pytest
+
+from cache.redis_backend import RedisBackend
+from cache.resp_standin import LocalRespServer
+
+
+@pytest.fixture
+def server():
+    server = LocalRespServer()
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_size_counts_only_own_prefix(server):
+    ours = RedisBackend(server.url, key_prefix='ta:')
+    other = RedisBackend(server.url, key_prefix='other:')
+    for i in range(3):
+        ours.set(f"forecast:{i}", {'n': i}, 60)
+    other.set('unrelated', 1, 60)
+
+    assert ours.size() == 3
+    assert other.size() == 1
+
+
+def test_clear_by_namespace(server):
+    backend = RedisBackend(server.url, key_prefix='ta:')
+    backend.set('forecast:a', 1, 60)
+    backend.set('country:b', 2, 60)
+
+    backend.clear('forecast:')
+
+    assert backend.get('forecast:a') is None
+    assert backend.get('country:b')[0] == 2
+    assert backend.size() == 1
+
+
+def test_add_only_stores_absent_keys(server):
+    backend = RedisBackend(server.url, key_prefix='ta:')
+
+    assert backend.add('idempotency:k', {'pending': True}, 60)
+    assert not backend.add('idempotency:k', {'pending': False}, 60)
+    assert backend.get('idempotency:k')[0] == {'pending': True}
@@ -0,0 +1,110 @@
+"""Tests for the refresh scheduler's budget and refresh decisions"""
+import pytest
+
+import refresh_scheduler
+from cache import is_cache_only
+from config import Config
+from refresh_scheduler import PopularityTracker, RefreshScheduler, UpstreamBudget
+
+
+class FakeWeather:
+    def __init__(self):
+        self.refreshes = 0
+
+    def forecast_freshness(self, lat, lon):
+        return None
+
+    def refresh_forecast(self, lat, lon):
+        self.refreshes += 1
+        return True
+
+    def get_weather_forecast(self, destination, start_date, end_date):
+        # The advice step may only read what is cached
+        assert is_cache_only()
+        return {'forecast': [{'date': start_date}], 'coordinates': {'country': 'FR'}}
+
+
+class FakeCountry:
+    def country_freshness(self, code):
+        return 10 ** 9
+
+    def refresh_country_by_code(self, code):
+        raise AssertionError("fresh country entry refreshed")
+
+
+class FakeClaude:
+    def __init__(self):
+        self.generated = 0
+
+    def advice_freshness(self, user_input, weather_data, country_data):
+        return None
+
+    def generate_travel_advice(self, user_input, weather_data, country_data, refresh=False):
+        assert refresh
+        self.generated += 1
+        return {'summary': 'advice'}
+
+
+@pytest.fixture
+def services(monkeypatch):
+    fakes = {'weather': FakeWeather(), 'country': FakeCountry(), 'claude': FakeClaude()}
+    monkeypatch.setattr(refresh_scheduler, 'get_weather_service', lambda: fakes['weather'])
+    monkeypatch.setattr(refresh_scheduler, 'get_country_service', lambda: fakes['country'])
+    monkeypatch.setattr(refresh_scheduler, 'get_claude_service', lambda: fakes['claude'])
+    monkeypatch.setattr(refresh_scheduler, 'resolve_country_data', lambda destination, weather: {'code': 'FR'})
+    return fakes
+
+
+def record(scheduler, destination, lat, start):
+    scheduler.record_plan(
+        {'destination': destination, 'dates': {'start': start, 'end': start}},
+        {'coordinates': {'lat': lat, 'lon': 2.35, 'country': 'FR'}, 'data_type': 'forecast'}
+    )
+
+
+def test_budget_allows_limit_per_window():
+    budget = UpstreamBudget({'weather': 2})
+    assert budget.take('weather') and budget.take('weather')
+    assert not budget.take('weather')
+    assert not budget.take('advice')
+    assert budget.remaining() == {'weather': 0}
+
+
+def test_budget_is_split_across_workers(monkeypatch):
+    monkeypatch.setattr(Config, 'REFRESH_BUDGET', {'weather': 120, 'advice': 12})
+    monkeypatch.setattr(Config, 'WEB_CONCURRENCY', 4)
+    assert UpstreamBudget().limits == {'weather': 30, 'advice': 3}
+
+
+def test_tracker_ranks_by_decayed_count():
+    tracker = PopularityTracker(half_life=3600, max_tracked=2)
+    tracker.record('paris', {})
+    tracker.record('paris', {})
+    tracker.record('lyon', {})
+    tracker.record('nice', {})
+    assert [key for key, score, trip in tracker.top(5)][0] == 'paris'
+    assert len(tracker) == 2
+
+
+def test_pass_respects_budget_and_skips_past_trips(services):
+    scheduler = RefreshScheduler(budget=UpstreamBudget({'weather': 1, 'country': 1, 'advice': 5}))
+    record(scheduler, 'Paris', 48.85, '2099-06-01')
+    record(scheduler, 'Paris', 48.85, '2099-06-01')
+    record(scheduler, 'Lyon', 45.76, '2099-06-01')
+    record(scheduler, 'Old trip', 43.70, '2000-01-01')
+
+    made = scheduler.run_once()
+
+    # One forecast (budget), no fresh country, one advice call per pass
+    assert services['weather'].refreshes == 1
+    assert services['claude'].generated == 1
+    assert made == 2
+
+
+def test_busy_worker_makes_no_calls(services, monkeypatch):
+    monkeypatch.setattr(refresh_scheduler, 'is_idle', lambda: False)
+    scheduler = RefreshScheduler(budget=UpstreamBudget({'weather': 5, 'country': 5, 'advice': 5}))
+    record(scheduler, 'Paris', 48.85, '2099-06-01')
+
+    assert scheduler.run_once() == 0
+    assert services['weather'].refreshes == 0
@@ -0,0 +1,58 @@
+"""Tests for trace loading and request building in the replay tool"""
+import json
+
+from replay_traces import build_request, load_traces
+
+
+def write_traces(tmp_path, lines):
+    path = tmp_path / 'traces.jsonl'
+    path.write_text('\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines))
+    return str(path)
+
+
+def test_unreplayable_records_are_counted_as_skipped(tmp_path):
+    dates = {'start': '2030-06-01', 'end': '2030-06-03'}
+    path = write_traces(tmp_path, [
+        {'destination': 'Rome, Italy', 'dates': dates, 'delay': 0},
+        {'endpoint': 'weather', 'destination': 'Rome, Italy'},          # no dates
+        {'endpoint': 'country', 'destination': ''},                     # no country
+        {'endpoint': 'unknown', 'destination': 'Rome, Italy'},
+        {'destination': 'Rome, Italy'},                                 # endpoint not inferable
+        {'question': 'Museums?', 'delay': 'soon'},                      # bad timing
+        'not json',
+        '',
+        {'endpoint': '/api/weather', 'destination': 'Oslo', 'dates': dates, 'delay': 2},
+        {'question': 'Museums?', 'delay': 1.5},
+    ])
+
+    traces, skipped = load_traces(path)
+
+    assert skipped == 6
+    assert [offset for offset, _ in traces] == [0.0, 2.0, 3.5]
+    assert all(build_request('http://app', record) for _, record in traces)
+
+
+def test_absolute_timestamps_are_sorted_and_rebased(tmp_path):
+    path = write_traces(tmp_path, [
+        {'question': 'b', 'ts': 105},
+        {'question': 'a', 'ts': 100},
+    ])
+
+    traces, skipped = load_traces(path)
+
+    assert skipped == 0
+    assert [(offset, record['question']) for offset, record in traces] == [(0.0, 'a'), (5.0, 'b')]
+
+
+def test_build_request_urls():
+    dates = {'start': '2030-06-01', 'end': '2030-06-03'}
+
+    assert build_request('http://app/', {'endpoint': 'weather', 'destination': 'São Paulo', 'dates': dates}) == (
+        'GET', 'http://app/api/weather/S%C3%A3o%20Paulo?start=2030-06-01&end=2030-06-03', None
+    )
+    assert build_request('http://app', {'endpoint': 'country', 'destination': 'Rome, Italy'}) == (
+        'GET', 'http://app/api/country/Italy', None
+    )
+    method, url, body = build_request('http://app', {'destination': 'Rome', 'dates': dates, 'purpose': 'leisure'})
+    assert (method, url) == ('POST', 'http://app/api/generate-plan')
+    assert body == {'destination': 'Rome', 'dates': dates, 'purpose': 'leisure'}
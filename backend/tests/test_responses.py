@@ -0,0 +1,51 @@
+"""Tests for conditional GET handling in cacheable_json"""
+import pytest
+from flask import Flask
+
+import responses
+from responses import cacheable_json, compute_etag
+
+DATA = {'destination': 'Rome', 'forecast': ['sunny'] * 300}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    responses.init_app(app)
+
+    @app.route('/data')
+    def data():
+        return cacheable_json(DATA, 60)
+
+    return app.test_client()
+
+
+def get(client, if_none_match=None, encoding=None):
+    headers = {}
+    if if_none_match:
+        headers['If-None-Match'] = if_none_match
+    headers['Accept-Encoding'] = encoding or 'identity'
+    return client.get('/data', headers=headers)
+
+
+def test_strong_and_weak_validators_revalidate(client):
+    etag = compute_etag(DATA)
+
+    assert get(client).headers['ETag'] == f'"{etag}"'
+    assert get(client, f'"{etag}"').status_code == 304
+    # A proxy that compressed the response hands clients a weak ETag
+    assert get(client, f'W/"{etag}"').status_code == 304
+    assert get(client, '"something-else"').status_code == 200
+
+
+def test_validator_must_match_served_encoding(client):
+    etag = compute_etag(DATA)
+
+    gzipped = get(client, encoding='gzip')
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert gzipped.headers['ETag'] == f'"{etag}-gzip"'
+
+    assert get(client, f'"{etag}-gzip"', encoding='gzip').status_code == 304
+    # Validators of another encoding do not match
+    assert get(client, f'"{etag}-gzip"').status_code == 200
+    assert get(client, f'"{etag}"', encoding='gzip').status_code == 200
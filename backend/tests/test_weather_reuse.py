@@ -0,0 +1,67 @@
+"""Tests for WeatherService reuse of nearby locations' weather data"""
+from datetime import date
+
+import pytest
+
+from cache import Cache, MemoryBackend
+from config import Config
+from services.weather_series import WeatherSeries
+from services.weather_service import WeatherService
+
+PLACES = {
+    'Montmartre, Paris': (48.8867, 2.3431),
+    'Louvre, Paris': (48.8606, 2.3376),
+    'Versailles': (48.8049, 2.1204),
+}
+
+
+@pytest.fixture
+def weather(monkeypatch):
+    monkeypatch.setattr(Config, 'WEATHER_REUSE_RADIUS_KM', 5)
+    service = WeatherService(cache=Cache(MemoryBackend()))
+    service.fetched = []
+
+    def fetch_coordinates(destination):
+        lat, lon = PLACES[destination]
+        return {'lat': lat, 'lon': lon, 'name': destination, 'country': 'FR', 'state': ''}
+
+    def fetch_series(lat, lon):
+        service.fetched.append((lat, lon))
+        return WeatherSeries.from_forecast_items([]).to_dict()
+
+    service._fetch_coordinates = fetch_coordinates
+    service._fetch_forecast_series = fetch_series
+    return service
+
+
+def forecast(service, destination, **kwargs):
+    today = date.today().isoformat()
+    return service.get_weather_forecast(destination, today, today, **kwargs)
+
+
+def test_nearby_destination_reuses_forecast(weather):
+    assert forecast(weather, 'Montmartre, Paris')['reused_from'] is None
+    reused = forecast(weather, 'Louvre, Paris')['reused_from']
+
+    assert reused['name'] == 'Montmartre, Paris'
+    assert reused['distance_km'] == pytest.approx(2.9, abs=0.1)
+    assert weather.fetched == [PLACES['Montmartre, Paris']]
+
+
+def test_distant_destination_fetches_its_own(weather):
+    forecast(weather, 'Montmartre, Paris')
+    assert forecast(weather, 'Versailles')['reused_from'] is None
+    assert weather.fetched == [PLACES['Montmartre, Paris'], PLACES['Versailles']]
+
+
+def test_speculative_lookup_does_not_seed_index(weather):
+    forecast(weather, 'Louvre, Paris', index_location=False)
+    assert forecast(weather, 'Montmartre, Paris')['reused_from'] is None
+
+    # ...but does reuse an indexed neighbour
+    assert forecast(weather, 'Louvre, Paris', index_location=False)['reused_from']['name'] == 'Montmartre, Paris'
+
+
+def test_reuse_disabled_with_zero_radius(monkeypatch):
+    monkeypatch.setattr(Config, 'WEATHER_REUSE_RADIUS_KM', 0)
+    assert WeatherService(cache=Cache(MemoryBackend()))._locations is None
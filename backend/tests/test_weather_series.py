@@ -0,0 +1,197 @@
+"""Tests for WeatherSeries.daily_summary and climate_days against the per-item code they replaced"""
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.weather_series import WeatherSeries, climate_days
+
+
+@pytest.fixture(params=['UTC', 'Asia/Kolkata', 'America/Sao_Paulo'])
+def local_tz(request, monkeypatch):
+    # Days are bucketed in the server's local time, as datetime.fromtimestamp did
+    monkeypatch.setenv('TZ', request.param)
+    time.tzset()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+
+
+CONDITIONS = ('clear sky', 'overcast clouds', 'light rain')
+
+
+def forecast_items(first, count=40, seed=7):
+    """OpenWeatherMap-style 3-hourly items from a local datetime"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        at = first + timedelta(hours=3 * i)
+        # Each day has its own prevailing condition, interrupted every third sample
+        condition = 'few clouds' if i % 3 == 1 else CONDITIONS[at.day % 3]
+        items.append({
+            'dt': int(at.timestamp()),
+            'main': {'temp': round(rng.uniform(-5, 35), 2), 'humidity': rng.randint(20, 100)},
+            'wind': {'speed': round(rng.uniform(0, 15), 2)},
+            'pop': round(rng.random(), 2),
+            'weather': [{'description': condition}],
+        })
+    return items
+
+
+def per_item_daily(items, start_date, end_date):
+    """
+    The per-item aggregation WeatherService._get_forecast used before WeatherSeries
+
+    One deliberate difference: the old range check (dt <= end + 1 day) also
+    let a sample at exactly 00:00 after end_date through, as a one-sample
+    extra day; here days are compared by date.
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    daily_data = {}
+    for item in items:
+        dt = datetime.fromtimestamp(item['dt'])
+        if start <= dt.date() <= end:
+            data = daily_data.setdefault(dt.strftime('%Y-%m-%d'), {
+                'temps': [], 'conditions': [], 'rain_chances': [], 'humidity': [], 'wind_speed': []
+            })
+            data['temps'].append(item['main']['temp'])
+            data['conditions'].append(item['weather'][0]['description'])
+            data['rain_chances'].append(item.get('pop', 0) * 100)
+            data['humidity'].append(item['main']['humidity'])
+            data['wind_speed'].append(item['wind']['speed'])
+
+    forecast = []
+    for date_str, data in sorted(daily_data.items()):
+        counts = sorted((data['conditions'].count(c) for c in set(data['conditions'])), reverse=True)
+        # The old max(set(...), key=count) picked arbitrarily between tied conditions
+        assert len(counts) == 1 or counts[0] > counts[1], f"tied condition on {date_str}"
+        forecast.append({
+            'date': date_str,
+            'day': datetime.strptime(date_str, '%Y-%m-%d').strftime('%A'),
+            'temp_max': round(max(data['temps']), 1),
+            'temp_min': round(min(data['temps']), 1),
+            'temp_avg': round(sum(data['temps']) / len(data['temps']), 1),
+            'condition': max(set(data['conditions']), key=data['conditions'].count),
+            'rain_chance': round(max(data['rain_chances'])),
+            'humidity': round(sum(data['humidity']) / len(data['humidity'])),
+            'wind_speed': round(sum(data['wind_speed']) / len(data['wind_speed']), 1)
+        })
+    return forecast
+
+
+def test_daily_summary_matches_per_item_aggregation(local_tz):
+    # Starts at 15:00, so the first and last days only have some of their 3-hour samples
+    items = forecast_items(datetime(2030, 3, 10, 15, 0))
+    series = WeatherSeries.from_forecast_items(items)
+
+    summary = series.daily_summary('2030-03-10', '2030-03-15')
+
+    assert summary == per_item_daily(items, '2030-03-10', '2030-03-15')
+    assert [day['date'] for day in summary] == [f"2030-03-{d}" for d in range(10, 16)]
+    assert summary[0]['day'] == 'Sunday'
+    assert {day['condition'] for day in summary} == set(CONDITIONS)
+
+
+def test_partial_days_use_only_their_samples(local_tz):
+    items = forecast_items(datetime(2030, 3, 10, 15, 0))
+    summary = WeatherSeries.from_forecast_items(items).daily_summary('2030-03-10', '2030-03-15')
+
+    # 15:00, 18:00, 21:00 on the first day; 00:00 to 12:00 on the last
+    first_day = [item['main']['temp'] for item in items[:3]]
+    last_day = [item['main']['temp'] for item in items[-5:]]
+    assert summary[0]['temp_avg'] == round(sum(first_day) / 3, 1)
+    assert summary[-1]['temp_max'] == round(max(last_day), 1)
+
+
+def test_sub_range_of_the_series(local_tz):
+    items = forecast_items(datetime(2030, 3, 10, 0, 0))
+    summary = WeatherSeries.from_forecast_items(items).daily_summary('2030-03-11', '2030-03-12')
+
+    assert summary == per_item_daily(items, '2030-03-11', '2030-03-12')
+    assert len(summary) == 2
+
+
+def test_range_outside_the_series_is_empty(local_tz):
+    series = WeatherSeries.from_forecast_items(forecast_items(datetime(2030, 3, 10, 0, 0)))
+
+    assert series.daily_summary('2030-02-01', '2030-02-05') == []
+    assert series.daily_summary('2030-04-01', '2030-04-05') == []
+    assert WeatherSeries().daily_summary('2030-03-10', '2030-03-12') == []
+
+
+def test_midnight_sample_after_end_date_is_not_a_day(local_tz):
+    items = forecast_items(datetime(2030, 3, 10, 0, 0))
+    summary = WeatherSeries.from_forecast_items(items).daily_summary('2030-03-10', '2030-03-10')
+
+    assert [day['date'] for day in summary] == ['2030-03-10']
+
+
+def test_cached_form_round_trips():
+    series = WeatherSeries.from_forecast_items(forecast_items(datetime(2030, 3, 10, 15, 0)))
+    restored = WeatherSeries.from_dict(series.to_dict())
+
+    assert restored.daily_summary('2030-03-10', '2030-03-15', 0) == series.daily_summary('2030-03-10', '2030-03-15', 0)
+
+
+def per_item_climate(daily):
+    """The per-day loop WeatherService._get_climate_data used before climate_days"""
+    forecast = []
+    for i, date_str in enumerate(daily.get('time', [])):
+        precip = daily['precipitation_sum'][i]
+        if precip > 5:
+            condition, rain_chance = "rainy", 70
+        elif precip > 2:
+            condition, rain_chance = "partly cloudy with showers", 50
+        elif precip > 0.5:
+            condition, rain_chance = "mostly cloudy", 30
+        else:
+            condition, rain_chance = "mostly sunny", 10
+        forecast.append({
+            'date': date_str,
+            'day': datetime.strptime(date_str, '%Y-%m-%d').strftime('%A'),
+            'temp_max': round(daily['temperature_2m_max'][i], 1),
+            'temp_min': round(daily['temperature_2m_min'][i], 1),
+            'temp_avg': round(daily['temperature_2m_mean'][i], 1),
+            'condition': condition,
+            'rain_chance': rain_chance,
+            'humidity': 65,
+            'wind_speed': 3.5
+        })
+    return forecast
+
+
+def climate_columns(dates, seed=3):
+    rng = random.Random(seed)
+    # Precipitation includes the band edges, which fall into the lower band
+    precipitation = [5, 2, 0.5, 0, 5.01, 2.01, 0.51] + [round(rng.uniform(0, 12), 2) for _ in dates]
+    return {
+        'time': dates,
+        'temperature_2m_max': [round(rng.uniform(10, 35), 3) for _ in dates],
+        'temperature_2m_min': [round(rng.uniform(-5, 10), 3) for _ in dates],
+        'temperature_2m_mean': [round(rng.uniform(5, 20), 3) for _ in dates],
+        'precipitation_sum': precipitation[:len(dates)],
+    }
+
+
+def test_climate_days_match_per_day_loop():
+    # A year of consecutive days, across a leap day
+    dates = [(datetime(2028, 1, 1) + timedelta(days=n)).strftime('%Y-%m-%d') for n in range(366)]
+    daily = climate_columns(dates)
+
+    assert climate_days(daily) == per_item_climate(daily)
+
+
+def test_climate_days_with_gaps_use_each_date():
+    daily = climate_columns(['2030-03-10', '2030-03-11', '2030-03-20', '2030-04-02'])
+
+    days = climate_days(daily)
+
+    assert days == per_item_climate(daily)
+    assert [day['day'] for day in days] == ['Sunday', 'Monday', 'Wednesday', 'Tuesday']
+
+
+def test_climate_days_without_data():
+    assert climate_days({}) == []
+    assert climate_days({'time': []}) == []
@@ -0,0 +1,136 @@
+"""
+Cache warmup
+Primes geocode, forecast and country caches for popular destinations so the
+first users after a deploy or restart do not pay every cold upstream lookup,
+and prefetches a single trip's data while the user is still filling the form.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from config import Config
+from planner import resolve_country_data
+from services import get_country_service, get_exchange_rate_service, get_weather_service
+
+logger = logging.getLogger(__name__)
+
+# Background pool for /api/prefetch (created on first use, so a preloading
+# gunicorn master never starts threads) and the trips it is working on
+_prefetch_pool = None
+_prefetch_inflight = set()
+_prefetch_lock = threading.Lock()
+
+
+def _warm_destination(destination, start_date, end_date):
+    """Warm one destination; returns True when weather and country data were cached"""
+    weather_data = get_weather_service().get_weather_forecast(destination, start_date, end_date)
+    if not weather_data:
+        return False
+
+    country_code = weather_data.get('coordinates', {}).get('country')
+    if not country_code:
+        return False
+    return bool(get_country_service().get_country_info_by_code(country_code))
+
+
+def warm_caches(destinations=None, workers=None):
+    """
+    Prime caches for a list of destinations
+
+    The raw 5-day forecast is cached per location, so warming the next five
+    days serves any near-term date range afterwards.
+
+    Args:
+        destinations: Destination strings (defaults to Config.WARMUP_DESTINATIONS)
+        workers: Concurrent upstream lookups (defaults to Config.WARMUP_WORKERS)
+
+    Returns:
+        Number of destinations fully warmed
+    """
+    destinations = Config.WARMUP_DESTINATIONS if destinations is None else destinations
+    if not destinations:
+        return 0
+
+    today = datetime.now()
+    start_date = today.strftime('%Y-%m-%d')
+    end_date = (today + timedelta(days=4)).strftime('%Y-%m-%d')
+
+    started = datetime.now()
+    warmed = 0
+    with ThreadPoolExecutor(max_workers=workers or Config.WARMUP_WORKERS) as pool:
+        futures = [pool.submit(_warm_destination, d, start_date, end_date) for d in destinations]
+        for destination, future in zip(destinations, futures):
+            try:
+                warmed += bool(future.result())
+            except Exception as e:
+                logger.warning("Warmup failed for %s: %s", destination, e)
+
+    elapsed = (datetime.now() - started).total_seconds()
+    logger.info("Warmed caches for %s/%s destinations in %.1fs", warmed, len(destinations), elapsed)
+    return warmed
+
+
+def start_background_warmup(destinations=None):
+    """Run warm_caches in a daemon thread so startup is not delayed"""
+    thread = threading.Thread(target=warm_caches, args=(destinations,), name='cache-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def prefetch_trip(destination, start_date, end_date):
+    """
+    Warm the caches a plan for this trip will read, in the background
+
+    Runs the same geocode, weather and country lookups as /api/generate-plan
+    (plus today's exchange-rate table) so the pre-LLM stage of the plan is a
+    cache hit. Repeated calls for a trip already being warmed are ignored.
+
+    Args:
+        destination: Destination string as typed by the user
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+
+    Returns:
+        'queued', 'in_flight' (already being warmed) or 'busy' (too many pending)
+    """
+    global _prefetch_pool
+    key = (' '.join(destination.lower().split()), start_date, end_date)
+
+    with _prefetch_lock:
+        if key in _prefetch_inflight:
+            return 'in_flight'
+        if len(_prefetch_inflight) >= Config.PREFETCH_MAX_PENDING:
+            return 'busy'
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(
+                max_workers=Config.PREFETCH_WORKERS, thread_name_prefix='prefetch'
+            )
+        _prefetch_inflight.add(key)
+
+    _prefetch_pool.submit(_run_prefetch, key, destination, start_date, end_date)
+    return 'queued'
+
+
+def _run_prefetch(key, destination, start_date, end_date):
+    started = datetime.now()
+    try:
+        # The destination may be half-typed, so it does not seed the weather reuse index
+        weather_data = get_weather_service().get_weather_forecast(
+            destination, start_date, end_date, index_location=False
+        )
+        country_data = resolve_country_data(destination, weather_data)
+        if country_data and country_data.get('currencies_raw'):
+            get_exchange_rate_service().get_rate_table()
+
+        elapsed = (datetime.now() - started).total_seconds()
+        logger.info(
+            "Prefetched %s (%s to %s) in %.2fs: weather=%s, country=%s",
+            destination, start_date, end_date, elapsed,
+            'yes' if weather_data else 'no', 'yes' if country_data else 'no'
+        )
+    except Exception as e:
+        logger.warning("Prefetch failed for %s: %s", destination, e)
+    finally:
+        with _prefetch_lock:
+            _prefetch_inflight.discard(key)
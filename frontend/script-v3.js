@@ -18,9 +18,150 @@ const newPlanBtn = document.getElementById('newPlanBtn');
 document.getElementById('startDate').min = new Date().toISOString().split('T')[0];
 document.getElementById('endDate').min = new Date().toISOString().split('T')[0];
 
+// Idempotent submission: resubmitting an unchanged form (e.g. retrying after a
+// slow response) reuses its Idempotency-Key, so the backend attaches to or
+// replays the generation it already ran instead of starting another one
+let lastSubmission = { body: null, key: null };
+let planRequestInFlight = false;
+
+function idempotencyKeyFor(body, fresh = false) {
+    if (fresh || lastSubmission.body !== body) {
+        const key = window.crypto && crypto.randomUUID
+            ? crypto.randomUUID()
+            : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+        lastSubmission = { body, key };
+    }
+    return lastSubmission.key;
+}
+
+// Offline plan storage: generated plans are kept in IndexedDB, keyed by a
+// signature of the trip form, so reopening a trip needs no backend call and
+// works offline
+const PLAN_DB_NAME = 'travellers-assistant';
+const PLAN_STORE = 'plans';
+const MAX_SAVED_PLANS = 20;
+let planDbPromise = null;
+
+function openPlanDb() {
+    if (!('indexedDB' in window)) {
+        return Promise.resolve(null);
+    }
+    if (!planDbPromise) {
+        planDbPromise = new Promise((resolve) => {
+            const request = indexedDB.open(PLAN_DB_NAME, 1);
+            request.onupgradeneeded = () => {
+                const store = request.result.createObjectStore(PLAN_STORE, { keyPath: 'signature' });
+                store.createIndex('savedAt', 'savedAt');
+            };
+            request.onsuccess = () => resolve(request.result);
+            // Storage unavailable (e.g. private browsing): plans just aren't kept
+            request.onerror = () => resolve(null);
+        });
+    }
+    return planDbPromise;
+}
+
+async function planStore(mode, operation) {
+    const db = await openPlanDb();
+    if (!db) {
+        return null;
+    }
+    return new Promise((resolve) => {
+        const tx = db.transaction(PLAN_STORE, mode);
+        const request = operation(tx.objectStore(PLAN_STORE));
+        tx.oncomplete = () => resolve(request ? request.result : null);
+        tx.onerror = () => resolve(null);
+        tx.onabort = () => resolve(null);
+    });
+}
+
+// Same trip, same signature: keys sorted, whitespace collapsed, destination case-insensitive
+function tripSignature(formData) {
+    const normalize = (value) => {
+        if (typeof value === 'string') {
+            return value.trim().replace(/\s+/g, ' ');
+        }
+        if (Array.isArray(value)) {
+            return value.map(normalize);
+        }
+        if (value && typeof value === 'object') {
+            return Object.keys(value).sort().reduce((result, key) => {
+                result[key] = normalize(value[key]);
+                return result;
+            }, {});
+        }
+        return value;
+    };
+    const trip = normalize(formData);
+    trip.destination = trip.destination.toLowerCase();
+    return JSON.stringify(trip);
+}
+
+function loadSavedPlan(signature) {
+    return planStore('readonly', (store) => store.get(signature));
+}
+
+async function savePlan(signature, formData, data) {
+    await planStore('readwrite', (store) => store.put({
+        signature,
+        input: formData,
+        data,
+        savedAt: Date.now()
+    }));
+
+    // Keep only the most recent plans
+    const plans = await listSavedPlans();
+    const expired = plans.slice(MAX_SAVED_PLANS);
+    if (expired.length) {
+        await planStore('readwrite', (store) => {
+            expired.forEach((plan) => store.delete(plan.signature));
+            return null;
+        });
+    }
+    renderSavedTrips();
+}
+
+async function listSavedPlans() {
+    const plans = await planStore('readonly', (store) => store.getAll());
+    return (plans || []).sort((a, b) => b.savedAt - a.savedAt);
+}
+
+async function renderSavedTrips() {
+    const container = document.getElementById('savedTrips');
+    const list = document.getElementById('savedTripsList');
+    const plans = await listSavedPlans();
+
+    container.classList.toggle('hidden', plans.length === 0);
+    list.innerHTML = '';
+    plans.forEach((plan) => {
+        const button = document.createElement('button');
+        button.type = 'button';
+        button.className = 'w-full text-left px-4 py-2 bg-gray-50 hover:bg-blue-50 rounded-lg border border-gray-200 text-sm';
+        button.textContent = `${plan.input.destination} · ${plan.input.dates.start} → ${plan.input.dates.end}`;
+        button.addEventListener('click', () => showSavedPlan(plan));
+        list.appendChild(button);
+    });
+}
+
+function showSavedPlan(plan) {
+    errorSection.classList.add('hidden');
+    inputSection.classList.add('hidden');
+    displayResults(plan.data);
+
+    const notice = document.getElementById('savedPlanNotice');
+    document.getElementById('savedPlanText').textContent =
+        `Saved plan from ${new Date(plan.savedAt).toLocaleString()}. Weather may have changed since.`;
+    notice.classList.remove('hidden');
+    // Refresh asks the server to regenerate rather than replay or reuse cached advice
+    document.getElementById('refreshPlanBtn').onclick = () => requestPlan(plan.input, plan.signature, true);
+}
+
 // Form submission
 travelForm.addEventListener('submit', async (e) => {
     e.preventDefault();
+    if (planRequestInFlight) {
+        return;
+    }
     
     // Hide error
     errorSection.classList.add('hidden');
@@ -33,20 +174,39 @@ travelForm.addEventListener('submit', async (e) => {
         showError('End date must be after start date');
         return;
     }
-    
+
+    // Reopening a saved trip costs no backend work
+    const signature = tripSignature(formData);
+    const saved = await loadSavedPlan(signature);
+    if (saved) {
+        showSavedPlan(saved);
+        return;
+    }
+
+    requestPlan(formData, signature);
+});
+
+async function requestPlan(formData, signature, refresh = false) {
+    if (planRequestInFlight) {
+        return;
+    }
+
     // Show loading
     inputSection.classList.add('hidden');
     resultsSection.classList.add('hidden');
     loadingSection.classList.remove('hidden');
     
+    planRequestInFlight = true;
     try {
         // Call API
-        const response = await fetch(`${API_BASE_URL}/generate-plan`, {
+        const body = JSON.stringify(formData);
+        const response = await fetch(`${API_BASE_URL}/generate-plan?profile=slim${refresh ? '&refresh=1' : ''}`, {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Idempotency-Key': idempotencyKeyFor(body, refresh)
             },
-            body: JSON.stringify(formData)
+            body
         });
         
         if (!response.ok) {
@@ -56,15 +216,21 @@ travelForm.addEventListener('submit', async (e) => {
         const data = await response.json();
         
         // Display results
+        document.getElementById('savedPlanNotice').classList.add('hidden');
         displayResults(data);
+        savePlan(signature, formData, data).catch((error) => console.warn('Could not save plan:', error));
         
     } catch (error) {
         console.error('Error:', error);
         showError('Failed to generate travel plan. Please check your API configuration and try again.');
         loadingSection.classList.add('hidden');
         inputSection.classList.remove('hidden');
+    } finally {
+        planRequestInFlight = false;
     }
-});
+}
+
+renderSavedTrips();
 
 // New plan button
 newPlanBtn.addEventListener('click', () => {
@@ -146,6 +312,14 @@ function displayWeather(weatherData) {
     let html = `
         <h2 class="text-xl font-bold text-gray-800 mb-3">🌤️ Weather Forecast</h2>
         <p class="text-gray-600 mb-4">${weatherData.summary}</p>
+    `;
+
+    // Weather shared with a nearby location the server already had data for
+    if (weatherData.reused_from) {
+        html += `<p class="text-xs text-gray-500 -mt-3 mb-4">Weather for ${weatherData.reused_from.name || 'a nearby location'}, ${weatherData.reused_from.distance_km} km away</p>`;
+    }
+
+    html += `
         <div class="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-3">
     `;
     
@@ -158,6 +332,7 @@ function displayWeather(weatherData) {
                 <p class="text-sm text-gray-700">${day.temp_max}° / ${day.temp_min}°C</p>
                 <p class="text-xs text-gray-600 capitalize">${day.condition}</p>
                 ${day.rain_chance > 30 ? `<p class="text-xs text-blue-600 mt-1">💧 ${day.rain_chance}%</p>` : ''}
+                ${weatherData.data_type === 'hybrid' && day.data_type === 'climate' ? '<p class="text-xs text-gray-400 mt-1">typical</p>' : ''}
             </div>
         `;
     });
@@ -229,6 +404,7 @@ function formatAdviceContent(content) {
     // Convert markdown-style formatting to HTML
     content = content.replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
     content = content.replace(/\n\n/g, '</p><p>');
+    content = content.replace(/^- /, '• ');
     content = content.replace(/\n- /g, '<br>• ');
     content = content.replace(/\n/g, '<br>');
 
@@ -308,6 +484,49 @@ document.getElementById('startDate').addEventListener('change', (e) => {
     }
 });
 
+// Speculative prefetch: once destination and dates are filled in, ask the
+// backend to warm weather/country caches while the rest of the form is completed
+const PREFETCH_DELAY_MS = 800;
+let prefetchTimer = null;
+let lastPrefetchKey = null;
+
+function schedulePrefetch() {
+    clearTimeout(prefetchTimer);
+    prefetchTimer = setTimeout(() => {
+        const destination = document.getElementById('destination').value.trim();
+        const start = document.getElementById('startDate').value;
+        const end = document.getElementById('endDate').value;
+
+        if (destination.length < 3 || !start || !end || new Date(start) > new Date(end)) {
+            return;
+        }
+
+        const key = `${destination.toLowerCase()}|${start}|${end}`;
+        if (key === lastPrefetchKey) {
+            return;
+        }
+        lastPrefetchKey = key;
+
+        fetch(`${API_BASE_URL}/prefetch`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ destination, dates: { start, end } }),
+            keepalive: true
+        }).catch(() => {
+            // Best effort only; the plan request does the lookups anyway
+            lastPrefetchKey = null;
+        });
+    }, PREFETCH_DELAY_MS);
+}
+
+['destination', 'startDate', 'endDate'].forEach((id) => {
+    const input = document.getElementById(id);
+    input.addEventListener('input', schedulePrefetch);
+    input.addEventListener('change', schedulePrefetch);
+});
+
 // Follow-up questions functionality
 let currentTravelContext = null;
 
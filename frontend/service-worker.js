@@ -1,59 +1,101 @@
-const CACHE_NAME = 'travellers-assistant-v1';
+// Bump CACHE_VERSION whenever precached files change; activate() then drops
+// every cache from older versions
+const CACHE_VERSION = 'v4';
+const STATIC_CACHE = `travellers-assistant-static-${CACHE_VERSION}`;
+const API_CACHE = `travellers-assistant-api-${CACHE_VERSION}`;
+const API_CACHE_MAX_ENTRIES = 60;
+
 const urlsToCache = [
   '/',
   '/index.html',
   '/styles.css',
-  '/script-v3.js',
+  '/script-v3.js?v=6.4',
   '/manifest.json'
 ];
 
+// Read-only lookups that may be served stale while a fresh copy is fetched
+const REVALIDATED_API_PATHS = ['/api/weather/', '/api/country/'];
+
 // Install service worker and cache resources
 self.addEventListener('install', (event) => {
   event.waitUntil(
-    caches.open(CACHE_NAME)
+    caches.open(STATIC_CACHE)
       .then((cache) => {
         console.log('Opened cache');
         return cache.addAll(urlsToCache);
       })
+      .then(() => self.skipWaiting())
   );
 });
 
-// Fetch resources from cache when offline
 self.addEventListener('fetch', (event) => {
-  event.respondWith(
-    caches.match(event.request)
-      .then((response) => {
-        // Cache hit - return response
-        if (response) {
-          return response;
-        }
-        
-        // Clone the request
-        const fetchRequest = event.request.clone();
-        
-        return fetch(fetchRequest).then((response) => {
+  const request = event.request;
+  const url = new URL(request.url);
+
+  // POSTs (plans, questions, prefetch) and third-party requests go straight to the network
+  if (request.method !== 'GET' || url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (url.pathname.startsWith('/api/')) {
+    if (REVALIDATED_API_PATHS.some((path) => url.pathname.startsWith(path))) {
+      event.respondWith(staleWhileRevalidate(event, API_CACHE));
+    }
+    // Other API calls are network-only
+    return;
+  }
+
+  event.respondWith(staleWhileRevalidate(event, STATIC_CACHE));
+});
+
+// Answer from cache when possible and refresh the cached copy in the
+// background; without a cached copy, wait for the network
+function staleWhileRevalidate(event, cacheName) {
+  const request = event.request;
+
+  return caches.open(cacheName).then((cache) =>
+    cache.match(request).then((cached) => {
+      const network = fetch(request)
+        .then((response) => {
           // Check if valid response
-          if (!response || response.status !== 200 || response.type !== 'basic') {
-            return response;
+          if (response && response.status === 200 && response.type === 'basic') {
+            const responseToCache = response.clone();
+            event.waitUntil(
+              cache.put(request, responseToCache).then(() => {
+                if (cacheName === API_CACHE) {
+                  return trimCache(cache, API_CACHE_MAX_ENTRIES);
+                }
+              })
+            );
           }
-          
-          // Clone the response
-          const responseToCache = response.clone();
-          
-          caches.open(CACHE_NAME)
-            .then((cache) => {
-              cache.put(event.request, responseToCache);
-            });
-          
           return response;
+        })
+        .catch((error) => {
+          if (cached) {
+            return cached;
+          }
+          throw error;
         });
-      })
+
+      if (cached) {
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+      }
+      return network;
+    })
   );
-});
+}
+
+// Drop the oldest entries beyond the limit (cache keys are in insertion order)
+function trimCache(cache, maxEntries) {
+  return cache.keys().then((keys) =>
+    Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map((key) => cache.delete(key)))
+  );
+}
 
 // Update service worker
 self.addEventListener('activate', (event) => {
-  const cacheWhitelist = [CACHE_NAME];
+  const cacheWhitelist = [STATIC_CACHE, API_CACHE];
   event.waitUntil(
     caches.keys().then((cacheNames) => {
       return Promise.all(
@@ -63,6 +105,6 @@ self.addEventListener('activate', (event) => {
           }
         })
       );
-    })
+    }).then(() => self.clients.claim())
   );
 });